@@ -1,3 +1,22 @@
 from django.contrib import admin
 
-# Register your models here.
+from docsStore.pagination import EstimatedCountPaginator
+from .models import CustomUser
+
+
+@admin.register(CustomUser)
+class CustomUserAdmin(admin.ModelAdmin):
+    list_display = ('email', 'name', 'is_active', 'is_staff', 'storage_used', 'storage_quota')
+    list_filter = ('is_active', 'is_staff')
+    search_fields = ('email__exact',)
+    search_help_text = 'Точный email пользователя.'
+    ordering = ('email',)
+    fields = (
+        'email', 'name', 'is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions',
+        'storage_quota', 'storage_used', 'last_login',
+    )
+    # Хеш пароля не редактируется в форме
+    readonly_fields = ('storage_used', 'last_login')
+    filter_horizontal = ('groups', 'user_permissions')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,49 @@
+"""
+Хеширование паролей в пуле процессов. Модуль не импортирует модели:
+дочерние процессы запускаются через spawn и загружают его до django.setup().
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+
+HASH_CHUNK_SIZE = 16
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    # spawn: дочерний процесс стартует с чистого интерпретатора
+    import django
+    django.setup()
+
+
+def _get_executor(workers):
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown()
+            # spawn, а не fork: форк многопоточного веб-процесса может зависнуть на чужой блокировке
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def _hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords, workers, chunk_size=HASH_CHUNK_SIZE):
+    """Хеши паролей в исходном порядке; мелкие пачки хешируются в текущем процессе."""
+    if workers <= 1 or len(passwords) <= chunk_size:
+        return _hash_chunk(passwords)
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    return [hashed for chunk in _get_executor(workers).map(_hash_chunk, chunks) for hashed in chunk]
@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.imports import FORMATS, UserImport, detect_format
+
+
+class Command(BaseCommand):
+    help = 'Массовый импорт пользователей из CSV или NDJSON (колонки email, name, password).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или - для stdin.')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Формат файла; по умолчанию - по расширению.')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Сколько пользователей вставлять одним bulk_create.')
+        parser.add_argument('--workers', type=int,
+                            help='Процессов для хеширования паролей (по умолчанию ACCOUNT_IMPORT_WORKERS).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if fmt is None:
+            raise CommandError('Не удалось определить формат файла, укажите --format.')
+        importer = UserImport(batch_size=options['batch_size'], workers=options['workers'])
+        if path == '-':
+            result = importer.run(sys.stdin.buffer, fmt)
+        else:
+            try:
+                with open(path, 'rb') as stream:
+                    result = importer.run(stream, fmt)
+            except OSError as exc:
+                raise CommandError(f'Не удалось открыть {path}: {exc}')
+
+        for error in result['errors']:
+            self.stderr.write(f"строка {error['line']} ({error['email']}): {' '.join(error['errors'])}")
+        self.stdout.write(f"Создано пользователей: {result['created']}, пропущено строк: {len(result['errors'])}.")
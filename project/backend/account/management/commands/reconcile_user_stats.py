@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from account.models import CustomUser, UserStats
+from account.stats import compute
+
+FIELDS = ('document_count', 'file_count', 'category_counts', 'recent')
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику пользователей (UserStats) по документам и файлам. '
+        'Запускать периодически: исправляет расхождения инкрементальных счётчиков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Сколько пользователей пересчитывать в одной транзакции.')
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Создать строки и для пользователей, ещё не открывавших статистику.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fixed = created = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # Строки пачки блокируются: правки от загрузок ждут конца пересчёта
+                user_ids = list(
+                    CustomUser.objects.filter(pk__gt=last_pk).order_by('pk')
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+                if not user_ids:
+                    break
+                existing = UserStats.objects.select_for_update().in_bulk(user_ids)
+                changed = []
+                missing = []
+                for user_id in user_ids:
+                    stats = existing.get(user_id)
+                    if stats is None and not options['create_missing']:
+                        continue
+                    values = compute(user_id)
+                    if stats is None:
+                        missing.append(UserStats(user_id=user_id, **values))
+                    elif any(getattr(stats, field) != values[field] for field in FIELDS):
+                        for field in FIELDS:
+                            setattr(stats, field, values[field])
+                        changed.append(stats)
+                UserStats.objects.bulk_update(changed, FIELDS)
+                UserStats.objects.bulk_create(missing)
+            fixed += len(changed)
+            created += len(missing)
+            last_pk = user_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Исправлено: {fixed}, создано: {created}.'))
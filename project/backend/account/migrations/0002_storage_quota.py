@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='storage_quota',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='storage_used',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_storage_quota'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('document_count', models.PositiveIntegerField(default=0)),
+                ('file_count', models.PositiveIntegerField(default=0)),
+                ('category_counts', models.JSONField(default=dict)),
+                ('recent', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
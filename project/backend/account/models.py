@@ -28,7 +28,31 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Квота хранилища в байтах; пусто - DEFAULT_STORAGE_QUOTA из настроек
+    storage_quota = models.BigIntegerField(null=True, blank=True)
+    # Сумма размеров загруженных файлов, ведётся account.quotas
+    storage_used = models.BigIntegerField(default=0, editable=False)
 
     objects = CustomUserManager()
 
     USERNAME_FIELD = 'email'
+
+
+class UserStats(models.Model):
+    """
+    Сводка для дашборда пользователя: его документы, загруженные файлы,
+    документы по категориям и последние добавления. Ведётся account.stats
+    в транзакциях изменений; строка создаётся при первом чтении и
+    выверяется командой reconcile_user_stats. Занятое место - CustomUser.storage_used.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    document_count = models.PositiveIntegerField(default=0)
+    file_count = models.PositiveIntegerField(default=0)
+    # {имя категории: число неудалённых документов}
+    category_counts = models.JSONField(default=dict)
+    # Последние добавленные документы и файлы, новые первыми
+    recent = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'stats {self.user_id}'
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.db.models import F, Q
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import CustomUser
+
+
+class StorageQuotaExceeded(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Превышена квота хранилища.'
+    default_code = 'storage_quota_exceeded'
+
+
+def quota_for(user):
+    """Квота пользователя в байтах с учётом значения по умолчанию."""
+    if user.storage_quota is not None:
+        return user.storage_quota
+    return settings.DEFAULT_STORAGE_QUOTA
+
+
+def check_storage(user, size):
+    """
+    Предварительная проверка по уже загруженному пользователю, без запросов.
+    Окончательное решение принимает reserve_storage.
+    """
+    if user.storage_used + size > quota_for(user):
+        raise StorageQuotaExceeded()
+
+
+def reserve_storage(user_id, size):
+    """
+    Резервирует size байт одним условным UPDATE: квота проверяется в той же
+    инструкции, что и увеличивает счётчик, поэтому параллельные загрузки
+    не превысят её вместе.
+    """
+    fits = (
+        Q(storage_quota__isnull=True, storage_used__lte=settings.DEFAULT_STORAGE_QUOTA - size)
+        | Q(storage_quota__isnull=False, storage_used__lte=F('storage_quota') - size)
+    )
+    reserved = CustomUser.objects.filter(fits, pk=user_id).update(storage_used=F('storage_used') + size)
+    if not reserved:
+        raise StorageQuotaExceeded()
+
+
+def release_storage(usage):
+    """Возвращает место пользователям; usage - {user_id: байт}."""
+    for user_id, size in usage.items():
+        if user_id is not None and size:
+            CustomUser.objects.filter(pk=user_id).update(storage_used=F('storage_used') - size)
@@ -6,7 +6,9 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
-from .models import CustomUser
+from monitoring.instrumentation import TimedSerializerMixin
+from .models import CustomUser, UserStats
+from .quotas import quota_for
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -28,11 +30,16 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    storage_quota = serializers.SerializerMethodField()
+
     class Meta:
         model = CustomUser
-        fields = ['email', 'name']
-        read_only_fields = ['email']
+        fields = ['email', 'name', 'storage_used', 'storage_quota']
+        read_only_fields = ['email', 'storage_used']
+
+    def get_storage_quota(self, obj):
+        return quota_for(obj)
 
 
 class PasswordChangeSerializer(serializers.Serializer):
@@ -98,3 +105,19 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         user.set_password(new_password)
         user.save()
         return user
+
+
+class UserStatsSerializer(serializers.ModelSerializer):
+    storage_used = serializers.IntegerField(source='user.storage_used', read_only=True)
+    storage_quota = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserStats
+        fields = [
+            'document_count', 'file_count', 'storage_used', 'storage_quota',
+            'category_counts', 'recent', 'updated_at',
+        ]
+        read_only_fields = fields
+
+    def get_storage_quota(self, obj):
+        return quota_for(obj.user)
@@ -0,0 +1,149 @@
+"""
+Инкрементальная статистика пользователя (UserStats) для дашборда.
+
+Изменения документов и файлов правят строку автора или загрузившего в той же
+транзакции: строка блокируется select_for_update, счётчики и JSON-поля
+меняются в Python. Если строки ещё нет (старый или импортированный
+пользователь), изменение её не создаёт - при первом чтении stats_for
+посчитает всё по таблицам, и пропущенные правки войдут в этот расчёт.
+Расхождения (каскадные удаления, переименование категорий) выправляет
+команда reconcile_user_stats.
+"""
+import os
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import UserStats
+
+RECENT_LIMIT = 10
+
+
+def _document_item(document):
+    return {
+        'type': 'document',
+        'id': str(document.pk),
+        'document': document.slug,
+        'at': document.created_at.isoformat(),
+    }
+
+
+def _file_item(document_file, slug):
+    return {
+        'type': 'file',
+        'id': str(document_file.pk),
+        'document': slug,
+        'name': os.path.basename(document_file.file.name),
+        'at': document_file.uploaded_at.isoformat(),
+    }
+
+
+def compute(user_id):
+    """Поля UserStats, посчитанные по таблицам документов и файлов."""
+    # documents зависит от account; обратный импорт - только во время вызова
+    from documents.models import Document, DocumentFile
+
+    documents = Document.objects.filter(created_by_id=user_id)
+    files = DocumentFile.objects.filter(uploaded_by_id=user_id).select_related('document')
+    category_counts = dict(
+        documents.order_by().values('category__name').annotate(total=Count('pk'))
+        .values_list('category__name', 'total')
+    )
+    recent = sorted(
+        [_document_item(document) for document in documents.order_by('-created_at')[:RECENT_LIMIT]]
+        + [
+            _file_item(document_file, document_file.document.slug)
+            for document_file in files.filter(document__deleted_at__isnull=True)
+            .order_by('-uploaded_at')[:RECENT_LIMIT]
+        ],
+        key=lambda item: item['at'],
+        reverse=True,
+    )[:RECENT_LIMIT]
+    return {
+        'document_count': sum(category_counts.values()),
+        'file_count': files.count(),
+        'category_counts': category_counts,
+        'recent': recent,
+    }
+
+
+def stats_for(user):
+    """Строка статистики пользователя; при первом обращении считается целиком."""
+    stats = UserStats.objects.filter(pk=user.pk).first()
+    if stats is None:
+        stats, _ = UserStats.objects.get_or_create(user_id=user.pk, defaults=compute(user.pk))
+    return stats
+
+
+def _adjust(user_id, change):
+    """Применяет change(stats) к заблокированной строке, если она уже есть."""
+    if user_id is None:
+        return
+    with transaction.atomic():
+        stats = UserStats.objects.select_for_update().filter(pk=user_id).first()
+        if stats is None:
+            return
+        change(stats)
+        stats.save()
+
+
+def _add_category(stats, name, delta):
+    count = stats.category_counts.get(name, 0) + delta
+    if count > 0:
+        stats.category_counts[name] = count
+    else:
+        stats.category_counts.pop(name, None)
+
+
+def _push_recent(stats, items):
+    stats.recent = (items + stats.recent)[:RECENT_LIMIT]
+
+
+def document_created(document):
+    def change(stats):
+        stats.document_count += 1
+        _add_category(stats, document.category.name, 1)
+        _push_recent(stats, [_document_item(document)])
+    _adjust(document.created_by_id, change)
+
+
+def document_moved(document, previous_category_id):
+    def change(stats):
+        from documents.models import Category
+
+        previous = Category.objects.filter(pk=previous_category_id).values_list('name', flat=True).first()
+        _add_category(stats, previous, -1)
+        _add_category(stats, document.category.name, 1)
+    _adjust(document.created_by_id, change)
+
+
+def document_removed(document):
+    """Документ удалён: вместе с ним из недавних уходят и его файлы."""
+    def change(stats):
+        stats.document_count = max(stats.document_count - 1, 0)
+        _add_category(stats, document.category.name, -1)
+        stats.recent = [item for item in stats.recent if item['document'] != document.slug]
+    _adjust(document.created_by_id, change)
+
+
+def files_added(user_id, document_files, slug):
+    def change(stats):
+        stats.file_count += len(document_files)
+        _push_recent(stats, [_file_item(document_file, slug) for document_file in reversed(document_files)])
+    if document_files:
+        _adjust(user_id, change)
+
+
+def files_removed(usage):
+    """Файлы удалены; usage - {user_id: число файлов}."""
+    for user_id, count in usage.items():
+        def change(stats, count=count):
+            stats.file_count = max(stats.file_count - count, 0)
+        _adjust(user_id, change)
+
+
+def file_removed(document_file):
+    def change(stats):
+        stats.file_count = max(stats.file_count - 1, 0)
+        stats.recent = [item for item in stats.recent if item['id'] != str(document_file.pk)]
+    _adjust(document_file.uploaded_by_id, change)
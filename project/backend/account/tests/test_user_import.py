@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.imports import hash_passwords
+from account.models import CustomUser
+
+
+@pytest.mark.django_db
+def test_import_command_reports_duplicates_and_invalid_rows(tmp_path):
+    """CSV импортируется пачками, дубликаты и ошибки попадают в отчёт по строкам"""
+    CustomUser.objects.create_user(email='taken@example.com', password='Testpass123')
+    path = tmp_path / 'users.csv'
+    path.write_text(
+        'email,name,password\n'
+        'anna@example.com,Anna,Str0ng-pass-1\n'
+        'taken@example.com,Taken,Str0ng-pass-2\n'
+        'anna@example.com,Anna again,Str0ng-pass-3\n'
+        'not-an-email,Broken,Str0ng-pass-4\n'
+        'boris@example.com,Boris,\n'
+        'vera@example.com,Vera,123\n'
+    )
+    out, err = io.StringIO(), io.StringIO()
+
+    call_command('import_users', str(path), '--batch-size', '2', '--workers', '0', stdout=out, stderr=err)
+
+    anna = CustomUser.objects.get(email='anna@example.com')
+    boris = CustomUser.objects.get(email='boris@example.com')
+    assert anna.name == 'Anna' and anna.check_password('Str0ng-pass-1')
+    assert not boris.has_usable_password()
+    assert not CustomUser.objects.filter(email='vera@example.com').exists()
+    assert 'Создано пользователей: 2, пропущено строк: 4.' in out.getvalue()
+    assert [line.split(' ')[1] for line in err.getvalue().splitlines()] == ['3', '4', '5', '7']
+
+
+@pytest.mark.django_db
+def test_import_api_accepts_ndjson_for_staff_only():
+    """NDJSON через API импортирует только staff"""
+    admin = CustomUser.objects.create_superuser('admin@example.com', 'Testpass123')
+    user = CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+    body = '\n'.join(json.dumps({'email': f'new{i}@example.com', 'name': f'New {i}'}) for i in range(3))
+    client = APIClient()
+
+    client.force_authenticate(user=user)
+    assert client.post(reverse('account:import'), {'file': SimpleUploadedFile('u.ndjson', body.encode())},
+                       format='multipart').status_code == status.HTTP_403_FORBIDDEN
+
+    client.force_authenticate(user=admin)
+    response = client.post(reverse('account:import'), {'file': SimpleUploadedFile('u.ndjson', body.encode())},
+                           format='multipart')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data == {'created': 3, 'errors': []}
+    assert CustomUser.objects.filter(email__startswith='new').count() == 3
+
+
+@pytest.mark.django_db
+def test_import_api_takes_explicit_type():
+    """Формат задаётся ?type= независимо от расширения; неизвестный формат - 400"""
+    admin = CustomUser.objects.create_superuser('admin@example.com', 'Testpass123')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    body = 'email,name\ncsv@example.com,Csv\n'
+
+    response = client.post(f"{reverse('account:import')}?type=csv",
+                           {'file': SimpleUploadedFile('users.txt', body.encode())}, format='multipart')
+    unknown = client.post(f"{reverse('account:import')}?type=xml",
+                          {'file': SimpleUploadedFile('users.txt', body.encode())}, format='multipart')
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data == {'created': 1, 'errors': []}
+    assert unknown.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'type' in unknown.data
+
+
+def test_passwords_hashed_in_process_pool():
+    """Пароли хешируются в дочерних процессах, порядок сохраняется"""
+    from django.contrib.auth.hashers import check_password
+
+    passwords = ['first-pass', 'second-pass', 'third-pass', None]
+    hashes = hash_passwords(passwords, workers=2, chunk_size=2)
+
+    assert [check_password(p, h) for p, h in zip(passwords[:3], hashes)] == [True, True, True]
+    assert hashes[3].startswith('!')
@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from account.models import CustomUser, UserStats
+from documents.models import Category, Document
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='stats@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def create_document(user, title, category='General'):
+    return Document.objects.create(title=title, category=Category.objects.named(category), created_by=user)
+
+
+@pytest.mark.django_db
+def test_stats_computed_on_first_read_then_maintained(client, user):
+    """Первое чтение считает сводку по таблицам, дальше она правится при изменениях"""
+    create_document(user, 'Before stats')
+    first = client.get(reverse('account:stats'))
+    assert (first.data['document_count'], first.data['category_counts']) == (1, {'General': 1})
+
+    contract = create_document(user, 'Contract', 'Legal')
+    client.post(
+        reverse('documents:documentfile-list'),
+        {'document': str(contract.id), 'file': SimpleUploadedFile('scan.pdf', b'%PDF stats')},
+        format='multipart',
+    )
+    Document.objects.get(slug='before-stats').soft_delete()
+    # Аутентификация по токену загружает пользователя заново на каждый запрос
+    user.refresh_from_db()
+
+    with CaptureQueriesContext(connection) as queries:
+        data = client.get(reverse('account:stats')).data
+    assert len(queries) == 1
+    assert (data['document_count'], data['file_count']) == (1, 1)
+    assert data['category_counts'] == {'Legal': 1}
+    assert data['storage_used'] == len(b'%PDF stats')
+    assert [(item['type'], item['document']) for item in data['recent']] == [
+        ('file', 'contract'), ('document', 'contract'),
+    ]
+
+
+@pytest.mark.django_db
+def test_category_change_moves_stats(user):
+    """Смена категории переносит документ между счётчиками пользователя"""
+    document = create_document(user, 'Moving')
+    UserStats.objects.create(user=user, document_count=1, category_counts={'General': 1})
+
+    document.category = Category.objects.named('Archive')
+    document.save()
+
+    assert UserStats.objects.get(user=user).category_counts == {'Archive': 1}
+
+
+@pytest.mark.django_db
+def test_reconcile_fixes_drift_and_creates_missing(user):
+    """Команда выверки исправляет счётчики и по запросу создаёт недостающие строки"""
+    create_document(user, 'Counted')
+    other = CustomUser.objects.create_user(email='imported@example.com', password='Testpass123')
+    create_document(other, 'Imported')
+    UserStats.objects.create(user=user, document_count=5, category_counts={'Gone': 5})
+
+    call_command('reconcile_user_stats', stdout=StringIO())
+    assert not UserStats.objects.filter(user=other).exists()
+    call_command('reconcile_user_stats', '--create-missing', stdout=StringIO())
+
+    stats = UserStats.objects.get(user=user)
+    assert (stats.document_count, stats.category_counts) == (1, {'General': 1})
+    assert UserStats.objects.get(user=other).document_count == 1
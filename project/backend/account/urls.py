@@ -4,6 +4,8 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     RegisterUserView,
     UserMeView,
+    UserStatsView,
+    UserImportView,
     SetPasswordView,
     PasswordResetRequestView,
     PasswordResetConfirmView,
@@ -17,6 +19,8 @@ urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('me/', UserMeView.as_view(), name='me'),
+    path('stats/', UserStatsView.as_view(), name='stats'),
+    path('import/', UserImportView.as_view(), name='import'),
     path('set_password/', SetPasswordView.as_view(), name='set_password'),
     path('password/reset/', PasswordResetRequestView.as_view(), name='password_reset_request'),
     path('password/reset/confirm/', PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
@@ -9,10 +9,13 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
 from django.db import transaction
+from .imports import FORMATS, UserImport, detect_format
+from .stats import stats_for
 from .models import CustomUser
 from .serializers import (
     UserRegistrationSerializer,
     UserSerializer,
+    UserStatsSerializer,
     PasswordChangeSerializer,
     PasswordResetRequestSerializer,
     PasswordResetConfirmSerializer
@@ -33,6 +36,40 @@ class UserMeView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
+class UserStatsView(APIView):
+    """Сводка для дашборда: одна строка UserStats по первичному ключу."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        stats = stats_for(request.user)
+        # Пользователь уже загружен аутентификацией - storage_used без запроса
+        stats.user = request.user
+        return Response(UserStatsSerializer(stats).data)
+
+
+class UserImportView(APIView):
+    """
+    Массовый импорт пользователей (только для staff): multipart-поле file
+    с CSV или NDJSON, формат - по расширению или ?type=csv|ndjson
+    (?format= занят DRF: им выбирается формат ответа).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['Файл не передан.']}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.query_params.get('type') or detect_format(upload.name)
+        if fmt not in FORMATS:
+            return Response(
+                {'type': [f"Поддерживаются форматы: {', '.join(FORMATS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        result = UserImport().run(upload, fmt)
+        response_status = status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+
+
 class SetPasswordView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
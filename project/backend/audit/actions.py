@@ -0,0 +1,14 @@
+# Действия в журнале доступа
+READ = 'read'
+DOWNLOAD = 'download'
+CREATE = 'create'
+UPDATE = 'update'
+DELETE = 'delete'
+
+ACTION_CHOICES = [
+    (READ, 'Read'),
+    (DOWNLOAD, 'Download'),
+    (CREATE, 'Create'),
+    (UPDATE, 'Update'),
+    (DELETE, 'Delete'),
+]
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from audit.models import AuditEvent
+from documents import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт секции журнала доступа на текущий и следующие месяцы. '
+        'Запускать раз в месяц; без --apply только печатает SQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3,
+                            help='На сколько месяцев вперёд создавать секции.')
+        parser.add_argument('--apply', action='store_true', help='Выполнить SQL.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Секционирование поддерживается только для PostgreSQL.')
+        table = AuditEvent._meta.db_table
+        if not partitioning.is_partitioned(connection, table):
+            raise CommandError(f'Таблица {table} не секционирована, примените миграции audit.')
+        statements = partitioning.create_ahead_sql(connection, table, options['months_ahead'])
+
+        if not options['apply']:
+            for statement in statements:
+                self.stdout.write(statement + ';')
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        self.stdout.write(self.style.SUCCESS(f'Выполнено инструкций: {len(statements)}.'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:01
+
+import django.utils.timezone
+import documents.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.UUIDField(default=documents.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user_id', models.BigIntegerField(null=True)),
+                ('action', models.CharField(choices=[('read', 'Read'), ('download', 'Download'), ('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=16)),
+                ('document_id', models.UUIDField(null=True)),
+                ('file_id', models.UUIDField(null=True)),
+                ('ip', models.GenericIPAddressField(null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['document_id', 'id'], name='auditevent_document_idx'), models.Index(fields=['user_id', 'id'], name='auditevent_user_idx')],
+            },
+        ),
+    ]
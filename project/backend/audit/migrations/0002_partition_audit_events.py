@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from documents import partitioning
+
+MONTHS_AHEAD = 3
+
+
+def partition(apps, schema_editor):
+    # Таблица ещё пустая: перевод в секционированную ничего не копирует
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    table = apps.get_model('audit', 'AuditEvent')._meta.db_table
+    for statement in partitioning.convert_sql(connection, table, MONTHS_AHEAD):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, migrations.RunPython.noop),
+    ]
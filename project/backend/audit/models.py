@@ -0,0 +1,31 @@
+from django.db import models
+from django.utils import timezone
+
+from documents.ids import uuid7
+from .actions import ACTION_CHOICES
+
+
+class AuditEvent(models.Model):
+    """
+    Кто и что сделал с документом или файлом. Таблица только дописывается;
+    в PostgreSQL она секционирована по месяцам (RANGE по UUIDv7 id), старые
+    месяцы отсоединяются и архивируются целиком.
+    """
+    # id создаётся в момент события, поэтому попадает в секцию месяца события
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    occurred_at = models.DateTimeField(default=timezone.now)
+    # Без внешних ключей: вставка без проверок, журнал переживает удаление пользователя и документа
+    user_id = models.BigIntegerField(null=True)
+    action = models.CharField(max_length=16, choices=ACTION_CHOICES)
+    document_id = models.UUIDField(null=True)
+    file_id = models.UUIDField(null=True)
+    ip = models.GenericIPAddressField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['document_id', 'id'], name='auditevent_document_idx'),
+            models.Index(fields=['user_id', 'id'], name='auditevent_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.occurred_at:%Y-%m-%d %H:%M:%S} {self.user_id} {self.action} {self.document_id}'
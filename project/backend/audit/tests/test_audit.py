@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, transaction
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from audit.models import AuditEvent
+from audit.writer import AuditWriter, record_change
+from documents.models import Category, Document
+from monitoring.metrics import audit_events_dropped_total
+
+
+@pytest.mark.django_db
+def test_document_and_file_access_is_audited(django_capture_on_commit_callbacks):
+    """Чтение документа, загрузка, правка, скачивание и удаление файла попадают в журнал"""
+    user = CustomUser.objects.create_user(email='audited@example.com', password='Testpass123')
+    document = Document.objects.create(title='Audited', category=Category.objects.named('General'), created_by=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.get(reverse('documents:document-detail', args=[document.slug]))
+        created = client.post(
+            reverse('documents:documentfile-list'),
+            {'document': str(document.id), 'file': SimpleUploadedFile('a.pdf', b'%PDF audit')},
+            format='multipart',
+        )
+        detail = reverse('documents:documentfile-detail', args=[created.data['id']])
+        client.patch(detail, {}, format='json')
+        b''.join(client.get(reverse('documents:documentfile-download', args=[created.data['id']])).streaming_content)
+        client.delete(detail)
+
+    events = list(AuditEvent.objects.order_by('id').values_list('user_id', 'action', 'document_id', 'ip'))
+    assert events == [
+        (user.pk, 'read', document.id, '127.0.0.1'),
+        (user.pk, 'create', document.id, '127.0.0.1'),
+        (user.pk, 'update', document.id, '127.0.0.1'),
+        (user.pk, 'download', document.id, '127.0.0.1'),
+        (user.pk, 'delete', document.id, '127.0.0.1'),
+    ]
+    assert AuditEvent.objects.filter(action='download', file_id=created.data['id']).exists()
+
+
+@pytest.mark.django_db
+def test_rolled_back_change_is_not_audited(django_capture_on_commit_callbacks):
+    """Изменение, откаченное вместе с транзакцией, в журнал не попадает"""
+    request = RequestFactory().delete('/')
+    request.user = CustomUser.objects.create_user(email='rollback@example.com', password='Testpass123')
+    document_id = uuid.uuid4()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(DatabaseError):
+            with transaction.atomic():
+                record_change(request, 'delete', document_id)
+                raise DatabaseError('storage failed')
+        record_change(request, 'delete', document_id)
+
+    assert list(AuditEvent.objects.values_list('action', 'document_id')) == [('delete', document_id)]
+
+
+def test_writer_flushes_batches_by_size_and_time():
+    """Фоновый поток пишет пачками по размеру, остаток - по таймеру, при остановке ничего не теряется"""
+    batches = []
+    writer = AuditWriter(write=batches.append, flush_size=3, flush_interval=0.05, max_pending=100)
+
+    for i in range(7):
+        writer.submit(i)
+    deadline = time.monotonic() + 2
+    while sum(map(len, batches)) < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.submit(7)
+    writer.stop()
+
+    assert [event for batch in batches for event in batch] == list(range(8))
+    assert max(map(len, batches)) == 3
+
+
+def test_writer_applies_backpressure_when_database_lags():
+    """Пока база не пишет, запрос ждёт места в очереди; по таймауту событие теряется и учитывается"""
+    released = threading.Event()
+    written = []
+
+    def slow_write(batch):
+        released.wait(5)
+        written.extend(batch)
+
+    writer = AuditWriter(write=slow_write, flush_size=1, flush_interval=0.01, max_pending=2, block_timeout=0.05)
+    dropped = audit_events_dropped_total.value()
+    writer.submit('first')  # забирает поток и висит в slow_write
+    time.sleep(0.05)
+    writer.submit('second')
+    writer.submit('third')
+
+    started = time.monotonic()
+    writer.submit('lost')
+    assert time.monotonic() - started >= 0.05
+    assert audit_events_dropped_total.value() == dropped + 1
+
+    released.set()
+    writer.stop()
+    assert written == ['first', 'second', 'third']
@@ -0,0 +1,187 @@
+"""
+Фоновая запись журнала доступа.
+
+События копятся в ограниченной очереди процесса, фоновый поток пишет их
+пачками одним INSERT: когда набралось AUDIT_FLUSH_SIZE событий или прошло
+AUDIT_FLUSH_INTERVAL секунд. Если очередь заполнена (база не успевает),
+запрос ждёт места до AUDIT_BLOCK_TIMEOUT секунд - это и есть обратное
+давление; только после этого событие теряется и учитывается в метрике.
+При штатной остановке процесса (atexit) очередь дописывается целиком.
+
+С AUDIT_ASYNC=False событие пишется сразу в потоке запроса - для тестов.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+
+from monitoring.metrics import audit_events_dropped_total, audit_events_written_total
+from .models import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+WRITE_ATTEMPTS = 3
+_STOP = object()
+
+
+def write_events(events):
+    AuditEvent.objects.bulk_create(events)
+
+
+class AuditWriter:
+    def __init__(self, write=write_events, flush_size=None, flush_interval=None,
+                 max_pending=None, block_timeout=None):
+        self.write = write
+        self.flush_size = flush_size or settings.AUDIT_FLUSH_SIZE
+        self.flush_interval = flush_interval or settings.AUDIT_FLUSH_INTERVAL
+        self.max_pending = max_pending or settings.AUDIT_MAX_PENDING
+        self.block_timeout = settings.AUDIT_BLOCK_TIMEOUT if block_timeout is None else block_timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _ensure_started(self):
+        # После fork (gunicorn --preload) поток родителя в дочернем процессе не существует
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_pending)
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+            if self._pid is None:
+                atexit.register(self.stop)
+            self._pid = os.getpid()
+
+    def submit(self, event):
+        self._ensure_started()
+        try:
+            self._queue.put(event, timeout=self.block_timeout)
+        except queue.Full:
+            audit_events_dropped_total.inc()
+            logger.error('Очередь журнала доступа переполнена, событие потеряно: %s', event)
+
+    def _take(self):
+        """Пачка до flush_size событий, собранная не дольше flush_interval."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            remaining = deadline - time.monotonic()
+            try:
+                event = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._take()
+            if batch:
+                self._write(batch)
+        # Остаток, пришедший после сигнала остановки
+        self.drain()
+        connection.close()
+
+    def _write(self, batch):
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            close_old_connections()
+            try:
+                self.write(batch)
+            except DatabaseError:
+                logger.warning('Не удалось записать журнал доступа (попытка %s)', attempt, exc_info=True)
+                connection.close()
+                time.sleep(0.1 * 2 ** attempt)
+                continue
+            audit_events_written_total.inc(len(batch))
+            return
+        audit_events_dropped_total.inc(len(batch))
+        logger.error('Журнал доступа: потеряно событий: %s', len(batch))
+
+    def drain(self):
+        """Дописывает всё, что сейчас в очереди, в текущем потоке."""
+        if self._queue is None:
+            return
+        while True:
+            batch = []
+            while len(batch) < self.flush_size:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is not _STOP:
+                    batch.append(event)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self, timeout=10):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        # Поток не успел или завис на базе - дописываем сами
+        self.drain()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AuditWriter()
+        return _writer
+
+
+def client_ip(request):
+    # За прокси REMOTE_ADDR - адрес прокси; доверять X-Forwarded-For должен сам прокси
+    return request.META.get('REMOTE_ADDR') or None
+
+
+def _event(request, action, document_id, file_id):
+    user = getattr(request, 'user', None)
+    return AuditEvent(
+        user_id=user.pk if user is not None and user.is_authenticated else None,
+        action=action,
+        document_id=document_id,
+        file_id=file_id,
+        ip=client_ip(request),
+    )
+
+
+def record(request, action, document_id=None, file_id=None):
+    """Ставит событие в журнал доступа; запрос не ждёт записи в базу."""
+    _submit(_event(request, action, document_id, file_id))
+
+
+def record_change(request, action, document_id=None, file_id=None):
+    """
+    Событие изменения (создание, правка, удаление) ставится в журнал только
+    после фиксации транзакции: откаченное изменение в журнал не попадает.
+    Вне транзакции событие ставится сразу.
+    """
+    event = _event(request, action, document_id, file_id)
+    transaction.on_commit(lambda: _submit(event))
+
+
+def _submit(event):
+    if settings.AUDIT_ASYNC:
+        get_writer().submit(event)
+    else:
+        write_events([event])
@@ -0,0 +1,10 @@
+"""
+Бенчмарки API документов и аккаунтов.
+
+    python -m benchmarks --scale small --output bench.json
+    python -m benchmarks --baseline bench-main.json --threshold 0.2
+
+Данные засеваются во временную тестовую БД, результаты пишутся в JSON
+для сравнения между коммитами. Нагрузочный прогон против запущенного
+сервера: python -m benchmarks.loadtest --help
+"""
@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import tempfile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Бенчмарки API.')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'docsStore.settings'))
+    parser.add_argument('--scale', default='small', help='tiny, small, medium или large')
+    parser.add_argument('--scenario', action='append', dest='scenarios',
+                        help='Запустить только указанные сценарии (можно несколько раз).')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--output', help='Куда записать результаты в JSON.')
+    parser.add_argument('--baseline', help='JSON прошлого прогона для сравнения.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Допустимый рост p50, доля (0.2 = 20%%).')
+    args = parser.parse_args(argv)
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+    from . import runner
+    from .scenarios import SCENARIOS
+
+    unknown = set(args.scenarios or []) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            results = runner.run(
+                scale=args.scale,
+                names=args.scenarios,
+                iterations=args.iterations,
+                warmup=args.warmup,
+                log=print,
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    if args.output:
+        runner.dump(results, args.output)
+    if args.baseline:
+        regressions = runner.compare(results, runner.load(args.baseline), args.threshold)
+        for regression in regressions:
+            print(f'РЕГРЕССИЯ {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
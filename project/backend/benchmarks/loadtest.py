@@ -0,0 +1,103 @@
+"""
+Нагрузочный прогон против запущенного сервера (например, из docker-compose):
+
+    python -m benchmarks.loadtest --url http://localhost:8000 \
+        --email user@example.com --password secret --concurrency 16 --duration 30
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .runner import dump, percentile
+
+ENDPOINTS = {
+    'documents.list': '/api/documents/documents/',
+    'files.list': '/api/documents/files/',
+    'account.me': '/api/account/me/',
+}
+
+
+def obtain_token(base_url, email, password):
+    request = urllib.request.Request(
+        base_url + '/api/account/token/',
+        data=json.dumps({'email': email, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)['access']
+
+
+def worker(url, token, deadline, timings, errors, lock):
+    headers = {'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'}
+    local_timings = []
+    local_errors = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                response.read()
+        except (urllib.error.URLError, OSError):
+            local_errors += 1
+            continue
+        local_timings.append(time.perf_counter() - start)
+    with lock:
+        timings.extend(local_timings)
+        errors.append(local_errors)
+
+
+def run_endpoint(base_url, path, token, concurrency, duration):
+    timings, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker, base_url + path, token, deadline, timings, errors, lock)
+    if not timings:
+        raise RuntimeError(f'{path}: ни одного успешного ответа')
+    return {
+        'iterations': len(timings),
+        'concurrency': concurrency,
+        'mean_ms': statistics.fmean(timings) * 1000,
+        'p50_ms': percentile(timings, 0.50) * 1000,
+        'p95_ms': percentile(timings, 0.95) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'max_ms': max(timings) * 1000,
+        'throughput_rps': len(timings) / duration,
+        'errors': sum(errors),
+        # По HTTP число запросов к БД не видно; поле нужно для compare()
+        'queries_per_request': 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='Секунд на каждый эндпоинт.')
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    base_url = args.url.rstrip('/')
+    token = obtain_token(base_url, args.email, args.password)
+    results = {}
+    for name, path in ENDPOINTS.items():
+        results[name] = run_endpoint(base_url, path, token, args.concurrency, args.duration)
+        result = results[name]
+        print(
+            f"{name:16} p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+            f"{result['throughput_rps']:8.1f} req/s  ошибок {result['errors']}"
+        )
+    if args.output:
+        dump({'meta': {'url': base_url, 'concurrency': args.concurrency}, 'scenarios': results}, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Сколько стоит браузерная часть MIDDLEWARE на запросах к API:
+
+    python -m benchmarks.middleware --scale tiny --iterations 500 --output middleware.json
+
+Сценарии account.me и documents.retrieve прогоняются дважды: со всем стеком
+(API_LEAN_MIDDLEWARE=False) и с пропуском сессий, CSRF, сообщений и
+X-Frame-Options для /api/. Разница медиан - экономия на запрос.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+SCENARIO_NAMES = ('account.me', 'documents.retrieve')
+MODES = (('full', False), ('lean', True))
+
+
+def run(scale='tiny', iterations=500, warmup=50, rounds=3):
+    from django.test.utils import override_settings
+    from .runner import measure
+    from .scenarios import SCENARIOS
+    from .seed import seed
+
+    data = seed(scale)
+    results = {}
+    for name in SCENARIO_NAMES:
+        entry = {mode: None for mode, _ in MODES}
+        # Режимы чередуются: прогрев кешей и дрейф частоты CPU не достаются одному из них
+        for _ in range(rounds):
+            for mode, lean in MODES:
+                with override_settings(API_LEAN_MIDDLEWARE=lean):
+                    result = measure(SCENARIOS[name](data), iterations, warmup)
+                if entry[mode] is None or result['p50_ms'] < entry[mode]['p50_ms']:
+                    entry[mode] = result
+        entry['saved_ms'] = entry['full']['p50_ms'] - entry['lean']['p50_ms']
+        results[name] = entry
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.middleware')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'docsStore.settings'))
+    parser.add_argument('--scale', default='tiny')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    import django
+    django.setup()
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+    from .runner import dump
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            results = run(args.scale, args.iterations, args.warmup, args.rounds)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    for name, entry in results.items():
+        print(
+            f"{name:20} весь стек {entry['full']['p50_ms']:7.3f} ms  "
+            f"API-стек {entry['lean']['p50_ms']:7.3f} ms  экономия {entry['saved_ms'] * 1000:7.1f} мкс"
+        )
+    if args.output:
+        dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
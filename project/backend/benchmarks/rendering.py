@@ -0,0 +1,101 @@
+"""
+Время рендеринга и размер ответа для страницы из 1000 документов:
+
+    python -m benchmarks.rendering --documents 1000 --output rendering.json
+
+Данные строятся через DocumentSerializer на несохранённых объектах,
+поэтому БД не нужна.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+
+def build_page(count):
+    from django.utils import timezone
+    from account.models import CustomUser
+    from documents.models import Category, Document
+    from documents.serializers import DocumentSerializer
+    from .seed import CATEGORIES, TITLES
+
+    now = timezone.now()
+    author = CustomUser(email='author@example.com', name='Author')
+    categories = [Category(name=name) for name in CATEGORIES]
+    documents = [
+        Document(
+            id=uuid.uuid4(),
+            title=TITLES[i % len(TITLES)],
+            slug=f'document-{i}',
+            description='Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * (1 + i % 4),
+            category=categories[i % len(categories)],
+            created_by=author,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+    return DocumentSerializer(documents, many=True).data
+
+
+def timed(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def run(count=1000, repeat=20):
+    from rest_framework.renderers import JSONRenderer
+    from docsStore import middleware
+    from docsStore.renderers import MessagePackRenderer, ORJSONRenderer
+
+    serialize_ms, page = timed(lambda: build_page(count), max(1, repeat // 4))
+    renderers = {
+        'drf-json': JSONRenderer(),
+        'orjson': ORJSONRenderer(),
+        'msgpack': MessagePackRenderer(),
+    }
+    results = {'documents': count, 'serialize_ms': serialize_ms, 'renderers': {}}
+    for name, renderer in renderers.items():
+        render_ms, body = timed(lambda: renderer.render(page), repeat)
+        entry = {'render_ms': render_ms, 'bytes': len(body), 'compression': {}}
+        for coding, compress in middleware.available_encodings():
+            compress_ms, compressed = timed(lambda: compress(body), repeat)
+            entry['compression'][coding] = {'compress_ms': compress_ms, 'bytes': len(compressed)}
+        results['renderers'][name] = entry
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.rendering')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'docsStore.settings'))
+    parser.add_argument('--documents', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    import django
+    django.setup()
+    from .runner import dump
+
+    results = run(args.documents, args.repeat)
+    print(f"Сериализация {args.documents} документов: {results['serialize_ms']:.1f} ms")
+    for name, entry in results['renderers'].items():
+        print(f"{name:10} рендер {entry['render_ms']:7.2f} ms  {entry['bytes']:>9} байт")
+        for coding, compressed in entry['compression'].items():
+            print(f"{'':10} {coding:5} {compressed['compress_ms']:7.2f} ms  {compressed['bytes']:>9} байт")
+    if args.output:
+        dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from django.db import connection
+
+from .scenarios import SCENARIOS
+from .seed import seed
+
+
+class QueryCounter:
+    """Считает запросы и время в БД через execute_wrapper, без DEBUG-курсора."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(scenario, iterations, warmup=0):
+    scenario.setup(iterations + warmup)
+    for i in range(warmup):
+        scenario.request(iterations + i)
+
+    timings = []
+    queries = []
+    db_time = 0.0
+    response_bytes = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = scenario.request(i)
+            timings.append(time.perf_counter() - start)
+        if response.status_code != scenario.expected_status:
+            raise RuntimeError(
+                f'{scenario.name}: ожидался статус {scenario.expected_status}, '
+                f'получен {response.status_code}: {response.content[:200]!r}'
+            )
+        queries.append(counter.count)
+        db_time += counter.duration
+        response_bytes += len(response.content)
+    total = time.perf_counter() - started
+
+    return {
+        'iterations': iterations,
+        'mean_ms': statistics.fmean(timings) * 1000,
+        'p50_ms': percentile(timings, 0.50) * 1000,
+        'p95_ms': percentile(timings, 0.95) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'max_ms': max(timings) * 1000,
+        'throughput_rps': iterations / total if total else 0.0,
+        'queries_per_request': statistics.fmean(queries),
+        'max_queries': max(queries),
+        'db_ms_per_request': db_time / iterations * 1000,
+        'response_bytes': response_bytes // iterations,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale='small', names=None, iterations=50, warmup=5, log=None):
+    """Засевает данные и прогоняет сценарии. БД должна быть пустой и готовой."""
+    names = names or list(SCENARIOS)
+    seed_started = time.perf_counter()
+    data = seed(scale)
+    if log:
+        log(f'Данные ({scale}) засеяны за {time.perf_counter() - seed_started:.1f} с')
+
+    results = {}
+    for name in names:
+        results[name] = measure(SCENARIOS[name](data), iterations, warmup)
+        if log:
+            result = results[name]
+            log(
+                f"{name:24} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                f"{result['throughput_rps']:8.1f} req/s  {result['queries_per_request']:5.1f} queries"
+            )
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'scale': scale,
+            'iterations': iterations,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """
+    Сравнивает прогон с базовым. Регрессия - рост p50 больше чем на threshold
+    или рост числа запросов к БД. Возвращает список описаний регрессий.
+    """
+    regressions = []
+    for name, result in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        if result['p50_ms'] > base['p50_ms'] * (1 + threshold):
+            regressions.append(
+                f"{name}: p50 {base['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms "
+                f"(+{(result['p50_ms'] / base['p50_ms'] - 1) * 100:.0f}%)"
+            )
+        if result['queries_per_request'] > base['queries_per_request']:
+            regressions.append(
+                f"{name}: запросов к БД {base['queries_per_request']:.1f} -> {result['queries_per_request']:.1f}"
+            )
+    return regressions
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump(results, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,137 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .seed import PASSWORD, TITLES
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def decorator(cls):
+        cls.name = name
+        SCENARIOS[name] = cls
+        return cls
+    return decorator
+
+
+class Scenario:
+    """
+    Один измеряемый запрос. setup() вызывается один раз до замеров,
+    request(i) - на каждой итерации и должен вернуть ответ клиента.
+    """
+    name = None
+    expected_status = 200
+
+    def __init__(self, data):
+        self.data = data
+        self.user = data['user']
+        self.client = APIClient()
+
+    def authenticate(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def setup(self, iterations):
+        self.authenticate()
+
+    def request(self, i):
+        raise NotImplementedError
+
+
+@scenario('documents.list')
+class DocumentList(Scenario):
+    def request(self, i):
+        return self.client.get(reverse('documents:document-list'))
+
+
+@scenario('documents.list.compressed')
+class DocumentListCompressed(Scenario):
+    def request(self, i):
+        return self.client.get(reverse('documents:document-list'), HTTP_ACCEPT_ENCODING='zstd, br, gzip')
+
+
+@scenario('documents.list.msgpack')
+class DocumentListMessagePack(Scenario):
+    def request(self, i):
+        return self.client.get(reverse('documents:document-list'), HTTP_ACCEPT='application/msgpack')
+
+
+@scenario('documents.retrieve')
+class DocumentRetrieve(Scenario):
+    def setup(self, iterations):
+        super().setup(iterations)
+        self.slugs = [document.slug for document in self.data['user_documents']]
+
+    def request(self, i):
+        slug = self.slugs[i % len(self.slugs)]
+        return self.client.get(reverse('documents:document-detail', args=[slug]))
+
+
+@scenario('documents.create')
+class DocumentCreate(Scenario):
+    expected_status = 201
+
+    def request(self, i):
+        # Повторяющиеся заголовки: нагружаем подбор уникального slug
+        payload = {'title': TITLES[i % len(TITLES)], 'description': 'Benchmark', 'category': 'Reports'}
+        return self.client.post(reverse('documents:document-list'), payload)
+
+
+@scenario('files.upload')
+class FileUpload(Scenario):
+    expected_status = 201
+    content = b'%PDF-1.4\n' + b'0' * 100 * 1024
+
+    def setup(self, iterations):
+        super().setup(iterations)
+        self.document_ids = [str(document.id) for document in self.data['user_documents']]
+
+    def request(self, i):
+        payload = {
+            'document': self.document_ids[i % len(self.document_ids)],
+            'file': SimpleUploadedFile(f'upload-{i}.pdf', self.content, content_type='application/pdf'),
+        }
+        return self.client.post(reverse('documents:documentfile-list'), payload, format='multipart')
+
+
+@scenario('files.batch')
+class FileBatchUpload(FileUpload):
+    """Те же файлы, что в files.upload, но batch_size штук одним запросом."""
+    batch_size = 20
+
+    def request(self, i):
+        payload = {
+            'document': self.document_ids[i % len(self.document_ids)],
+            'files': [
+                SimpleUploadedFile(f'batch-{i}-{n}.pdf', self.content, content_type='application/pdf')
+                for n in range(self.batch_size)
+            ],
+        }
+        return self.client.post(reverse('documents:documentfile-batch'), payload, format='multipart')
+
+
+@scenario('account.me')
+class AccountMe(Scenario):
+    def request(self, i):
+        return self.client.get(reverse('account:me'))
+
+
+@scenario('account.token_obtain')
+class TokenObtain(Scenario):
+    def setup(self, iterations):
+        pass
+
+    def request(self, i):
+        payload = {'email': self.user.email, 'password': PASSWORD}
+        return self.client.post(reverse('account:token_obtain_pair'), payload)
+
+
+@scenario('account.token_refresh')
+class TokenRefresh(Scenario):
+    def setup(self, iterations):
+        # Refresh-токены ротируются и попадают в blacklist: на каждую итерацию свой
+        self.tokens = [str(RefreshToken.for_user(self.user)) for _ in range(iterations)]
+
+    def request(self, i):
+        return self.client.post(reverse('account:token_refresh'), {'refresh': self.tokens[i]})
@@ -0,0 +1,96 @@
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.utils.text import slugify
+
+from account.models import CustomUser
+from documents.models import Category, CategoryCount, Document, DocumentAccess, DocumentFile
+
+SCALES = {
+    'tiny': {'users': 3, 'documents': 30, 'files': 60},
+    'small': {'users': 20, 'documents': 1000, 'files': 2000},
+    'medium': {'users': 200, 'documents': 20000, 'files': 50000},
+    'large': {'users': 1000, 'documents': 200000, 'files': 500000},
+}
+
+# Небольшой набор заголовков: slug-и сталкиваются, как в реальных данных
+TITLES = [
+    'Annual Report', 'Invoice', 'Contract', 'Scan', 'Meeting Notes',
+    'Purchase Order', 'Tax Return', 'Payroll', 'Specification', 'Offer',
+]
+CATEGORIES = ['Reports', 'Contracts', 'Invoices', 'Others']
+
+PASSWORD = 'BenchPass123'
+BATCH_SIZE = 2000
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def seed(scale='small', rng=None):
+    """
+    Засевает пользователей, документы с повторяющимися заголовками и файлы.
+    Возвращает dict с созданными пользователями и документами для сценариев.
+    """
+    counts = SCALES[scale]
+    rng = rng or random.Random(42)
+    password = make_password(PASSWORD)  # хешируем один раз, а не на каждого
+
+    users = CustomUser.objects.bulk_create(
+        CustomUser(email=f'bench{i}@example.com', name=f'Bench {i}', password=password)
+        for i in range(counts['users'])
+    )
+
+    categories = [Category.objects.named(name) for name in CATEGORIES]
+    slug_counters = {}
+    documents = []
+
+    def make_document():
+        title = rng.choice(TITLES)
+        base = slugify(title)
+        counter = slug_counters.get(base, 0)
+        slug_counters[base] = counter + 1
+        return Document(
+            title=title,
+            slug=base if counter == 0 else f'{base}-{counter}',
+            description='Lorem ipsum dolor sit amet. ' * rng.randint(1, 8),
+            category=rng.choice(categories),
+            created_by=rng.choice(users),
+        )
+
+    for batch in _batched((make_document() for _ in range(counts['documents'])), BATCH_SIZE):
+        documents.extend(Document.objects.bulk_create(batch))
+        DocumentAccess.objects.bulk_create(
+            DocumentAccess(document=document, user_id=document.created_by_id, can_write=True)
+            for document in batch
+        )
+
+    def make_file(i):
+        document = rng.choice(documents)
+        return DocumentFile(
+            document=document,
+            file=f'documents/{document.id}/scan-{i}.pdf',
+            uploaded_by_id=document.created_by_id,
+        )
+
+    for batch in _batched((make_file(i) for i in range(counts['files'])), BATCH_SIZE):
+        DocumentFile.objects.bulk_create(batch)
+    # bulk_create обходит Document.save(), счётчики категорий считаем разом
+    CategoryCount.objects.recount()
+
+    # Самый "тяжёлый" пользователь - тот, у кого больше всего документов
+    owner_counts = {}
+    for document in documents:
+        owner_counts[document.created_by_id] = owner_counts.get(document.created_by_id, 0) + 1
+    heavy_user_id = max(owner_counts, key=owner_counts.get)
+    heavy_user = next(user for user in users if user.pk == heavy_user_id)
+    return {
+        'users': users,
+        'documents': documents,
+        'user': heavy_user,
+        'user_documents': [d for d in documents if d.created_by_id == heavy_user_id],
+    }
@@ -0,0 +1,119 @@
+"""
+Экономия места и накладные расходы чтения у хранилища со сжатием:
+
+    python -m benchmarks.storage --size-mb 8 --output storage.json
+
+Один и тот же набор файлов пишется в FileSystemStorage и в
+CompressedFileSystemStorage во временные каталоги, затем замеряются запись,
+полное чтение и чтение случайных диапазонов (как при HTTP Range).
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def sample_files(size):
+    """Текст с повторами (как выгрузки и отчёты) и несжимаемый бинарный файл."""
+    line = b'2024-01-01;ACME Corp;invoice;quarterly report;amount=1000.00;status=paid\n'
+    text = b''.join(line.replace(b'1000', str(i % 9973).encode()) for i in range(size // len(line) + 1))
+    return {
+        'report.pdf': text[:size],
+        'scan.bin': os.urandom(size),
+    }
+
+
+def timed(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def measure(storage, name, content, repeat, ranges):
+    from django.core.files.base import ContentFile
+
+    def write():
+        if storage.exists(name):
+            storage.delete(name)
+        return storage.save(name, ContentFile(content))
+
+    def read_all():
+        with storage.open(name) as handle:
+            return len(handle.read())
+
+    def read_ranges():
+        with storage.open(name) as handle:
+            for offset in ranges:
+                handle.seek(offset)
+                handle.read(64 * 1024)
+
+    write_ms, stored_name = timed(write, repeat)
+    read_ms, _ = timed(read_all, repeat)
+    range_ms, _ = timed(read_ranges, repeat)
+    stored = os.path.getsize(storage.path(stored_name))
+    return {
+        'bytes': len(content),
+        'stored_bytes': stored,
+        'write_ms': write_ms,
+        'read_ms': read_ms,
+        'range_read_ms': range_ms,
+    }
+
+
+def run(size=8 * 1024 * 1024, repeat=5, range_reads=50):
+    from django.core.files.storage import FileSystemStorage
+    from documents.storage import CompressedFileSystemStorage
+
+    files = sample_files(size)
+    rng = random.Random(0)
+    ranges = [rng.randrange(max(size - 64 * 1024, 1)) for _ in range(range_reads)]
+    results = {'size': size, 'range_reads': range_reads, 'files': {}}
+    with tempfile.TemporaryDirectory() as plain_dir, tempfile.TemporaryDirectory() as zstd_dir:
+        backends = {
+            'plain': FileSystemStorage(location=plain_dir),
+            'zstd': CompressedFileSystemStorage(location=zstd_dir),
+        }
+        for name, content in files.items():
+            results['files'][name] = {
+                backend: measure(storage, name, content, repeat, ranges)
+                for backend, storage in backends.items()
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.storage')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'docsStore.settings'))
+    parser.add_argument('--size-mb', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--range-reads', type=int, default=50)
+    parser.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    import django
+    django.setup()
+    from .runner import dump
+
+    results = run(args.size_mb * 1024 * 1024, args.repeat, args.range_reads)
+    for name, backends in results['files'].items():
+        print(name)
+        for backend, entry in backends.items():
+            print(
+                f"  {backend:6} на диске {entry['stored_bytes']:>10} байт  запись {entry['write_ms']:8.2f} ms  "
+                f"чтение {entry['read_ms']:8.2f} ms  {results['range_reads']} диапазонов {entry['range_read_ms']:8.2f} ms"
+            )
+    if args.output:
+        dump(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import pytest
+from django.test import override_settings
+from benchmarks import runner
+from documents.models import Document
+
+
+def result(p50, queries):
+    return {'p50_ms': p50, 'queries_per_request': queries}
+
+
+def test_compare_detects_latency_regression():
+    """Рост p50 выше порога считается регрессией"""
+    baseline = {'scenarios': {'documents.list': result(10.0, 2)}}
+    current = {'scenarios': {'documents.list': result(12.5, 2)}}
+
+    assert runner.compare(current, baseline, threshold=0.2)
+    assert not runner.compare(current, baseline, threshold=0.3)
+
+
+def test_compare_detects_query_regression():
+    """Рост числа запросов к БД - регрессия даже без роста времени"""
+    baseline = {'scenarios': {'documents.list': result(10.0, 2)}}
+    current = {'scenarios': {'documents.list': result(9.0, 3)}}
+
+    assert runner.compare(current, baseline) == ['documents.list: запросов к БД 2.0 -> 3.0']
+
+
+def test_compare_ignores_new_scenarios():
+    """Сценарии, которых нет в базовом прогоне, не сравниваются"""
+    current = {'scenarios': {'documents.list': result(10.0, 2)}}
+
+    assert runner.compare(current, {'scenarios': {}}) == []
+
+
+@pytest.mark.django_db
+def test_run_tiny_scale(tmp_path):
+    """Прогон на крошечном объёме засевает данные и возвращает метрики"""
+    with override_settings(MEDIA_ROOT=tmp_path):
+        results = runner.run(
+            scale='tiny',
+            names=['documents.list', 'documents.create', 'account.token_refresh'],
+            iterations=3,
+            warmup=1,
+        )
+
+    assert Document.objects.count() >= 30
+    assert set(results['scenarios']) == {'documents.list', 'documents.create', 'account.token_refresh'}
+    listing = results['scenarios']['documents.list']
+    assert listing['iterations'] == 3
+    assert listing['queries_per_request'] >= 1
+    assert listing['p50_ms'] <= listing['max_ms']
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def audit_sync(settings):
+    """Журнал доступа в тестах пишется сразу, без фонового потока."""
+    settings.AUDIT_ASYNC = False
@@ -0,0 +1,120 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Реплика, выбранная ReplicaRoutingMiddleware на время безопасного запроса;
+# None - чтения идут на default
+_replica = ContextVar('replica', default=None)
+
+# {alias: (время проверки, отставание в секундах или None)}
+_lag_cache = {}
+_lag_lock = threading.Lock()
+
+POSTGRES_LAG_SQL = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+@contextmanager
+def read_from_replicas():
+    """
+    Чтения внутри блока могут уйти на реплику. Реплика выбирается одна на весь
+    блок: у реплик разное отставание, и чтения одного запроса (список и его
+    prefetch) с разных реплик могли бы видеть несогласованные данные.
+    """
+    replicas = healthy_replicas()
+    token = _replica.set(random.choice(replicas) if replicas else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def replica_lag(alias):
+    """
+    Отставание реплики в секундах; None - реплика недоступна.
+    Не-PostgreSQL базы (например, SQLite-алиасы для локальной проверки) считаются синхронными.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        logger.warning('Реплика %s недоступна', alias, exc_info=True)
+        return None
+    return float(lag or 0)
+
+
+def cached_replica_lag(alias):
+    """Отставание, проверяемое не чаще раза в REPLICA_LAG_CHECK_SECONDS на процесс."""
+    now = time.monotonic()
+    with _lag_lock:
+        checked = _lag_cache.get(alias)
+    if checked is not None and now - checked[0] < settings.REPLICA_LAG_CHECK_SECONDS:
+        return checked[1]
+    lag = replica_lag(alias)
+    with _lag_lock:
+        _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def healthy_replicas():
+    """Реплики, отстающие не больше REPLICA_MAX_LAG_SECONDS."""
+    healthy = []
+    for alias in settings.DATABASE_REPLICAS:
+        lag = cached_replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS:
+            healthy.append(alias)
+    return healthy
+
+
+def _pin_key(identity):
+    return 'db-pin:' + sha256(identity.encode()).hexdigest()
+
+
+def pin_to_primary(identity):
+    """После записи читаем свои данные с основной базы REPLICA_PIN_SECONDS секунд."""
+    if identity:
+        cache.set(_pin_key(identity), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(identity):
+    return bool(identity) and cache.get(_pin_key(identity), False)
+
+
+class ReplicaRouter:
+    """
+    Запись и миграции - на default. Чтения безопасных запросов - на исправную
+    реплику, выбранную для запроса в read_from_replicas(), если пользователь
+    не закреплён за основной базой и на default не открыта транзакция.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = _replica.get()
+        if replica is None or connections['default'].in_atomic_block:
+            return None
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,213 @@
+import gzip
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import patch_vary_headers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .db_router import is_pinned, pin_to_primary, read_from_replicas
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+def _gzip(content):
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+
+def _brotli(content):
+    # Качество 4: почти как gzip по скорости, заметно плотнее
+    return brotli.compress(content, quality=4)
+
+
+def _zstd(content):
+    return zstandard.ZstdCompressor(level=3).compress(content)
+
+
+def available_encodings():
+    """Поддерживаемые кодировки в порядке предпочтения сервера."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append(('zstd', _zstd))
+    if brotli is not None:
+        encodings.append(('br', _brotli))
+    encodings.append(('gzip', _gzip))
+    return encodings
+
+
+def parse_accept_encoding(header):
+    """'gzip, br;q=0.8, zstd;q=0' -> {'gzip': 1.0, 'br': 0.8, 'zstd': 0.0}"""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best = None
+    for coding, compress in available_encodings():
+        quality = accepted.get(coding, wildcard)
+        if quality > 0 and (best is None or quality > best[0]):
+            best = (quality, coding, compress)
+    return best[1:] if best else (None, None)
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы zstd, brotli или gzip - что поддерживает клиент
+    (Accept-Encoding) и что установлено на сервере. Ответы меньше
+    COMPRESSION_MIN_SIZE байт и потоковые ответы не сжимаются.
+
+    Сжимаются только ответы API_PATH_PREFIXES: API авторизуется заголовком
+    и не кладёт секретов в тело. HTML админки несёт CSRF-токен рядом с
+    отражённым вводом, и его сжатие открыло бы атаку BREACH.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.compress(request, response)
+
+    def compress(self, request, response):
+        if not request.path_info.startswith(settings.API_PATH_PREFIXES):
+            return response
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        coding, compress = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if coding is None:
+            return response
+        compressed = compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = coding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # Сжатое тело уже не побайтно то же самое
+            response.headers['ETag'] = 'W/' + etag
+        return response
+
+
+def request_identity(request):
+    """
+    Кто делает запрос - до аутентификации DRF, без запросов к базе:
+    id пользователя из проверенного JWT или ключ сессии.
+    """
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        try:
+            token = AccessToken(header[len('Bearer '):].strip())
+        except TokenError:
+            return None
+        return f'user:{token.get(jwt_settings.USER_ID_CLAIM)}'
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        return f'session:{session_key}'
+    return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    GET/HEAD/OPTIONS читают с реплик (см. docsStore.db_router).
+    После успешной записи пользователь на REPLICA_PIN_SECONDS закрепляется
+    за основной базой, чтобы сразу видеть свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        identity = request_identity(request)
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            if is_pinned(identity):
+                return self.get_response(request)
+            with read_from_replicas():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if response.status_code < 400:
+            pin_to_primary(identity)
+        return response
+
+
+def is_api_request(request):
+    """Запрос к API с JWT: сессии, CSRF, сообщения и X-Frame-Options ему не нужны."""
+    return settings.API_LEAN_MIDDLEWARE and request.path_info.startswith(settings.API_PATH_PREFIXES)
+
+
+class ApiExemptMixin:
+    """
+    Стандартный middleware, который пропускает запросы к API без обработки.
+    Остаётся в MIDDLEWARE подклассом оригинала, поэтому проверки админки
+    (admin.E408-E410) и браузерные страницы работают как раньше.
+    """
+
+    def __call__(self, request):
+        if not self.async_mode and is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if is_api_request(request):
+            return await self.get_response(request)
+        return await super().__acall__(request)
+
+
+class ApiExemptSessionMiddleware(ApiExemptMixin, SessionMiddleware):
+    pass
+
+
+class ApiExemptCsrfViewMiddleware(ApiExemptMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class ApiExemptAuthenticationMiddleware(ApiExemptMixin, AuthenticationMiddleware):
+    pass
+
+
+class ApiExemptMessageMiddleware(ApiExemptMixin, MessageMiddleware):
+    pass
+
+
+class ApiExemptXFrameOptionsMiddleware(ApiExemptMixin, XFrameOptionsMiddleware):
+    pass
@@ -0,0 +1,45 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Ниже этого порога оценка неточна, а точный COUNT(*) дешёвый
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimated_count(queryset):
+    """
+    Оценка числа строк по статистике PostgreSQL: reltuples таблицы для
+    запроса без условий, иначе оценка планировщика из EXPLAIN.
+    None для других СУБД.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1: таблица ещё не анализировалась (или секционирована), тогда - EXPLAIN
+            if row and row[0] >= 0:
+                return row[0]
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        # psycopg2 сам разбирает json-результат EXPLAIN
+        return int(cursor.fetchone()[0][0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для больших таблиц в админке: COUNT(*) по миллионам строк
+    заменяется оценкой из статистики, точный подсчёт - только для малых выборок.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
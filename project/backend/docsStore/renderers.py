@@ -0,0 +1,71 @@
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.exceptions import ParseError
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson в requirements, но рендерер работает и без него
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+# Тот же default, что у JSONRenderer DRF: даты, UUID, Decimal, lazy-строки и т.п.
+_drf_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON через orjson: в разы быстрее стандартного json на больших списках.
+    Результат совпадает с JSONRenderer DRF; для ответов с отступами
+    (browsable API, ?indent) и без orjson используется рендерер DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=_drf_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        # Как и DRF, экранируем U+2028/U+2029, чтобы JSON был валидным JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+def _msgpack_default(obj):
+    value = _drf_default(obj)
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack для внутренних клиентов: Accept: application/msgpack."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except Exception as exc:
+            raise ParseError(f'Некорректный MessagePack: {exc}')
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
@@ -44,18 +45,30 @@ INSTALLED_APPS = [
     
     'account',  # Custom user app
     'documents',
+    'monitoring',
+    'audit',
+    'webhooks',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.InstrumentationMiddleware',  # первым: замеряет весь стек
+    'monitoring.middleware.SamplingProfilerMiddleware',
+    'docsStore.middleware.CompressionMiddleware',
+    'docsStore.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Сессии, CSRF, пользователь из сессии, сообщения и X-Frame-Options нужны
+    # только админке: запросы к API_PATH_PREFIXES проходят их насквозь
+    'docsStore.middleware.ApiExemptSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'docsStore.middleware.ApiExemptCsrfViewMiddleware',
+    'docsStore.middleware.ApiExemptAuthenticationMiddleware',
+    'docsStore.middleware.ApiExemptMessageMiddleware',
+    'docsStore.middleware.ApiExemptXFrameOptionsMiddleware',
 ]
 
+API_LEAN_MIDDLEWARE = config('API_LEAN_MIDDLEWARE', default=True, cast=bool)
+API_PATH_PREFIXES = ('/api/',)
+
 ROOT_URLCONF = 'docsStore.urls'
 
 TEMPLATES = [
@@ -90,6 +103,27 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: POSTGRES_REPLICA_HOSTS=replica1:5432,replica2:5432
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, config('POSTGRES_REPLICA_HOSTS', default='').split(','))):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['docsStore.db_router.ReplicaRouter']
+# Сколько секунд после своей записи пользователь читает с основной базы.
+# Закрепление хранится в кеше: при нескольких процессах нужен общий CACHES (Redis, Memcached).
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+# Реплика с большим отставанием не используется, пока не догонит
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=2, cast=float)
+REPLICA_LAG_CHECK_SECONDS = config('REPLICA_LAG_CHECK_SECONDS', default=5, cast=float)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,6 +178,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'docsStore.renderers.ORJSONRenderer',
+        *(('docsStore.renderers.MessagePackRenderer',) if find_spec('msgpack') else ()),
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        *(('docsStore.renderers.MessagePackParser',) if find_spec('msgpack') else ()),
+    ),
 }
 
 
@@ -159,3 +204,85 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
 }
+
+
+# Удаление документов: пометка + фоновая очистка файлов пачками
+DOCUMENTS_PURGE_ASYNC = config('DOCUMENTS_PURGE_ASYNC', default=True, cast=bool)
+DOCUMENTS_PURGE_BATCH_SIZE = config('DOCUMENTS_PURGE_BATCH_SIZE', default=500, cast=int)
+
+# Пакетная загрузка файлов: потоков записи в хранилище на процесс и файлов на запрос
+DOCUMENTS_UPLOAD_WORKERS = config('DOCUMENTS_UPLOAD_WORKERS', default=4, cast=int)
+DOCUMENTS_BATCH_MAX_FILES = config('DOCUMENTS_BATCH_MAX_FILES', default=100, cast=int)
+
+# Хранилище вложений: сжатие zstd кусками, чтобы Range-запросы не распаковывали весь файл
+DOCUMENTS_STORAGE_COMPRESSION = config('DOCUMENTS_STORAGE_COMPRESSION', default=True, cast=bool)
+STORAGES = {
+    'default': {
+        'BACKEND': (
+            'documents.storage.CompressedFileSystemStorage'
+            if DOCUMENTS_STORAGE_COMPRESSION
+            else 'django.core.files.storage.FileSystemStorage'
+        ),
+        'OPTIONS': {
+            'level': config('DOCUMENTS_STORAGE_ZSTD_LEVEL', default=3, cast=int),
+            'chunk_size': config('DOCUMENTS_STORAGE_CHUNK_SIZE', default=256 * 1024, cast=int),
+        } if DOCUMENTS_STORAGE_COMPRESSION else {},
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Предупреждения о дубликатах при загрузке: сколько показывать и порог
+# расстояния Хэмминга между перцептивными хешами (не больше 6, нужен Pillow)
+DOCUMENTS_DUPLICATE_LIMIT = config('DOCUMENTS_DUPLICATE_LIMIT', default=10, cast=int)
+DOCUMENTS_NEAR_DUPLICATE_DISTANCE = config('DOCUMENTS_NEAR_DUPLICATE_DISTANCE', default=6, cast=int)
+
+# Push-уведомления об изменениях (SSE, только под ASGI):
+# local - в пределах процесса, postgres - между процессами через LISTEN/NOTIFY
+DOCUMENTS_EVENTS_BACKEND = config('DOCUMENTS_EVENTS_BACKEND', default='local')
+DOCUMENTS_EVENTS_HEARTBEAT = config('DOCUMENTS_EVENTS_HEARTBEAT', default=15, cast=int)
+# Сколько секунд годен билет на подключение к потоку (POST events/ticket/)
+DOCUMENTS_EVENTS_TICKET_TTL = config('DOCUMENTS_EVENTS_TICKET_TTL', default=60, cast=int)
+
+# Массовый импорт пользователей: процессов для хеширования паролей (0 - в текущем процессе)
+ACCOUNT_IMPORT_WORKERS = config('ACCOUNT_IMPORT_WORKERS', default=4, cast=int)
+
+# Журнал доступа (audit): фоновая запись пачками по размеру или по времени.
+# Очередь на AUDIT_MAX_PENDING событий; при переполнении запрос ждёт до AUDIT_BLOCK_TIMEOUT секунд
+AUDIT_ASYNC = config('AUDIT_ASYNC', default=True, cast=bool)
+AUDIT_FLUSH_SIZE = config('AUDIT_FLUSH_SIZE', default=500, cast=int)
+AUDIT_FLUSH_INTERVAL = config('AUDIT_FLUSH_INTERVAL', default=1.0, cast=float)
+AUDIT_MAX_PENDING = config('AUDIT_MAX_PENDING', default=10000, cast=int)
+AUDIT_BLOCK_TIMEOUT = config('AUDIT_BLOCK_TIMEOUT', default=5.0, cast=float)
+
+# Webhooks: события пишутся в outbox в транзакции изменения, доставляет deliver_webhooks.
+# Повтор через RETRY_BASE * 2**(попытка-1) секунд (не больше RETRY_MAX), после MAX_ATTEMPTS - dead
+WEBHOOKS_BATCH_SIZE = config('WEBHOOKS_BATCH_SIZE', default=100, cast=int)
+WEBHOOKS_CONCURRENCY = config('WEBHOOKS_CONCURRENCY', default=8, cast=int)
+WEBHOOKS_TIMEOUT = config('WEBHOOKS_TIMEOUT', default=10.0, cast=float)
+WEBHOOKS_MAX_ATTEMPTS = config('WEBHOOKS_MAX_ATTEMPTS', default=8, cast=int)
+WEBHOOKS_RETRY_BASE_SECONDS = config('WEBHOOKS_RETRY_BASE_SECONDS', default=30, cast=int)
+WEBHOOKS_RETRY_MAX_SECONDS = config('WEBHOOKS_RETRY_MAX_SECONDS', default=3600, cast=int)
+# Сколько секунд захваченные воркером события не выдаются другим воркерам
+WEBHOOKS_LEASE_SECONDS = config('WEBHOOKS_LEASE_SECONDS', default=120, cast=int)
+# Доставка на localhost и частные сети (иначе endpoint мог бы ходить во внутреннюю сеть)
+WEBHOOKS_ALLOW_PRIVATE_NETWORKS = config('WEBHOOKS_ALLOW_PRIVATE_NETWORKS', default=False, cast=bool)
+
+# Квота хранилища пользователя по умолчанию, байт (1 GB)
+DEFAULT_STORAGE_QUOTA = config('DEFAULT_STORAGE_QUOTA', default=1024 ** 3, cast=int)
+
+
+# Метрики и лог медленных запросов (monitoring)
+MONITORING_SLOW_REQUEST_MS = config('MONITORING_SLOW_REQUEST_MS', default=500, cast=int)
+MONITORING_ALLOWED_IPS = config('MONITORING_ALLOWED_IPS', default='127.0.0.1,::1').split(',')
+MONITORING_TOKEN = config('MONITORING_TOKEN', default='')
+
+# Семплирующий профайлер: доля запросов и/или заголовок X-Profile: <токен>
+PROFILER_SAMPLE_RATE = config('PROFILER_SAMPLE_RATE', default=0.0, cast=float)
+PROFILER_HEADER_TOKEN = config('PROFILER_HEADER_TOKEN', default='')
+PROFILER_INTERVAL_MS = config('PROFILER_INTERVAL_MS', default=5, cast=float)
+PROFILER_MAX_STORED = config('PROFILER_MAX_STORED', default=500, cast=int)
+
+# Сжатие ответов (zstd/brotli/gzip по Accept-Encoding)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
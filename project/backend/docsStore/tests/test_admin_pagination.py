@@ -0,0 +1,40 @@
+import pytest
+from django.urls import reverse
+from account.models import CustomUser
+from docsStore import pagination
+from documents.models import Category, Document, DocumentFile
+
+
+@pytest.fixture
+def superuser():
+    return CustomUser.objects.create_superuser('admin@example.com', 'Testpass123')
+
+
+@pytest.mark.django_db
+def test_admin_changelists_render(client, superuser):
+    """Списки документов, файлов и пользователей открываются, поиск точный"""
+    document = Document.objects.create(title='Report', category=Category.objects.named('General'), created_by=superuser)
+    document_file = DocumentFile.objects.create(document=document, file='documents/report.pdf', sha256='a' * 64)
+    client.force_login(superuser)
+
+    for name in ('documents_document', 'documents_documentfile', 'account_customuser'):
+        assert client.get(reverse(f'admin:{name}_changelist')).status_code == 200
+    assert client.get(reverse('admin:documents_documentfile_change', args=[document_file.pk])).status_code == 200
+    assert client.get(reverse('admin:account_customuser_change', args=[superuser.pk])).status_code == 200
+
+    found = client.get(reverse('admin:documents_document_changelist'), {'q': document.slug})
+    missed = client.get(reverse('admin:documents_document_changelist'), {'q': document.slug[:3]})
+    assert found.context['cl'].result_count == 1
+    assert missed.context['cl'].result_count == 0
+
+
+@pytest.mark.django_db
+def test_paginator_uses_estimate_for_large_tables(superuser, monkeypatch):
+    """Оценка подменяет COUNT(*) только выше порога, без статистики считается точно"""
+    queryset = CustomUser.objects.order_by('pk')
+    assert pagination.estimated_count(queryset) is None  # не PostgreSQL
+    assert pagination.EstimatedCountPaginator(queryset, 10).count == 1
+
+    monkeypatch.setattr(pagination, 'estimated_count', lambda queryset: 2_000_000)
+    paginator = pagination.EstimatedCountPaginator(queryset, 100)
+    assert (paginator.count, paginator.num_pages) == (2_000_000, 20_000)
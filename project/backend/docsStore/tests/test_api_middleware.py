@@ -0,0 +1,45 @@
+import pytest
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from account.models import CustomUser
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='lean@example.com', password='Testpass123')
+
+
+@pytest.mark.django_db
+def test_api_requests_skip_browser_middleware(user, settings):
+    """Запросы к API не трогают сессию и не получают X-Frame-Options"""
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    response = client.get(reverse('account:me'))
+    assert response.status_code == 200
+    assert 'X-Frame-Options' not in response
+    assert not hasattr(response.wsgi_request, 'session')
+
+    settings.API_LEAN_MIDDLEWARE = False
+    response = client.get(reverse('account:me'))
+    assert response['X-Frame-Options'] == 'DENY'
+    assert hasattr(response.wsgi_request, 'session')
+
+
+@pytest.mark.django_db
+def test_admin_keeps_full_stack():
+    """Админка по-прежнему работает через сессии и проверяет CSRF"""
+    CustomUser.objects.create_superuser('admin@example.com', 'Testpass123')
+    client = Client(enforce_csrf_checks=True)
+    login_url = reverse('admin:login')
+
+    page = client.get(login_url)
+    assert page['X-Frame-Options'] == 'DENY'
+    assert client.post(login_url, {'username': 'admin@example.com', 'password': 'Testpass123'}).status_code == 403
+
+    token = page.cookies['csrftoken'].value
+    response = client.post(login_url, {
+        'username': 'admin@example.com', 'password': 'Testpass123', 'csrfmiddlewaretoken': token,
+    })
+    assert response.status_code == 302
+    assert client.get(reverse('admin:index')).status_code == 200
@@ -0,0 +1,101 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from docsStore import db_router
+from docsStore.db_router import ReplicaRouter, read_from_replicas
+from docsStore.middleware import ReplicaRoutingMiddleware
+
+REPLICAS = ['replica_0', 'replica_1']
+
+
+@pytest.fixture
+def lags(monkeypatch):
+    """Подменяет измерение отставания: {alias: секунды или None}."""
+    values = {alias: 0 for alias in REPLICAS}
+    calls = []
+
+    def fake_lag(alias):
+        calls.append(alias)
+        return values[alias]
+
+    monkeypatch.setattr(db_router, 'replica_lag', fake_lag)
+    db_router._lag_cache.clear()
+    cache.clear()
+    with override_settings(DATABASE_REPLICAS=REPLICAS, REPLICA_MAX_LAG_SECONDS=2, REPLICA_LAG_CHECK_SECONDS=60):
+        yield values, calls
+    db_router._lag_cache.clear()
+
+
+def test_reads_go_to_replicas_only_when_enabled(lags):
+    """Вне безопасного запроса чтение идёт на default, внутри - на реплику"""
+    router = ReplicaRouter()
+
+    assert router.db_for_read(None) is None
+    with read_from_replicas():
+        assert router.db_for_read(None) in REPLICAS
+    assert router.db_for_write(None) == 'default'
+    assert not router.allow_migrate('replica_0', 'documents')
+
+
+def test_lagging_replica_excluded_and_lag_cached(lags):
+    """Отстающая или недоступная реплика пропускается, отставание проверяется один раз"""
+    values, calls = lags
+    values['replica_0'] = 30
+    router = ReplicaRouter()
+
+    for _ in range(20):
+        with read_from_replicas():
+            assert router.db_for_read(None) == 'replica_1'
+    values['replica_1'] = None
+    with read_from_replicas():
+        assert router.db_for_read(None) == 'replica_1'  # результат ещё в кеше
+    db_router._lag_cache.clear()
+    with read_from_replicas():
+        assert router.db_for_read(None) is None
+    assert calls.count('replica_0') == 2
+
+
+def test_one_replica_per_request(lags):
+    """Все чтения одного блока идут на одну реплику, разные блоки распределяются по репликам"""
+    router = ReplicaRouter()
+    chosen = []
+
+    for _ in range(40):
+        with read_from_replicas():
+            routed = {router.db_for_read(None) for _ in range(10)}
+        assert len(routed) == 1
+        chosen.extend(routed)
+
+    assert set(chosen) == set(REPLICAS)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_inside_transaction_stay_on_primary(lags):
+    """Внутри транзакции на default чтения не уходят на реплику"""
+    with read_from_replicas(), transaction.atomic():
+        assert ReplicaRouter().db_for_read(None) is None
+
+
+def test_write_pins_session_to_primary(lags):
+    """После успешной записи GET этого же клиента читает с основной базы"""
+    routed = []
+
+    def view(request):
+        routed.append(ReplicaRouter().db_for_read(None))
+        return HttpResponse(status=201 if request.method == 'POST' else 200)
+
+    middleware = ReplicaRoutingMiddleware(view)
+    factory = RequestFactory()
+    factory.cookies['sessionid'] = 'writer'
+
+    middleware(factory.get('/api/documents/documents/'))
+    middleware(factory.post('/api/documents/documents/'))
+    middleware(factory.get('/api/documents/documents/'))
+    factory.cookies['sessionid'] = 'someone-else'
+    middleware(factory.get('/api/documents/documents/'))
+
+    assert routed[0] in REPLICAS
+    assert routed[1:3] == [None, None]
+    assert routed[3] in REPLICAS
@@ -0,0 +1,111 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+import msgpack
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document
+from docsStore.middleware import choose_encoding, parse_accept_encoding
+from docsStore.renderers import ORJSONRenderer
+
+SAMPLE = [
+    {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'title': 'Отчёт   за год',
+        'created_at': datetime(2025, 7, 9, 11, 19, 0, 123456, tzinfo=timezone.utc),
+        'amount': Decimal('10.50'),
+        'tags': ('a', 'b'),
+        'nested': {1: None, 'flag': True},
+    }
+]
+
+
+def test_orjson_matches_drf_output():
+    """orjson-рендерер выдаёт те же байты, что и JSONRenderer DRF"""
+    assert ORJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+
+
+def test_orjson_indent_falls_back_to_drf():
+    """Запрос с отступами рендерится стандартным DRF"""
+    rendered = ORJSONRenderer().render(SAMPLE, 'application/json; indent=2')
+
+    assert rendered == JSONRenderer().render(SAMPLE, 'application/json; indent=2')
+
+
+def test_parse_accept_encoding():
+    """Разбор Accept-Encoding с q-значениями"""
+    assert parse_accept_encoding('gzip, br;q=0.8, zstd;q=0') == {'gzip': 1.0, 'br': 0.8, 'zstd': 0.0}
+
+
+def test_choose_encoding_prefers_client_quality_then_server_order():
+    """Выбирается кодировка с наибольшим q, при равенстве - zstd, br, gzip"""
+    assert choose_encoding('gzip, br, zstd')[0] == 'zstd'
+    assert choose_encoding('gzip;q=1, br;q=0.5')[0] == 'gzip'
+    assert choose_encoding('identity')[0] is None
+    assert choose_encoding('*')[0] == 'zstd'
+
+
+@pytest.fixture
+def auth_client():
+    user = CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+    for i in range(30):
+        Document.objects.create(title=f'Document {i}', description='x' * 50, category=Category.objects.named('General'), created_by=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('coding', ['gzip', 'br', 'zstd'])
+def test_list_response_compressed(auth_client, coding):
+    """Список документов сжимается выбранным клиентом алгоритмом"""
+    import brotli
+    import gzip
+    import zstandard
+    decompress = {
+        'gzip': gzip.decompress,
+        'br': brotli.decompress,
+        'zstd': lambda body: zstandard.ZstdDecompressor().decompress(body),
+    }[coding]
+    plain = auth_client.get(reverse('documents:document-list'))
+    response = auth_client.get(reverse('documents:document-list'), HTTP_ACCEPT_ENCODING=coding)
+
+    assert response['Content-Encoding'] == coding
+    assert 'Accept-Encoding' in response['Vary']
+    assert json.loads(decompress(response.content)) == plain.json()
+
+
+@pytest.mark.django_db
+@override_settings(COMPRESSION_MIN_SIZE=10 ** 6)
+def test_small_response_not_compressed(auth_client):
+    """Ответы меньше порога не сжимаются"""
+    response = auth_client.get(reverse('documents:document-list'), HTTP_ACCEPT_ENCODING='gzip')
+
+    assert not response.has_header('Content-Encoding')
+
+
+@pytest.mark.django_db
+@override_settings(COMPRESSION_MIN_SIZE=0)
+def test_admin_html_not_compressed(client):
+    """HTML админки с CSRF-токеном не сжимается (BREACH)"""
+    response = client.get(reverse('admin:login'), HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response.status_code == 200
+    assert 'csrfmiddlewaretoken' in response.content.decode()
+    assert not response.has_header('Content-Encoding')
+
+
+@pytest.mark.django_db
+def test_msgpack_renderer(auth_client):
+    """Внутренние клиенты могут получить список в MessagePack"""
+    response = auth_client.get(reverse('documents:document-list'), HTTP_ACCEPT='application/msgpack')
+
+    assert response['Content-Type'] == 'application/msgpack'
+    data = msgpack.unpackb(response.content, raw=False)
+    assert len(data) == 30
+    assert data == auth_client.get(reverse('documents:document-list')).json()
@@ -21,5 +21,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/account/', include('account.urls', namespace='account')),
     path('api/documents/', include('documents.urls', namespace='documents')),
+    path('api/webhooks/', include('webhooks.urls', namespace='webhooks')),
+    path('internal/', include('monitoring.urls', namespace='monitoring')),
 
 ]
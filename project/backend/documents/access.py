@@ -0,0 +1,134 @@
+from django.db import transaction
+
+from . import changes
+from .models import CategoryCount, ChangeLogEntry, Document, DocumentAccess, DocumentGrant
+
+
+def desired_access(document_ids, user_ids=None):
+    """
+    Собирает права {(document_id, user_id): can_write} из авторства
+    и grant-ов. Удалённые документы прав не дают.
+    """
+    desired = {}
+
+    def grant(document_id, user_id, can_write):
+        if user_id is None or (user_ids is not None and user_id not in user_ids):
+            return
+        key = (document_id, user_id)
+        desired[key] = desired.get(key, False) or can_write
+
+    owners = Document.all_objects.alive().filter(pk__in=document_ids).values_list('pk', 'created_by_id')
+    alive_ids = set()
+    for document_id, owner_id in owners:
+        alive_ids.add(document_id)
+        grant(document_id, owner_id, True)
+
+    grants = DocumentGrant.objects.filter(document_id__in=alive_ids)
+    for document_id, user_id, can_write in grants.filter(user__isnull=False).values_list(
+        'document_id', 'user_id', 'can_write'
+    ):
+        grant(document_id, user_id, can_write)
+    for document_id, user_id, can_write in grants.filter(group__isnull=False).values_list(
+        'document_id', 'group__user', 'can_write'
+    ):
+        grant(document_id, user_id, can_write)
+    return desired
+
+
+@transaction.atomic
+def sync_access(document_ids, user_ids=None, revoke_only=False):
+    """
+    Приводит DocumentAccess для документов (и, если заданы, только для
+    пользователей user_ids) в соответствие с авторством и grant-ами.
+    revoke_only=True только отзывает и понижает права - так безопасно
+    вызывать из каскадного удаления, когда документ сам вот-вот исчезнет.
+    """
+    document_ids = list(document_ids)
+    if user_ids is not None:
+        user_ids = set(user_ids)
+    desired = desired_access(document_ids, user_ids)
+
+    existing = DocumentAccess.objects.filter(document_id__in=document_ids)
+    if user_ids is not None:
+        existing = existing.filter(user_id__in=user_ids)
+    current = {
+        (document_id, user_id): (pk, can_write)
+        for pk, document_id, user_id, can_write in existing.values_list(
+            'pk', 'document_id', 'user_id', 'can_write'
+        )
+    }
+
+    stale = {key: pk for key, (pk, _) in current.items() if key not in desired}
+    if stale:
+        DocumentAccess.objects.filter(pk__in=list(stale.values())).delete()
+
+    downgraded = {
+        key: pk for key, (pk, can_write) in current.items()
+        if key in desired and can_write and not desired[key]
+    }
+    if downgraded:
+        DocumentAccess.objects.filter(pk__in=list(downgraded.values())).update(can_write=False)
+
+    upgraded = {}
+    added = []
+    if not revoke_only:
+        upgraded = {
+            key: pk for key, (pk, can_write) in current.items()
+            if desired.get(key) and not can_write
+        }
+        if upgraded:
+            DocumentAccess.objects.filter(pk__in=list(upgraded.values())).update(can_write=True)
+        added = [key for key in desired if key not in current]
+        DocumentAccess.objects.bulk_create([
+            DocumentAccess(document_id=document_id, user_id=user_id, can_write=desired[(document_id, user_id)])
+            for document_id, user_id in added
+        ])
+
+    count_access_changes(added, list(stale))
+    record_access_changes({
+        changes.CREATED: added,
+        changes.UPDATED: [*downgraded, *upgraded],
+        changes.DELETED: list(stale),
+    })
+
+
+def count_access_changes(added, removed):
+    """
+    Правит счётчики категорий CategoryCount: документ, ставший доступным,
+    добавляется в категорию пользователя, отозванный - вычитается. Удалённые
+    документы пропускаются - они вычтены ещё в soft_delete().
+    """
+    keys = [*added, *removed]
+    if not keys:
+        return
+    categories = dict(
+        Document.all_objects.alive().filter(pk__in={document_id for document_id, _ in keys})
+        .values_list('pk', 'category_id')
+    )
+    deltas = {}
+    for sign, pairs in ((1, added), (-1, removed)):
+        for document_id, user_id in pairs:
+            if document_id in categories:
+                key = (user_id, categories[document_id])
+                deltas[key] = deltas.get(key, 0) + sign
+    CategoryCount.objects.adjust(deltas)
+
+
+def record_access_changes(changed):
+    """
+    Пишет в журнал, кому документ стал виден, у кого изменились права и у кого
+    пропал доступ; changed - {действие: [(document_id, user_id)]}. Запись видна
+    только затронутым пользователям, их курсоры могли уйти дальше прежних
+    записей о документе. Удалённые документы пропускаются - об удалении
+    журнал уже знает.
+    """
+    by_document = {}
+    for action, keys in changed.items():
+        for document_id, user_id in keys:
+            by_document.setdefault(document_id, {}).setdefault(action, []).append(user_id)
+    if not by_document:
+        return
+    documents = Document.all_objects.alive().filter(pk__in=list(by_document)).only('pk', 'slug')
+    for document in documents:
+        for action, user_ids in by_document[document.pk].items():
+            ChangeLogEntry.objects.record_for_users(action, document, user_ids)
@@ -1,3 +1,77 @@
 from django.contrib import admin
+from django.db import transaction
 
-# Register your models here.
+from account.quotas import release_storage
+from docsStore.pagination import EstimatedCountPaginator
+from .models import Category, Document, DocumentFile
+from .purge import schedule_purge
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name__exact',)
+
+
+@admin.register(Document)
+class DocumentAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'category', 'created_by', 'created_at')
+    list_select_related = ('category', 'created_by')
+    list_filter = ('category',)
+    # Только точные совпадения по индексированным полям: icontains по миллиону строк - полный скан
+    search_fields = ('slug__exact', 'created_by__email__exact')
+    search_help_text = 'Точный slug документа или email автора.'
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
+    raw_id_fields = ('created_by',)
+    readonly_fields = ('id', 'created_at', 'updated_at', 'deleted_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_deleted_objects(self, objs, request):
+        # Удаление мягкое, файлы дочищает purge: страница подтверждения не
+        # собирает каскад по всем файлам документа, а перечисляет сами документы
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        deleted = [str(obj) for obj in objs]
+        return deleted, {self.opts.verbose_name_plural: len(deleted)}, perms_needed, []
+
+    def delete_model(self, request, obj):
+        # Как DELETE в API: документ скрывается сразу, файлы удаляются в фоне пачками
+        obj.soft_delete()
+        transaction.on_commit(lambda: schedule_purge(obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset.iterator():
+            self.delete_model(request, obj)
+
+
+@admin.register(DocumentFile)
+class DocumentFileAdmin(admin.ModelAdmin):
+    list_display = ('file', 'document', 'uploaded_by', 'size', 'version', 'uploaded_at')
+    list_select_related = ('document', 'uploaded_by')
+    search_fields = ('sha256__exact', 'document__slug__exact')
+    search_help_text = 'SHA-256 содержимого или точный slug документа.'
+    raw_id_fields = ('document', 'uploaded_by', 'previous')
+    readonly_fields = ('id', 'sha256', 'size', 'root', 'version', 'uploaded_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_readonly_fields(self, request, obj=None):
+        # Замена содержимого обошла бы квоту и хеши - только новой версией;
+        # смена previous или document разорвала бы цепочку версий
+        if obj is not None:
+            return self.readonly_fields + ('document', 'file', 'previous')
+        return self.readonly_fields
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        # Как DELETE в API: цепочка версий, статистика и квота загрузившего
+        obj.delete()
+        release_storage({obj.uploaded_by_id: obj.size})
+
+    def delete_queryset(self, request, queryset):
+        # queryset.delete() обошёл бы DocumentFile.delete()
+        for obj in queryset.iterator():
+            self.delete_model(request, obj)
@@ -0,0 +1,21 @@
+from django.dispatch import Signal
+
+# Действия в журнале изменений
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+ACTION_CHOICES = [
+    (CREATED, 'Created'),
+    (UPDATED, 'Updated'),
+    (DELETED, 'Deleted'),
+]
+
+# seq записи журнала в PostgreSQL: номер транзакции (xid8) * SEQ_TX_FACTOR + номер записи
+# в транзакции. Так порядок seq согласован с горизонтом видимости транзакций без общей блокировки
+SEQ_TX_BITS = 20
+SEQ_TX_FACTOR = 1 << SEQ_TX_BITS
+
+# Отправляется внутри транзакции изменения, сразу после записи в журнал (аргумент entry).
+# Получателям, которым нужен только закоммиченный результат, - через transaction.on_commit.
+document_changed = Signal()
@@ -0,0 +1,180 @@
+"""
+Поиск дубликатов при загрузке.
+
+Точные дубликаты - по SHA-256 (индекс documentfile_sha256_idx). Похожие
+изображения (пересжатые, уменьшенные сканы) - по перцептивному хешу dHash:
+64 бита, расстояние Хэмминга до DOCUMENTS_NEAR_DUPLICATE_DISTANCE считается
+совпадением. Хеш хранится в PerceptualHash полосами по BAND_BITS бит.
+
+Если хеши различаются не больше чем в d битах, точно совпадают хотя бы
+BANDS - d полос. Кандидаты ищутся в SQL: строки полос группируются по файлу,
+остаются файлы, доступные пользователю, с таким числом совпавших полос;
+расстояние досчитывается в Python по уже отобранным.
+
+Для dHash нужен Pillow; без него ищутся только точные дубликаты. У PDF
+хешируется первое встроенное JPEG-изображение - так устроены отсканированные
+страницы; PDF без растровых страниц не хешируется. Почти пустые страницы
+(почти все биты одинаковые) не хешируются: они похожи друг на друга все сразу.
+"""
+import io
+import os
+import re
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .models import DocumentFile, PerceptualHash
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+BAND_BITS = 8
+BANDS = HASH_BITS // BAND_BITS
+# При большем расстоянии совпадение двух полос не гарантировано
+MAX_DISTANCE = BANDS - 2
+# Хеш, где установлено меньше MIN_HASH_BITS или больше HASH_BITS - MIN_HASH_BITS бит,
+# получается у пустых и почти однотонных страниц
+MIN_HASH_BITS = 8
+# Больше кандидатов по полосам не разбирается (самые совпадающие - первыми)
+CANDIDATE_LIMIT = 500
+
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png'})
+PDF_IMAGE_RE = re.compile(rb'/DCTDecode.*?stream\r?\n', re.DOTALL)
+
+
+def _pdf_scan(data):
+    """Первое встроенное JPEG-изображение PDF или None."""
+    match = PDF_IMAGE_RE.search(data)
+    if match is None:
+        return None
+    end = data.find(b'endstream', match.end())
+    return data[match.end():end if end != -1 else None]
+
+
+def image_hash(upload):
+    """dHash загружаемого изображения или скана в PDF; None, если посчитать нельзя."""
+    if Image is None:
+        return None
+    ext = os.path.splitext(upload.name)[1].lower()
+    if ext not in IMAGE_EXTENSIONS and ext != '.pdf':
+        return None
+    upload.seek(0)
+    try:
+        source = upload
+        if ext == '.pdf':
+            scan = _pdf_scan(upload.read())
+            if scan is None:
+                return None
+            source = io.BytesIO(scan)
+        with Image.open(source) as image:
+            # Для JPEG декодируется сразу уменьшенная копия
+            image.draft('L', (HASH_SIZE * 4, HASH_SIZE * 4))
+            pixels = image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).tobytes()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        upload.seek(0)
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            right = pixels[row * (HASH_SIZE + 1) + col + 1]
+            value = value << 1 | (left > right)
+    if not MIN_HASH_BITS <= value.bit_count() <= HASH_BITS - MIN_HASH_BITS:
+        return None
+    return value
+
+
+def to_signed(value):
+    """64-битный хеш в диапазон BigIntegerField."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def from_signed(value):
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def hash_bands(value):
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def hash_rows(document_file, value):
+    signed = to_signed(value)
+    return [
+        PerceptualHash(file=document_file, band=band, value=band_value, hash=signed)
+        for band, band_value in enumerate(hash_bands(value))
+    ]
+
+
+def similar_files(value, max_distance, visible):
+    """
+    {file_id: расстояние} для хешей не дальше max_distance среди файлов
+    queryset-а visible. Кандидаты - файлы хотя бы с BANDS - max_distance
+    совпавшими полосами, отобранные одним запросом по индексу полос.
+    """
+    bands = reduce(or_, (Q(band=band, value=band_value) for band, band_value in enumerate(hash_bands(value))))
+    candidates = (
+        PerceptualHash.objects.filter(bands, file__in=visible.order_by().values('pk'))
+        .values('file_id', 'hash')
+        .annotate(matched=Count('pk'))
+        .filter(matched__gte=BANDS - max_distance)
+        .order_by('-matched')
+        .values_list('file_id', 'hash')[:CANDIDATE_LIMIT]
+    )
+    found = {}
+    for file_id, stored in candidates:
+        distance = hamming(from_signed(stored), value)
+        if distance <= max_distance:
+            found[file_id] = distance
+    return found
+
+
+def _warning(kind, document_file, distance):
+    return {
+        'type': kind,
+        'file': str(document_file.pk),
+        'name': os.path.basename(document_file.file.name),
+        'document': document_file.document.slug,
+        'distance': distance,
+    }
+
+
+def find_duplicates(user, document_file):
+    """
+    Файлы, доступные пользователю, с тем же содержимым или похожим изображением.
+    Версии того же файла не считаются дубликатами.
+    """
+    limit = settings.DOCUMENTS_DUPLICATE_LIMIT
+    root_id = document_file.root_id or document_file.pk
+    visible = (
+        DocumentFile.objects.accessible_to(user)
+        .exclude(Q(pk=root_id) | Q(root_id=root_id))
+        .select_related('document')
+        .order_by('uploaded_at')
+    )
+    warnings = []
+    exact_ids = []
+    if document_file.sha256:
+        for duplicate in visible.filter(sha256=document_file.sha256)[:limit]:
+            exact_ids.append(duplicate.pk)
+            warnings.append(_warning('exact', duplicate, 0))
+
+    value = getattr(document_file, 'perceptual_hash', None)
+    if value is not None and len(warnings) < limit:
+        max_distance = min(settings.DOCUMENTS_NEAR_DUPLICATE_DISTANCE, MAX_DISTANCE)
+        similar = similar_files(value, max_distance, visible.exclude(pk__in=[document_file.pk, *exact_ids]))
+        matches = visible.filter(pk__in=list(similar))
+        ordered = sorted(matches, key=lambda match: similar[match.pk])
+        warnings.extend(_warning('similar', match, similar[match.pk]) for match in ordered[:limit - len(warnings)])
+    return warnings
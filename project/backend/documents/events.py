@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import close_old_connections, connections, transaction
+
+from .changes import document_changed
+from .models import ChangeLogEntry, ChangeLogRecipient, DocumentAccess
+from .serializers import ChangeLogEntrySerializer
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'documents_changes'
+TICKET_SALT = 'documents.events.ticket'
+
+
+class Subscription:
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue()
+
+
+class Broker:
+    """
+    Раздаёт события подписчикам процесса. Публиковать можно из любого потока:
+    событие кладётся в очередь подписчика через его цикл событий.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, loop=None):
+        subscription = Subscription(user_id, loop or asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        if getattr(settings, 'DOCUMENTS_EVENTS_BACKEND', 'local') == 'postgres':
+            listener.ensure_started()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self):
+        with self._lock:
+            return bool(self._subscriptions)
+
+    def publish(self, event, user_ids):
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in user_ids
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.queue.put_nowait, event)
+            except RuntimeError:
+                # Цикл подписчика уже закрыт, отписка вот-вот случится
+                pass
+
+
+broker = Broker()
+
+
+def event_for(entry):
+    return ChangeLogEntrySerializer(entry).data
+
+
+def audience(entry):
+    """Пользователи, которым видна запись: текущий доступ или получатели удаления и смены доступа."""
+    user_ids = set()
+    if not entry.recipients_only:
+        user_ids.update(
+            DocumentAccess.objects.filter(document_id=entry.document_id).values_list('user_id', flat=True)
+        )
+    user_ids.update(ChangeLogRecipient.objects.filter(entry=entry).values_list('user_id', flat=True))
+    return user_ids
+
+
+def publish_entry(entry):
+    if broker.has_subscribers():
+        broker.publish(event_for(entry), audience(entry))
+
+
+def entry_recorded(sender, entry, **kwargs):
+    """
+    local: событие уходит подписчикам этого процесса после коммита.
+    postgres: NOTIFY в той же транзакции, PostgreSQL доставит его всем процессам
+    только после коммита, их слушатели опубликуют запись локально.
+    """
+    if getattr(settings, 'DOCUMENTS_EVENTS_BACKEND', 'local') == 'postgres':
+        connection = transaction.get_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, str(entry.seq)])
+    else:
+        transaction.on_commit(lambda: publish_entry(entry))
+
+
+def issue_ticket(user):
+    """
+    Билет на подключение к потоку событий: подписанный id пользователя.
+    EventSource не умеет заголовки, и в URL (а значит, в логи прокси)
+    попадает билет, а не JWT: он годен DOCUMENTS_EVENTS_TICKET_TTL секунд
+    и только для этого потока.
+    """
+    return signing.TimestampSigner(salt=TICKET_SALT).sign(str(user.pk))
+
+
+def ticket_user(ticket):
+    """Активный пользователь по билету; None - билет подделан или истёк."""
+    try:
+        user_id = signing.TimestampSigner(salt=TICKET_SALT).unsign(
+            ticket, max_age=settings.DOCUMENTS_EVENTS_TICKET_TTL
+        )
+    except signing.BadSignature:
+        return None
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+def connect_events():
+    document_changed.connect(entry_recorded, sender=ChangeLogEntry, dispatch_uid='documents_events')
+
+
+class PostgresListener:
+    """Поток с LISTEN на отдельном соединении; запускается с первым подписчиком."""
+
+    poll_seconds = 5
+
+    def __init__(self):
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='documents-listen', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception('Слушатель %s упал, переподключение', NOTIFY_CHANNEL)
+                close_old_connections()
+                threading.Event().wait(self.poll_seconds)
+
+    def _listen(self):
+        connection = connections.create_connection('default')
+        connection.ensure_connection()
+        raw = connection.connection
+        raw.autocommit = True
+        with raw.cursor() as cursor:
+            cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+        try:
+            while True:
+                if select.select([raw], [], [], self.poll_seconds) == ([], [], []):
+                    continue
+                raw.poll()
+                seqs = []
+                while raw.notifies:
+                    seqs.append(int(raw.notifies.pop(0).payload))
+                if broker.has_subscribers():
+                    for entry in ChangeLogEntry.objects.filter(seq__in=seqs).order_by('seq'):
+                        publish_entry(entry)
+        finally:
+            connection.close()
+
+
+listener = PostgresListener()
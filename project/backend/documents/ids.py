@@ -0,0 +1,34 @@
+import os
+import time
+import uuid
+from datetime import timezone as dt_timezone
+
+_TIMESTAMP_BITS = 48
+_TIMESTAMP_MASK = (1 << _TIMESTAMP_BITS) - 1
+
+
+def uuid7(timestamp_ms=None):
+    """
+    UUID версии 7 (RFC 9562): первые 48 бит - миллисекунды Unix-времени,
+    остальное случайно. Новые строки попадают в конец индекса первичного ключа,
+    а не в случайную страницу, как с uuid4.
+    """
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & _TIMESTAMP_MASK) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | 0x7 << 76  # версия
+    value = value & ~(0x3 << 62) | 0x2 << 62  # вариант RFC 4122
+    return uuid.UUID(int=value)
+
+
+def uuid7_floor(moment):
+    """Наименьший UUIDv7 для момента времени: граница диапазона по id."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    timestamp_ms = int(moment.timestamp() * 1000)
+    return uuid.UUID(int=(timestamp_ms & _TIMESTAMP_MASK) << 80)
+
+
+def uuid7_timestamp_ms(value):
+    """Миллисекунды Unix-времени, зашитые в UUIDv7."""
+    return value.int >> 80
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from documents import partitioning
+from documents.models import DocumentFile
+
+
+class Command(BaseCommand):
+    help = (
+        'Секционирование таблицы файлов по месяцам (диапазоны UUIDv7). '
+        'Без --apply только печатает SQL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true',
+                            help='Перевести обычную таблицу в секционированную (в окно обслуживания).')
+        parser.add_argument('--months-ahead', type=int, default=3,
+                            help='На сколько месяцев вперёд создавать секции.')
+        parser.add_argument('--keep-old', action='store_true',
+                            help='Не удалять исходную таблицу после переноса данных.')
+        parser.add_argument('--apply', action='store_true', help='Выполнить SQL.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Секционирование поддерживается только для PostgreSQL.')
+        table = DocumentFile._meta.db_table
+        partitioned = partitioning.is_partitioned(connection, table)
+
+        if options['convert']:
+            if partitioned:
+                raise CommandError(f'Таблица {table} уже секционирована.')
+            statements = partitioning.convert_sql(
+                connection, table, options['months_ahead'], keep_old=options['keep_old']
+            )
+        else:
+            if not partitioned:
+                raise CommandError(f'Таблица {table} не секционирована, используйте --convert.')
+            statements = partitioning.create_ahead_sql(connection, table, options['months_ahead'])
+
+        if not options['apply']:
+            for statement in statements:
+                self.stdout.write(statement + ';')
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        self.stdout.write(self.style.SUCCESS(f'Выполнено инструкций: {len(statements)}.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from documents.models import Document
+from documents.purge import purge_document
+
+
+class Command(BaseCommand):
+    help = 'Окончательно удаляет документы, помеченные удалёнными, вместе с их файлами.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Сколько файлов удалять в одной транзакции.')
+
+    def handle(self, *args, **options):
+        document_ids = list(Document.all_objects.deleted().values_list('pk', flat=True))
+        files = 0
+        for document_id in document_ids:
+            files += purge_document(document_id, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Очищено документов: {len(document_ids)}, файлов: {files}.'
+        ))
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from account.models import CustomUser
+from documents.models import DocumentFile
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики занятого места пользователей по размерам их файлов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Сколько пользователей или файлов обрабатывать в одной транзакции.')
+        parser.add_argument('--fill-sizes', action='store_true',
+                            help='Сначала заполнить размер у файлов, загруженных до появления квот.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if options['fill_sizes']:
+            filled = self.fill_sizes(batch_size)
+            self.stdout.write(f'Заполнен размер файлов: {filled}.')
+
+        fixed = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # Блокируем пачку пользователей: их загрузки ждут конца пересчёта
+                users = list(
+                    CustomUser.objects.select_for_update()
+                    .filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .only('pk', 'storage_used')[:batch_size]
+                )
+                if not users:
+                    break
+                totals = dict(
+                    DocumentFile.objects.filter(uploaded_by__in=users)
+                    .order_by()
+                    .values('uploaded_by')
+                    .annotate(total=Sum('size'))
+                    .values_list('uploaded_by', 'total')
+                )
+                changed = []
+                for user in users:
+                    total = totals.get(user.pk) or 0
+                    if user.storage_used != total:
+                        user.storage_used = total
+                        changed.append(user)
+                CustomUser.objects.bulk_update(changed, ['storage_used'])
+            fixed += len(changed)
+            last_pk = users[-1].pk
+
+        self.stdout.write(self.style.SUCCESS(f'Исправлено счётчиков: {fixed}.'))
+
+    def fill_sizes(self, batch_size):
+        storage = DocumentFile._meta.get_field('file').storage
+        filled = 0
+        last_pk = None
+        while True:
+            files = DocumentFile.objects.filter(size=0).order_by('pk').only('pk', 'file')
+            if last_pk is not None:
+                files = files.filter(pk__gt=last_pk)
+            files = list(files[:batch_size])
+            if not files:
+                return filled
+            changed = []
+            for document_file in files:
+                try:
+                    document_file.size = storage.size(document_file.file.name)
+                except OSError:
+                    continue  # файла нет в хранилище - считаем нулевым
+                changed.append(document_file)
+            DocumentFile.objects.bulk_update(changed, ['size'])
+            filled += len(changed)
+            last_pk = files[-1].pk
@@ -0,0 +1,44 @@
+import os
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from documents.models import DocumentFile
+
+
+class Command(BaseCommand):
+    help = 'Сколько места экономит сжатие вложений: исходный и занятый на диске размер по расширениям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Сколько строк читать из БД за один запрос.')
+
+    def handle(self, *args, **options):
+        storage = DocumentFile._meta.get_field('file').storage
+        stored_size = getattr(storage, 'stored_size', storage.size)
+        totals = defaultdict(lambda: [0, 0, 0])  # файлов, исходный размер, на диске
+        missing = 0
+        names = DocumentFile.objects.order_by().values_list('file', flat=True)
+        for name in names.iterator(chunk_size=options['batch_size']):
+            try:
+                original, stored = storage.size(name), stored_size(name)
+            except OSError:
+                missing += 1
+                continue
+            entry = totals[os.path.splitext(name)[1].lower() or '-']
+            entry[0] += 1
+            entry[1] += original
+            entry[2] += stored
+
+        for extension, (count, original, stored) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            self.stdout.write(self.format_row(extension, count, original, stored))
+        count, original, stored = (sum(column) for column in zip(*totals.values())) if totals else (0, 0, 0)
+        self.stdout.write(self.format_row('итого', count, original, stored))
+        if missing:
+            self.stdout.write(self.style.WARNING(f'Нет в хранилище: {missing}.'))
+
+    @staticmethod
+    def format_row(label, count, original, stored):
+        saved = original - stored
+        percent = 100 * saved / original if original else 0
+        return f'{label:8} файлов {count:>7}  исходно {original:>14}  на диске {stored:>14}  сэкономлено {saved:>14} ({percent:.1f}%)'
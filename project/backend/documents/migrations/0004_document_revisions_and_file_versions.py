@@ -0,0 +1,87 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+REVISION_FIELDS = ('title', 'description', 'category')
+
+
+def create_initial_revisions(apps, schema_editor):
+    """Существующие документы получают опорную ревизию 1 с текущим состоянием."""
+    Document = apps.get_model('documents', 'Document')
+    DocumentRevision = apps.get_model('documents', 'DocumentRevision')
+    batch = []
+    for document in Document.objects.only('pk', 'created_by_id', *REVISION_FIELDS).iterator(chunk_size=1000):
+        state = {field: getattr(document, field) for field in REVISION_FIELDS}
+        batch.append(DocumentRevision(
+            document_id=document.pk, version=1, changes=state, snapshot=state,
+            changed_by_id=document.created_by_id,
+        ))
+        if len(batch) >= 1000:
+            DocumentRevision.objects.bulk_create(batch)
+            batch = []
+    DocumentRevision.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_document_deleted_at_document_document_deleted_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('changes', models.JSONField()),
+                ('snapshot', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['version'],
+            },
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='previous',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='next_versions', to='documents.documentfile'),
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='root',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='documents.documentfile'),
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='sha256',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='documentfile',
+            index=models.Index(fields=['root', 'version'], name='documentfile_root_version_idx'),
+        ),
+        migrations.AddField(
+            model_name='documentrevision',
+            name='changed_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='documentrevision',
+            name='document',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='documents.document'),
+        ),
+        migrations.AddConstraint(
+            model_name='documentrevision',
+            constraint=models.UniqueConstraint(fields=('document', 'version'), name='document_revision_version_uniq'),
+        ),
+        migrations.RunPython(create_initial_revisions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_revisions_and_file_versions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Сначала строим составной индекс, потом удаляем одиночный по document_id
+        migrations.AddIndex(
+            model_name='documentfile',
+            index=models.Index(fields=['document', 'uploaded_at'], name='documentfile_document_idx'),
+        ),
+        migrations.AlterField(
+            model_name='documentfile',
+            name='document',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='files', to='documents.document'),
+        ),
+    ]
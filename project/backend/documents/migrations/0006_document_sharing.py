@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def grant_owner_access(apps, schema_editor):
+    """Авторы существующих документов получают строку полного доступа."""
+    Document = apps.get_model('documents', 'Document')
+    DocumentAccess = apps.get_model('documents', 'DocumentAccess')
+    batch = []
+    for document_id, owner_id in Document.objects.values_list('pk', 'created_by_id').iterator(chunk_size=1000):
+        batch.append(DocumentAccess(document_id=document_id, user_id=owner_id, can_write=True))
+        if len(batch) >= 1000:
+            DocumentAccess.objects.bulk_create(batch)
+            batch = []
+    DocumentAccess.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('documents', '0005_documentfile_document_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('can_write', models.BooleanField(default=False)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='documents.document')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'document'), name='document_access_user_document_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentGrant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('can_write', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grants', to='documents.document')),
+                ('granted_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='document_grants', to='auth.group')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='document_grants', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('group__isnull', True), ('user__isnull', False)), models.Q(('group__isnull', False), ('user__isnull', True)), _connector='OR'), name='document_grant_user_xor_group'), models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('document', 'user'), name='document_grant_user_uniq'), models.UniqueConstraint(condition=models.Q(('group__isnull', False)), fields=('document', 'group'), name='document_grant_group_uniq')],
+            },
+        ),
+        migrations.RunPython(grant_owner_access, migrations.RunPython.noop),
+    ]
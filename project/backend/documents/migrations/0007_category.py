@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def categories_from_strings(apps, schema_editor):
+    """Создаёт категории из строковых значений и считает неудалённые документы."""
+    Category = apps.get_model('documents', 'Category')
+    Document = apps.get_model('documents', 'Document')
+    names = Document.objects.order_by().values_list('category', flat=True).distinct()
+    for name in names:
+        alive = Document.objects.filter(category=name, deleted_at__isnull=True).count()
+        category = Category.objects.create(name=name, document_count=alive)
+        Document.objects.filter(category=name).update(category_ref=category)
+
+
+def categories_to_strings(apps, schema_editor):
+    Category = apps.get_model('documents', 'Category')
+    Document = apps.get_model('documents', 'Document')
+    for category in Category.objects.all():
+        Document.objects.filter(category_ref=category).update(category=category.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_document_sharing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('document_count', models.PositiveIntegerField(default=0, editable=False)),
+            ],
+            options={
+                'verbose_name_plural': 'Categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='documents.category'),
+        ),
+        migrations.RunPython(categories_from_strings, categories_to_strings),
+    ]
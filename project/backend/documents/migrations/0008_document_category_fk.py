@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Отдельно от заполнения: в PostgreSQL ALTER TABLE нельзя выполнять
+    # в одной транзакции с UPDATE строк, у которых есть отложенные FK-проверки
+
+    dependencies = [
+        ('documents', '0007_category'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='document',
+            name='category',
+        ),
+        migrations.RenameField(
+            model_name='document',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='documents', to='documents.category'),
+        ),
+    ]
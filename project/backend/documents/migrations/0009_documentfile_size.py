@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_document_category_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentfile',
+            name='size',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
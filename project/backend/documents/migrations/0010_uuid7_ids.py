@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:30
+
+import documents.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0009_documentfile_size'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='id',
+            field=models.UUIDField(default=documents.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='documentfile',
+            name='id',
+            field=models.UUIDField(default=documents.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
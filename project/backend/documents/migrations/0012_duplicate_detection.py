@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0011_change_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerceptualHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('value', models.IntegerField()),
+                ('hash', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='documentfile',
+            index=models.Index(fields=['sha256'], name='documentfile_sha256_idx'),
+        ),
+        migrations.AddField(
+            model_name='perceptualhash',
+            name='file',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='perceptual_hashes', to='documents.documentfile'),
+        ),
+        migrations.AddIndex(
+            model_name='perceptualhash',
+            index=models.Index(fields=['band', 'value'], name='perceptualhash_band_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0012_duplicate_detection'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['created_at'], name='document_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0013_document_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelogentry',
+            name='recipients_only',
+            field=models.BooleanField(default=False),
+        ),
+    ]
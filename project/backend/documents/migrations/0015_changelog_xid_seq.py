@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:28
+
+from django.db import migrations
+
+# Совпадает с documents.changes.SEQ_TX_FACTOR на момент миграции
+SEQ_TX_FACTOR = 1 << 20
+
+
+def check_seq_below_xid_range(apps, schema_editor):
+    """
+    Новые seq в PostgreSQL начинаются с xid8 * SEQ_TX_FACTOR. Прежние seq из
+    автоинкремента должны быть меньше, иначе клиенты с курсором пропустят новые записи.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    ChangeLogEntry = apps.get_model('documents', 'ChangeLogEntry')
+    table = connection.ops.quote_name(ChangeLogEntry._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT (SELECT max(seq) FROM {table}), pg_current_xact_id()::text::bigint * %s',
+            [SEQ_TX_FACTOR],
+        )
+        last_seq, first_new = cursor.fetchone()
+    if last_seq is not None and last_seq >= first_new:
+        raise RuntimeError(
+            f'seq журнала изменений ({last_seq}) не меньше первого seq по xid ({first_new}): '
+            'база перенесена без счётчика транзакций.'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0014_changelog_recipients_only'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_seq_below_xid_range, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def count_by_access(apps, schema_editor):
+    """Счётчики пользователей по DocumentAccess неудалённых документов."""
+    CategoryCount = apps.get_model('documents', 'CategoryCount')
+    DocumentAccess = apps.get_model('documents', 'DocumentAccess')
+    totals = (
+        DocumentAccess.objects.filter(document__deleted_at__isnull=True)
+        .values_list('user_id', 'document__category_id')
+        .annotate(total=models.Count('pk'))
+        .order_by()
+    )
+    CategoryCount.objects.bulk_create(
+        (CategoryCount(user_id=user_id, category_id=category_id, document_count=total)
+         for user_id, category_id, total in totals.iterator()),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0015_changelog_xid_seq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='category',
+            name='document_count',
+        ),
+        migrations.CreateModel(
+            name='CategoryCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_counts', to='documents.category')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'category'), name='category_count_user_category_uniq')],
+            },
+        ),
+        migrations.RunPython(count_by_access, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,85 @@
-import uuid
-from django.db import models
+import hashlib
+from django.db import connections, models, transaction
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
 from django.utils.text import slugify
 
+from account import stats as user_stats
+from . import changes
+from .ids import uuid7
+
+
+class CategoryManager(models.Manager):
+    def named(self, name):
+        """Категория по имени; новая создаётся при первом использовании."""
+        category, _ = self.get_or_create(name=name)
+        return category
+
+
+class Category(models.Model):
+    """
+    Категория документов. Число документов в ней своё у каждого пользователя
+    (видны только доступные ему) и хранится в CategoryCount.
+    """
+    name = models.CharField(max_length=100, unique=True)
+
+    objects = CategoryManager()
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'Categories'
+
+    def __str__(self):
+        return self.name
+
+
+class DocumentQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(deleted_at__isnull=True)
+
+    def deleted(self):
+        return self.filter(deleted_at__isnull=False)
+
+    def accessible_to(self, user):
+        """
+        Документы, доступные пользователю на чтение: один JOIN с DocumentAccess
+        по уникальному индексу (user, document).
+        """
+        return self.alive().filter(access__user=user)
+
+    def writable_by(self, user):
+        return self.alive().filter(access__user=user, access__can_write=True)
+
+    def with_access_for(self, user):
+        """
+        Добавляет user_can_write: None - нет доступа, False - чтение, True - запись.
+        Проверки прав читают аннотацию и не делают запросов по объектам.
+        """
+        return self.annotate(
+            user_can_write=models.Subquery(
+                DocumentAccess.objects.filter(document=models.OuterRef('pk'), user=user)
+                .values('can_write')[:1]
+            )
+        )
+
+
+class AliveDocumentManager(models.Manager.from_queryset(DocumentQuerySet)):
+    """Менеджер по умолчанию: документы, помеченные удалёнными, не видны."""
+
+    def get_queryset(self):
+        return super().get_queryset().alive()
+
 
 class Document(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     description = models.TextField(blank=True)
-    category = models.CharField(max_length=100)
+    category = models.ForeignKey(
+        'documents.Category',
+        on_delete=models.PROTECT,
+        related_name='documents'
+    )
     created_by = models.ForeignKey(
         'account.CustomUser',
         on_delete=models.CASCADE,
@@ -16,23 +87,333 @@ class Document(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = AliveDocumentManager()
+    all_objects = DocumentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Частичный индекс: очередь на фоновую очистку всегда маленькая
+            models.Index(
+                fields=['deleted_at'],
+                name='document_deleted_at_idx',
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+            # Иерархия дат и сортировка в админке
+            models.Index(fields=['created_at'], name='document_created_at_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исходную категорию, чтобы при смене поправить оба счётчика
+        if 'category_id' in instance.__dict__:
+            instance._loaded_category_id = instance.category_id
+        return instance
 
     def save(self, *args, **kwargs):
         if not self.slug:
             base_slug = slugify(self.title)
             slug = base_slug
             counter = 1
-            while Document.objects.filter(slug=slug).exists():
+            # slug удалённых документов ещё занят, пока строка не вычищена
+            while Document.all_objects.filter(slug=slug).exists():
                 slug = f"{base_slug}-{counter}"
                 counter += 1
             self.slug = slug
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        with transaction.atomic():
+            if not adding and not hasattr(self, '_loaded_category_id'):
+                # Документ загружен без категории (.only/.defer) - читаем её из базы
+                self._loaded_category_id = (
+                    Document.all_objects.filter(pk=self.pk).values_list('category_id', flat=True).first()
+                )
+            previous_category_id = getattr(self, '_loaded_category_id', None)
+            super().save(*args, **kwargs)
+            if adding:
+                # Автор всегда имеет полный доступ к своему документу
+                DocumentAccess.objects.create(user_id=self.created_by_id, document=self, can_write=True)
+            if self.deleted_at is None and (adding or previous_category_id != self.category_id):
+                if not adding:
+                    CategoryCount.objects.adjust_document(self.pk, previous_category_id, -1)
+                    CategoryCount.objects.adjust_document(self.pk, self.category_id, 1)
+                    user_stats.document_moved(self, previous_category_id)
+                else:
+                    CategoryCount.objects.adjust({(self.created_by_id, self.category_id): 1})
+                    user_stats.document_created(self)
+            ChangeLogEntry.objects.record(changes.CREATED if adding else changes.UPDATED, self)
+        self._loaded_category_id = self.category_id
+
+    def soft_delete(self):
+        """Помечает документ удалённым одним UPDATE, без загрузки файлов."""
+        self.deleted_at = timezone.now()
+        with transaction.atomic():
+            updated = Document.all_objects.alive().filter(pk=self.pk).update(deleted_at=self.deleted_at)
+            if updated:
+                CategoryCount.objects.adjust_document(self.pk, self.category_id, -1)
+                user_stats.document_removed(self)
+                ChangeLogEntry.objects.record(changes.DELETED, self)
+
+    def revision_state(self, fields=None):
+        """Значения полей для ревизий; категория хранится по имени."""
+        return {
+            field: self.category.name if field == 'category' else getattr(self, field)
+            for field in fields or REVISION_FIELDS
+        }
 
     def __str__(self):
         return self.title
-    
-    
-    
+
+
+class DocumentGrant(models.Model):
+    """Доступ к документу, выданный пользователю или группе."""
+    document = models.ForeignKey(
+        'documents.Document',
+        on_delete=models.CASCADE,
+        related_name='grants'
+    )
+    user = models.ForeignKey(
+        'account.CustomUser',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='document_grants'
+    )
+    group = models.ForeignKey(
+        'auth.Group',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='document_grants'
+    )
+    can_write = models.BooleanField(default=False)
+    granted_by = models.ForeignKey(
+        'account.CustomUser',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(user__isnull=False, group__isnull=True)
+                    | models.Q(user__isnull=True, group__isnull=False)
+                ),
+                name='document_grant_user_xor_group',
+            ),
+            models.UniqueConstraint(
+                fields=['document', 'user'],
+                condition=models.Q(user__isnull=False),
+                name='document_grant_user_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['document', 'group'],
+                condition=models.Q(group__isnull=False),
+                name='document_grant_group_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.document_id} -> {self.user_id or self.group_id}"
+
+
+class DocumentAccess(models.Model):
+    """
+    Денормализованный доступ: по строке на пару (пользователь, документ),
+    собранной из авторства, персональных и групповых grant-ов.
+    Поддерживается documents.access.sync_access, напрямую не редактируется.
+    """
+    user = models.ForeignKey(
+        'account.CustomUser',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,  # покрыт уникальным индексом (user, document)
+    )
+    document = models.ForeignKey(
+        'documents.Document',
+        on_delete=models.CASCADE,
+        related_name='access'
+    )
+    can_write = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'document'], name='document_access_user_document_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.document_id}"
+
+
+class CategoryCountManager(models.Manager):
+    def adjust(self, deltas):
+        """
+        Меняет счётчики: deltas - {(user_id, category_id): изменение}. Строка
+        создаётся при первом увеличении, затем UPDATE через F() - по одному на
+        категорию и величину изменения.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta and key[1] is not None}
+        if not deltas:
+            return
+        self.bulk_create(
+            [CategoryCount(user_id=user_id, category_id=category_id)
+             for (user_id, category_id), delta in deltas.items() if delta > 0],
+            ignore_conflicts=True,
+        )
+        groups = {}
+        for (user_id, category_id), delta in deltas.items():
+            groups.setdefault((category_id, delta), []).append(user_id)
+        for (category_id, delta), user_ids in groups.items():
+            self.filter(category_id=category_id, user_id__in=user_ids).update(
+                document_count=models.F('document_count') + delta
+            )
+
+    def adjust_document(self, document_id, category_id, delta):
+        """Меняет счётчик категории у всех, кому доступен документ."""
+        user_ids = DocumentAccess.objects.filter(document_id=document_id).values_list('user_id', flat=True)
+        self.adjust({(user_id, category_id): delta for user_id in user_ids})
+
+    @transaction.atomic
+    def recount(self):
+        """Пересчитывает все счётчики по DocumentAccess, например после bulk_create."""
+        totals = (
+            DocumentAccess.objects.filter(document__deleted_at__isnull=True)
+            .values_list('user_id', 'document__category_id')
+            .annotate(total=models.Count('pk'))
+            .order_by()
+        )
+        self.all().delete()
+        self.bulk_create(
+            CategoryCount(user_id=user_id, category_id=category_id, document_count=total)
+            for user_id, category_id, total in totals
+        )
+
+
+class CategoryCount(models.Model):
+    """
+    Число неудалённых документов категории, доступных пользователю: строка на
+    пару (пользователь, категория). Фасет категорий читает только строки
+    пользователя. Поддерживается в транзакциях изменений документов и доступа.
+    """
+    user = models.ForeignKey(
+        'account.CustomUser',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,  # покрыт уникальным индексом (user, category)
+    )
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='user_counts')
+    document_count = models.PositiveIntegerField(default=0)
+
+    objects = CategoryCountManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category'], name='category_count_user_category_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.category_id}: {self.document_count}"
+
+
+# Поля документа, история которых хранится в ревизиях
+REVISION_FIELDS = ('title', 'description', 'category')
+
+# Каждая SNAPSHOT_EVERY-я ревизия (1, 21, 41, ...) хранит полное состояние,
+# поэтому для восстановления любой версии читается не больше SNAPSHOT_EVERY строк.
+SNAPSHOT_EVERY = 20
+
+
+def is_snapshot_version(version):
+    return (version - 1) % SNAPSHOT_EVERY == 0
+
+
+class DocumentRevisionManager(models.Manager):
+    def record(self, document, changes, user=None):
+        """
+        Добавляет ревизию с изменившимися полями.
+        Вызывается внутри транзакции, строка документа блокируется,
+        чтобы номера версий не пересекались.
+        """
+        Document.all_objects.select_for_update().filter(pk=document.pk).exists()
+        last = (
+            self.filter(document=document)
+            .order_by('-version')
+            .values_list('version', flat=True)
+            .first()
+        )
+        version = (last or 0) + 1
+        snapshot = None
+        if is_snapshot_version(version):
+            snapshot = document.revision_state()
+        return self.create(
+            document=document,
+            version=version,
+            changes=changes,
+            snapshot=snapshot,
+            changed_by=user,
+        )
+
+    def state_at(self, document, version):
+        """Восстанавливает метаданные документа на версию version или None."""
+        first = version - (version - 1) % SNAPSHOT_EVERY
+        revisions = list(
+            self.filter(document=document, version__gte=first, version__lte=version)
+            .select_related('changed_by')
+            .order_by('version')
+        )
+        if not revisions or revisions[-1].version != version:
+            return None
+        state = dict(revisions[0].snapshot or {})
+        for revision in revisions[1:]:
+            state.update(revision.changes)
+        last = revisions[-1]
+        state.update({
+            'version': last.version,
+            'changed_by': last.changed_by.email if last.changed_by else None,
+            'created_at': last.created_at,
+        })
+        return state
+
+
+class DocumentRevision(models.Model):
+    """
+    Ревизия метаданных документа. Строки только добавляются;
+    changes хранит лишь изменившиеся поля, snapshot - полное состояние
+    для опорных версий.
+    """
+    document = models.ForeignKey(
+        'documents.Document',
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        db_index=False,  # покрыт уникальным индексом (document, version)
+    )
+    version = models.PositiveIntegerField()
+    changes = models.JSONField()
+    snapshot = models.JSONField(null=True, blank=True)
+    changed_by = models.ForeignKey(
+        'account.CustomUser',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DocumentRevisionManager()
+
+    class Meta:
+        ordering = ['version']
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'version'], name='document_revision_version_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.document_id} v{self.version}"
+
+
 def document_file_path(instance, filename):
     """Генерирует путь для загружаемых файлов."""
     if instance.document_id:
@@ -43,16 +424,268 @@ def document_file_path(instance, filename):
 
 
 
+def compute_sha256(file):
+    """SHA-256 содержимого загружаемого файла, читается по чанкам."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class DocumentFileQuerySet(models.QuerySet):
+    def accessible_to(self, user):
+        """Файлы документов, доступных пользователю, одним JOIN без проверок по объектам."""
+        return self.filter(document__deleted_at__isnull=True, document__access__user=user)
+
+    def writable_by(self, user):
+        return self.filter(
+            document__deleted_at__isnull=True,
+            document__access__user=user,
+            document__access__can_write=True,
+        )
+
+
 class DocumentFile(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    document = models.ForeignKey('documents.Document', related_name='files', on_delete=models.CASCADE)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    document = models.ForeignKey(
+        'documents.Document',
+        related_name='files',
+        on_delete=models.CASCADE,
+        db_index=False,  # покрыт индексом (document, uploaded_at)
+    )
     file = models.FileField(upload_to=document_file_path)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey('account.CustomUser', on_delete=models.SET_NULL, null=True)
+    sha256 = models.CharField(max_length=64, blank=True, editable=False)
+    # Размер в байтах, учитывается в квоте загрузившего
+    size = models.BigIntegerField(default=0, editable=False)
+    # Цепочка версий файла: previous - предыдущая версия, root - первая
+    previous = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='next_versions'
+    )
+    root = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='+', db_index=False,  # покрыт индексом (root, version)
+    )
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = DocumentFileQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Document File"
         verbose_name_plural = "Document Files"
+        indexes = [
+            # Листинг файлов документа по порядку загрузки без сортировки в памяти
+            models.Index(fields=['document', 'uploaded_at'], name='documentfile_document_idx'),
+            models.Index(fields=['root', 'version'], name='documentfile_root_version_idx'),
+            # Поиск точных дубликатов при загрузке
+            models.Index(fields=['sha256'], name='documentfile_sha256_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                user_stats.files_added(self.uploaded_by_id, [self], self.document.slug)
+            ChangeLogEntry.objects.record(
+                changes.CREATED if adding else changes.UPDATED, self.document, file=self
+            )
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            ChangeLogEntry.objects.record(changes.DELETED, self.document, file=self)
+            user_stats.file_removed(self)
+            self._unlink_from_chain()
+            return super().delete(*args, **kwargs)
+
+    def _unlink_from_chain(self):
+        """
+        Сшивает цепочку версий без удаляемой: следующая версия ссылается на
+        предыдущую, а при удалении первой версии корнем становится следующая -
+        иначе SET_NULL обнулил бы root у всех версий и chain() распался бы.
+        """
+        DocumentFile.objects.filter(previous=self).update(previous_id=self.previous_id)
+        if self.root_id is not None:
+            return
+        versions = DocumentFile.objects.filter(root=self)
+        successor_id = versions.order_by('version').values_list('pk', flat=True).first()
+        if successor_id is not None:
+            versions.exclude(pk=successor_id).update(root_id=successor_id)
+            DocumentFile.objects.filter(pk=successor_id).update(root_id=None)
+
+    def chain(self):
+        """Все версии файла по порядку, одним запросом по индексу (root, version)."""
+        root_id = self.root_id or self.pk
+        return DocumentFile.objects.filter(
+            models.Q(pk=root_id) | models.Q(root_id=root_id)
+        ).order_by('version')
 
     def __str__(self):
         return f"{self.file.name}"
+
+
+class PerceptualHash(models.Model):
+    """
+    Перцептивный хеш изображения (64 бита), нарезанный на полосы: строка на полосу.
+    Если хеши различаются не больше чем в d битах, хотя бы BANDS - d полос
+    совпадают точно, поэтому кандидаты ищутся по индексу (band, value)
+    с группировкой по файлу.
+    """
+    file = models.ForeignKey(DocumentFile, on_delete=models.CASCADE, related_name='perceptual_hashes')
+    band = models.PositiveSmallIntegerField()
+    value = models.IntegerField()
+    # Полный хеш в каждой строке: расстояние считается без JOIN
+    hash = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'value'], name='perceptualhash_band_idx'),
+        ]
+
+
+class ChangeLogQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Записи о документах, доступных пользователю сейчас, и об удалении
+        документов, которые были ему доступны в момент удаления.
+        """
+        return self.filter(
+            models.Q(
+                models.Exists(DocumentAccess.objects.filter(user=user, document_id=models.OuterRef('document_id'))),
+                recipients_only=False,
+            )
+            | models.Exists(ChangeLogRecipient.objects.filter(user=user, entry=models.OuterRef('pk')))
+        )
+
+    def settled(self):
+        """
+        Только записи завершённых транзакций. В PostgreSQL seq начинается с xid
+        транзакции, а все транзакции с xid ниже xmin снимка уже закончились:
+        запись с меньшим seq, чем отданные клиенту, позже появиться не может.
+        Горизонт берётся в том же запросе, что и записи, - из одного снимка.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return self
+        return self.filter(seq__lt=RawSQL(
+            'pg_snapshot_xmin(pg_current_snapshot())::text::bigint * %s', (changes.SEQ_TX_FACTOR,)
+        ))
+
+
+class ChangeLogManager(models.Manager.from_queryset(ChangeLogQuerySet)):
+    def _allocate_seqs(self, count):
+        """
+        seq для count новых записей текущей транзакции; None вне PostgreSQL,
+        там seq выдаёт автоинкремент. Транзакции не делят xid, поэтому номера
+        выдаются без блокировок: следующий после уже записанных в этой транзакции.
+        """
+        connection = transaction.get_connection(self.db)
+        if connection.vendor != 'postgresql':
+            return [None] * count
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT base, (SELECT max(seq) FROM {table} WHERE seq >= base AND seq < base + %s) '
+                f'FROM (SELECT pg_current_xact_id()::text::bigint * %s AS base) AS tx',
+                [changes.SEQ_TX_FACTOR, changes.SEQ_TX_FACTOR],
+            )
+            base, last = cursor.fetchone()
+        first = base if last is None else last + 1
+        if first + count > base + changes.SEQ_TX_FACTOR:
+            raise RuntimeError('Слишком много записей журнала изменений в одной транзакции.')
+        return list(range(first, first + count))
+
+    def record(self, action, document, file=None):
+        """
+        Добавляет запись в журнал. Вызывается внутри транзакции изменения.
+        Порядок для читателей обеспечивает settled(), писатели друг друга не ждут.
+        """
+        [seq] = self._allocate_seqs(1)
+        entry = self.create(
+            seq=seq,
+            action=action,
+            document_id=document.pk,
+            file_id=file.pk if file is not None else None,
+            slug=document.slug,
+        )
+        if action == changes.DELETED and file is None:
+            # Доступы исчезнут вместе с документом при очистке - запоминаем, кому показывать удаление
+            ChangeLogRecipient.objects.bulk_create(
+                ChangeLogRecipient(entry=entry, user_id=user_id)
+                for user_id in DocumentAccess.objects.filter(document=document).values_list('user_id', flat=True)
+            )
+        changes.document_changed.send(sender=ChangeLogEntry, entry=entry)
+        return entry
+
+    def record_for_users(self, action, document, user_ids):
+        """Запись о смене доступа к документу, видимая только пользователям user_ids."""
+        [seq] = self._allocate_seqs(1)
+        entry = self.create(
+            seq=seq, action=action, document_id=document.pk, slug=document.slug, recipients_only=True,
+        )
+        ChangeLogRecipient.objects.bulk_create(
+            ChangeLogRecipient(entry=entry, user_id=user_id) for user_id in user_ids
+        )
+        changes.document_changed.send(sender=ChangeLogEntry, entry=entry)
+        return entry
+
+    def record_many(self, action, document, files):
+        """Записи об изменении пачки файлов документа одним INSERT."""
+        files = list(files)
+        entries = self.bulk_create(
+            ChangeLogEntry(seq=seq, action=action, document_id=document.pk, file_id=file.pk, slug=document.slug)
+            for seq, file in zip(self._allocate_seqs(len(files)), files)
+        )
+        for entry in entries:
+            changes.document_changed.send(sender=ChangeLogEntry, entry=entry)
+        return entries
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Журнал изменений документов и файлов для инкрементальной синхронизации.
+    Строки только добавляются; seq служит курсором клиента: читатели видят
+    записи через settled(), и в этом срезе seq только растёт.
+    Ссылки на документ и файл - без внешних ключей: журнал переживает очистку.
+    В PostgreSQL seq выводится из xid8 транзакции (см. changes.SEQ_TX_BITS), поэтому
+    базу нельзя переносить через pg_dump в новый кластер без переноса счётчика
+    транзакций (pg_upgrade его сохраняет): новые seq оказались бы меньше старых.
+    """
+    seq = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=10, choices=changes.ACTION_CHOICES)
+    document_id = models.UUIDField()
+    file_id = models.UUIDField(null=True, blank=True)
+    slug = models.SlugField(max_length=255, db_index=False)
+    # Запись о смене доступа: видна только получателям из ChangeLogRecipient
+    recipients_only = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ChangeLogManager()
+
+    class Meta:
+        ordering = ['seq']
+
+    def __str__(self):
+        return f"{self.seq} {self.action} {self.file_id or self.document_id}"
+
+
+class ChangeLogRecipient(models.Model):
+    """Кому видна запись об удалении документа или о смене доступа к нему."""
+    entry = models.ForeignKey(
+        'documents.ChangeLogEntry',
+        on_delete=models.CASCADE,
+        related_name='recipients',
+        db_index=False,  # поиск идёт по уникальному индексу (user, entry)
+    )
+    user = models.ForeignKey(
+        'account.CustomUser',
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'entry'], name='changelog_recipient_user_entry_uniq'),
+        ]
@@ -0,0 +1,155 @@
+"""
+Секционирование таблицы файлов по времени для больших инсталляций (PostgreSQL 12+).
+
+Таблица секционируется RANGE по id: id - UUIDv7, его старшие биты - время
+создания строки, так что помесячные диапазоны id совпадают с месяцами uploaded_at.
+Первичный ключ остаётся одним столбцом, внешние ключи на таблицу продолжают работать.
+Строки со старыми uuid4 и всё, что не попало в созданные месяцы, уходят в секцию DEFAULT.
+
+Document так не секционируется: уникальный slug на секционированной таблице
+потребовал бы включить ключ секционирования в уникальный индекс.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from .ids import uuid7_floor
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def month_bounds(month):
+    """Диапазон id [from, to) для месяца."""
+    return uuid7_floor(month), uuid7_floor(add_months(month, 1))
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def _q(connection, name):
+    return connection.ops.quote_name(name)
+
+
+def create_partition_sql(connection, table, month):
+    low, high = month_bounds(month)
+    return (
+        f'CREATE TABLE IF NOT EXISTS {_q(connection, partition_name(table, month))} '
+        f'PARTITION OF {_q(connection, table)} '
+        f"FOR VALUES FROM ('{low}') TO ('{high}')"
+    )
+
+
+def is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def existing_partitions(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s)',
+            [table],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _introspect(connection, table):
+    """Индексы таблицы (с признаком первичного ключа) и внешние ключи в обе стороны."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisprimary '
+            'FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+            'WHERE i.indrelid = to_regclass(%s)',
+            [table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            'SELECT conname, conrelid::regclass::text, pg_get_constraintdef(oid) '
+            "FROM pg_constraint WHERE contype = 'f' "
+            'AND (conrelid = to_regclass(%s) OR confrelid = to_regclass(%s))',
+            [table, table],
+        )
+        foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def convert_sql(connection, table, months_ahead, keep_old=False):
+    """
+    Инструкции для перевода обычной таблицы в секционированную.
+    Выполняются одной транзакцией в окно обслуживания: данные копируются
+    INSERT ... SELECT, на это время таблица заблокирована.
+    """
+    heap = f'{table}_heap'
+    indexes, foreign_keys = _introspect(connection, table)
+    statements = []
+    for name, owner, _ in foreign_keys:
+        statements.append(f'ALTER TABLE {_q(connection, owner)} DROP CONSTRAINT {_q(connection, name)}')
+    statements.append(f'ALTER TABLE {_q(connection, table)} RENAME TO {_q(connection, heap)}')
+    for name, _, _ in indexes:
+        statements.append(f'ALTER INDEX {_q(connection, name)} RENAME TO {_q(connection, name[:58] + "_heap")}')
+
+    statements.append(
+        f'CREATE TABLE {_q(connection, table)} (LIKE {_q(connection, heap)} '
+        f'INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (id)'
+    )
+    for name, definition, primary in indexes:
+        if primary:
+            statements.append(f'ALTER TABLE {_q(connection, table)} ADD CONSTRAINT {_q(connection, name)} PRIMARY KEY (id)')
+        else:
+            # Определение снято до переименования и ссылается на исходные имена
+            statements.append(definition)
+
+    current = month_start(datetime.now(dt_timezone.utc))
+    for offset in range(months_ahead + 1):
+        statements.append(create_partition_sql(connection, table, add_months(current, offset)))
+    statements.append(
+        f'CREATE TABLE {_q(connection, default_partition_name(table))} '
+        f'PARTITION OF {_q(connection, table)} DEFAULT'
+    )
+    statements.append(f'INSERT INTO {_q(connection, table)} SELECT * FROM {_q(connection, heap)}')
+    for name, owner, definition in foreign_keys:
+        statements.append(f'ALTER TABLE {_q(connection, owner)} ADD CONSTRAINT {_q(connection, name)} {definition}')
+    if not keep_old:
+        statements.append(f'DROP TABLE {_q(connection, heap)}')
+    return statements
+
+
+def create_ahead_sql(connection, table, months_ahead):
+    """
+    Секции на текущий и следующие months_ahead месяцев, которых ещё нет.
+    Если в DEFAULT уже лежат строки из диапазона (например, uuid4 со старших
+    времён), они переносятся в новую секцию в той же транзакции;
+    внешние ключи Django отложенные и проверяются на коммите.
+    """
+    existing = existing_partitions(connection, table)
+    default = _q(connection, default_partition_name(table))
+    statements = []
+    current = month_start(datetime.now(dt_timezone.utc))
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        low, high = month_bounds(month)
+        statements.extend([
+            f'CREATE TABLE {_q(connection, name)} (LIKE {_q(connection, table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+            f"WITH moved AS (DELETE FROM {default} WHERE id >= '{low}' AND id < '{high}' RETURNING *) "
+            f'INSERT INTO {_q(connection, name)} SELECT * FROM moved',
+            f'ALTER TABLE {_q(connection, table)} ATTACH PARTITION {_q(connection, name)} '
+            f"FOR VALUES FROM ('{low}') TO ('{high}')",
+        ])
+    return statements
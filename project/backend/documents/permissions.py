@@ -1,16 +1,28 @@
+from django.http import Http404
 from rest_framework import permissions
 
 
-class IsOwnerOrReadOnly(permissions.BasePermission):
+class HasDocumentAccess(permissions.BasePermission):
     """
-    Позволяет авторам редактировать/удалять свои документы.
-    Остальным только чтение.
+    Права на документ по денормализованной таблице DocumentAccess:
+    чтение - любой доступ, изменение - доступ на запись,
+    удаление и управление доступом - только автор.
+    Документ без доступа для пользователя - 404, а не 403: ответ не
+    выдаёт, что документ с таким slug существует.
+    Ожидает объект из queryset с with_access_for(user), поэтому
+    проверка не делает запросов к БД.
     """
+    owner_actions = ('destroy', 'grants', 'revoke_grant')
 
     def has_object_permission(self, request, view, obj):
-        # Разрешаем GET, HEAD, OPTIONS всем авторизованным
+        can_write = getattr(obj, 'user_can_write', None)
+        if can_write is None:
+            raise Http404
+
+        if getattr(view, 'action', None) in self.owner_actions:
+            return obj.created_by_id == request.user.id
+
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        # Разрешаем изменения только если пользователь == автор
-        return obj.created_by == request.user
+        return can_write
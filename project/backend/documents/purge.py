@@ -0,0 +1,93 @@
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from account import stats as user_stats
+from account.quotas import release_storage
+from .models import Document, DocumentFile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Один поток: очистка не должна конкурировать с запросами за БД
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='documents-purge')
+        return _executor
+
+
+def schedule_purge(document_id):
+    """
+    Ставит удалённый документ в фоновую очистку.
+    Если DOCUMENTS_PURGE_ASYNC выключен, документ дочистит
+    команда purge_deleted_documents.
+    """
+    if getattr(settings, 'DOCUMENTS_PURGE_ASYNC', True):
+        _get_executor().submit(_purge_in_background, document_id)
+
+
+def _purge_in_background(document_id):
+    try:
+        purge_document(document_id)
+    except Exception:
+        logger.exception('Не удалось очистить документ %s', document_id)
+    finally:
+        # У фонового потока своё соединение, не держим его открытым
+        connection.close()
+
+
+def _delete_blobs(names):
+    storage = DocumentFile._meta.get_field('file').storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning('Не удалось удалить файл %s', name, exc_info=True)
+
+
+def purge_document(document_id, batch_size=None):
+    """
+    Окончательно удаляет помеченный документ: строки DocumentFile и их файлы
+    удаляются пачками в отдельных транзакциях, затем сам документ.
+    Возвращает количество удалённых файлов.
+    """
+    batch_size = batch_size or getattr(settings, 'DOCUMENTS_PURGE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    if not Document.all_objects.deleted().filter(pk=document_id).exists():
+        return 0
+
+    purged = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                DocumentFile.objects.filter(document_id=document_id)
+                .values_list('pk', 'file', 'uploaded_by_id', 'size')[:batch_size]
+            )
+            if not rows:
+                break
+            DocumentFile.objects.filter(pk__in=[row[0] for row in rows]).delete()
+            usage = Counter()
+            removed = Counter()
+            for _, _, uploaded_by_id, size in rows:
+                usage[uploaded_by_id] += size
+                removed[uploaded_by_id] += 1
+            release_storage(usage)
+            user_stats.files_removed(removed)
+            names = {name for _, name, _, _ in rows if name}
+            # Файлы удаляем только после коммита: при откате строки останутся с файлами
+            transaction.on_commit(lambda names=names: _delete_blobs(names))
+        purged += len(rows)
+
+    with transaction.atomic():
+        Document.all_objects.deleted().filter(pk=document_id).delete()
+    return purged
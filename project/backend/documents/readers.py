@@ -0,0 +1,130 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from monitoring.instrumentation import timed_serialization
+from .models import DocumentFile
+from .serializers import DocumentFileSerializer, DocumentSerializer
+
+# Один экземпляр поля на модуль: форматирование дат ровно как у сериализаторов
+_datetime_field = serializers.DateTimeField()
+
+
+def _datetime(value):
+    return _datetime_field.to_representation(value)
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+def _raw(value):
+    return value
+
+
+class ValuesReader:
+    """
+    Быстрый путь чтения для списков: нужные колонки берутся через .values(),
+    ответ собирается из словарей без ModelSerializer на каждую строку.
+    Набор и порядок полей берутся у сериализатора (с учётом ?fields и ?expand),
+    значения форматируются так же, как в нём. Для записи и валидации
+    по-прежнему используются ModelSerializer.
+    """
+    serializer_class = None
+    # поле ответа -> (колонка в .values(), преобразование значения)
+    columns = {}
+
+    def __init__(self, context, field_names=None):
+        self.context = context
+        self.request = context.get('request')
+        if field_names is None:
+            field_names = list(self.serializer_class(context=context).fields)
+        self.field_names = field_names
+
+    def value_columns(self):
+        return {self.columns[name][0] for name in self.field_names if name in self.columns}
+
+    def build(self, row):
+        item = {}
+        for name in self.field_names:
+            column, convert = self.columns[name]
+            item[name] = convert(row[column])
+        return item
+
+    def read(self, queryset):
+        with timed_serialization():
+            rows = queryset.prefetch_related(None).values(*self.value_columns())
+            return [self.build(row) for row in rows]
+
+
+class DocumentFileReader(ValuesReader):
+    serializer_class = DocumentFileSerializer
+
+    def __init__(self, context, field_names=None):
+        super().__init__(context, field_names)
+        storage = DocumentFile._meta.get_field('file').storage
+        build_uri = self.request.build_absolute_uri if self.request is not None else None
+
+        def file_url(name):
+            # Как FileField.to_representation с use_url=True
+            if not name:
+                return None
+            url = storage.url(name)
+            return build_uri(url) if build_uri else url
+
+        self.columns = {
+            'id': ('id', _str),
+            'document': ('document_id', _raw),
+            'file': ('file', file_url),
+            'uploaded_at': ('uploaded_at', _datetime),
+            'size': ('size', _raw),
+            'uploaded_by': ('uploaded_by_id', _raw),
+            'previous': ('previous_id', _raw),
+            'version': ('version', _raw),
+        }
+
+
+class DocumentReader(ValuesReader):
+    serializer_class = DocumentSerializer
+    columns = {
+        'id': ('id', _str),
+        'title': ('title', _str),
+        'slug': ('slug', _str),
+        'description': ('description', _str),
+        'category': ('category__name', _raw),
+        'created_by': ('created_by__email', _raw),
+        'created_at': ('created_at', _datetime),
+        'updated_at': ('updated_at', _datetime),
+    }
+
+    def value_columns(self):
+        # id нужен для привязки файлов, даже если сам не запрошен
+        return super().value_columns() | {'id'}
+
+    def read(self, queryset):
+        with timed_serialization():
+            rows = list(queryset.prefetch_related(None).values(*self.value_columns()))
+            files = defaultdict(list)
+            if 'files' in self.field_names and rows:
+                # Все файлы страницы одним запросом, как и Prefetch во вьюсете
+                # Вложенные файлы не урезаются ?fields, как и в DocumentSerializer
+                file_reader = DocumentFileReader(self.context, list(DocumentFileSerializer().fields))
+                file_rows = (
+                    DocumentFile.objects.filter(document_id__in=[row['id'] for row in rows])
+                    .order_by('uploaded_at')
+                    .values(*file_reader.value_columns() | {'document_id'})
+                )
+                for file_row in file_rows:
+                    files[file_row['document_id']].append(file_reader.build(file_row))
+
+            result = []
+            for row in rows:
+                item = {}
+                for name in self.field_names:
+                    if name == 'files':
+                        item[name] = files[row['id']]
+                    else:
+                        column, convert = self.columns[name]
+                        item[name] = convert(row[column])
+                result.append(item)
+            return result
@@ -1,35 +1,118 @@
+from django.contrib.auth.models import Group
 from rest_framework import serializers
-from .models import Document, DocumentFile
+from rest_framework.permissions import SAFE_METHODS
+from account.models import CustomUser
+from account.quotas import reserve_storage
+from monitoring.instrumentation import TimedSerializerMixin
+from .models import (
+    Category,
+    CategoryCount,
+    ChangeLogEntry,
+    Document,
+    DocumentFile,
+    DocumentGrant,
+    DocumentRevision,
+    PerceptualHash,
+    REVISION_FIELDS,
+    compute_sha256,
+)
+from .duplicates import hash_rows, image_hash
+from django.db import transaction
 from django.utils.text import slugify
 
 
-class DocumentSerializer(serializers.ModelSerializer):
-    created_by = serializers.ReadOnlyField(source='created_by.email')
+def parse_query_list(request, param):
+    """Разбирает параметр вида ?param=a,b,c в множество значений."""
+    if request is None:
+        return set()
+    value = request.query_params.get(param, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    ?expand=... включает поля из expandable_fields (по умолчанию их нет в ответе),
+    ?fields=... оставляет в ответе только перечисленные поля.
+    Работает только для сериализатора верхнего уровня и только на чтение,
+    чтобы не терять поля при валидации записи.
+    """
+    expandable_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        expand = parse_query_list(request, 'expand')
+        for name in self.expandable_fields:
+            if name not in expand:
+                self.fields.pop(name, None)
+
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        requested = parse_query_list(request, 'fields')
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+class CategoryField(serializers.SlugRelatedField):
+    """
+    Категория по имени, как раньше строкой. Валидация возвращает имя, а
+    неизвестная категория создаётся только в create()/update() - если другое
+    поле не пройдёт проверку, пустая категория не останется.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'name')
+        kwargs.setdefault('queryset', Category.objects.all())
+        super().__init__(**kwargs)
+        self.name_field = serializers.CharField(max_length=100)
+
+    def to_internal_value(self, data):
+        return self.name_field.run_validation(data)
+
+
+class CategorySerializer(serializers.ModelSerializer):
+    # Строка фасета - счётчик пользователя, имя берётся из категории
+    name = serializers.CharField(source='category.name', read_only=True)
 
     class Meta:
-        model = Document
-        fields = ['id', 'title', 'slug', 'description', 'category', 'created_by', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'slug', 'created_by', 'created_at', 'updated_at']
+        model = CategoryCount
+        fields = ['name', 'document_count']
+        read_only_fields = fields
+
+
+class DocumentFileSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    # Задаются только при загрузке: от содержимого зависят size, sha256 и квота,
+    # новое содержимое загружается новой версией через previous. Перенос в другой
+    # документ оторвал бы версию от цепочки, а общий с ней blob удалила бы очистка
+    # старого документа
+    create_only_fields = {
+        'document': 'Файл нельзя перенести в другой документ.',
+        'file': 'Файл нельзя заменить: загрузите новую версию с previous.',
+        'previous': 'Предыдущую версию нельзя изменить после загрузки.',
+    }
 
-    def update(self, instance, validated_data):
-        if 'title' in validated_data and validated_data['title'] != instance.title:
-            # Сброс slug если title изменился
-            base_slug = slugify(validated_data['title'])
-            slug = base_slug
-            counter = 1
-            while Document.objects.filter(slug=slug).exclude(pk=instance.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            instance.slug = slug
-        return super().update(instance, validated_data)
-    
-    
-    
-class DocumentFileSerializer(serializers.ModelSerializer):
     class Meta:
         model = DocumentFile
-        fields = ['id', 'document', 'file', 'uploaded_at', 'uploaded_by']
-        read_only_fields = ['id', 'uploaded_at', 'uploaded_by']
+        fields = ['id', 'document', 'file', 'size', 'uploaded_at', 'uploaded_by', 'previous', 'version']
+        read_only_fields = ['id', 'size', 'uploaded_at', 'uploaded_by', 'version']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            for name in self.create_only_fields:
+                if name in fields:
+                    fields[name].read_only = True
+        request = self.context.get('request')
+        if request is not None:
+            # Загрузить файл можно только в документ с доступом на запись
+            for name, queryset in (
+                ('document', Document.objects.writable_by(request.user)),
+                ('previous', DocumentFile.objects.writable_by(request.user)),
+            ):
+                if name in fields and not fields[name].read_only:
+                    fields[name].queryset = queryset
+        return fields
 
     def validate_file(self, value):
         """
@@ -55,4 +138,141 @@ class DocumentFileSerializer(serializers.ModelSerializer):
                 f"Размер файла превышает 10MB (текущий: {value.size / (1024 * 1024):.2f} MB)."
             )
 
-        return value
\ No newline at end of file
+        return value
+
+    def validate(self, attrs):
+        if self.instance is not None:
+            # Поля только для чтения DRF молча пропускает - явно сообщаем об отказе
+            initial = getattr(self, 'initial_data', None) or {}
+            errors = {name: message for name, message in self.create_only_fields.items() if name in initial}
+            if errors:
+                raise serializers.ValidationError(errors)
+        previous = attrs.get('previous')
+        if previous is not None:
+            document = attrs.get('document') or getattr(self.instance, 'document', None)
+            if previous.document_id != getattr(document, 'pk', None):
+                raise serializers.ValidationError(
+                    {'previous': 'Предыдущая версия должна принадлежать тому же документу.'}
+                )
+            if previous.next_versions.exists():
+                raise serializers.ValidationError(
+                    {'previous': 'У этого файла уже есть более новая версия.'}
+                )
+        return attrs
+
+    @transaction.atomic
+    def create(self, validated_data):
+        upload = validated_data['file']
+        validated_data['size'] = upload.size
+        uploader = validated_data.get('uploaded_by')
+        if uploader is not None:
+            # Место резервируется до записи в хранилище; при ошибке откатится вместе с транзакцией
+            reserve_storage(uploader.pk, upload.size)
+        validated_data['sha256'] = compute_sha256(upload)
+        perceptual_hash = image_hash(upload)
+        previous = validated_data.get('previous')
+        if previous is not None:
+            validated_data['root_id'] = previous.root_id or previous.pk
+            validated_data['version'] = previous.version + 1
+            if previous.sha256 and previous.sha256 == validated_data['sha256']:
+                # Содержимое не изменилось: новая версия ссылается на тот же блоб
+                validated_data['file'] = previous.file.name
+        instance = super().create(validated_data)
+        instance.perceptual_hash = perceptual_hash
+        if perceptual_hash is not None:
+            PerceptualHash.objects.bulk_create(hash_rows(instance, perceptual_hash))
+        return instance
+
+
+class DocumentSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    created_by = serializers.ReadOnlyField(source='created_by.email')
+    category = CategoryField()
+    files = DocumentFileSerializer(many=True, read_only=True)
+
+    expandable_fields = ('files',)
+
+    class Meta:
+        model = Document
+        fields = ['id', 'title', 'slug', 'description', 'category', 'created_by', 'created_at', 'updated_at', 'files']
+        read_only_fields = ['id', 'slug', 'created_by', 'created_at', 'updated_at']
+
+    def _request_user(self):
+        request = self.context.get('request')
+        return request.user if request else None
+
+    def _resolve_category(self, validated_data):
+        if 'category' in validated_data:
+            validated_data['category'] = Category.objects.named(validated_data['category'])
+
+    @transaction.atomic
+    def create(self, validated_data):
+        self._resolve_category(validated_data)
+        instance = super().create(validated_data)
+        DocumentRevision.objects.record(
+            instance,
+            instance.revision_state(),
+            user=instance.created_by,
+        )
+        return instance
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        self._resolve_category(validated_data)
+        changed = [
+            field for field in REVISION_FIELDS
+            if field in validated_data and validated_data[field] != getattr(instance, field)
+        ]
+        if 'title' in validated_data and validated_data['title'] != instance.title:
+            # Сброс slug если title изменился
+            base_slug = slugify(validated_data['title'])
+            slug = base_slug
+            counter = 1
+            while Document.all_objects.filter(slug=slug).exclude(pk=instance.pk).exists():
+                slug = f"{base_slug}-{counter}"
+                counter += 1
+            instance.slug = slug
+        instance = super().update(instance, validated_data)
+        if changed:
+            DocumentRevision.objects.record(
+                instance, instance.revision_state(changed), user=self._request_user()
+            )
+        return instance
+
+
+class DocumentRevisionSerializer(serializers.ModelSerializer):
+    changed_by = serializers.ReadOnlyField(source='changed_by.email')
+
+    class Meta:
+        model = DocumentRevision
+        fields = ['version', 'changes', 'changed_by', 'created_at']
+        read_only_fields = fields
+
+
+
+class DocumentGrantSerializer(serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(
+        slug_field='email', queryset=CustomUser.objects.all(), required=False, allow_null=True
+    )
+    group = serializers.SlugRelatedField(
+        slug_field='name', queryset=Group.objects.all(), required=False, allow_null=True
+    )
+
+    class Meta:
+        model = DocumentGrant
+        fields = ['id', 'user', 'group', 'can_write', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+    def validate(self, attrs):
+        if bool(attrs.get('user')) == bool(attrs.get('group')):
+            raise serializers.ValidationError('Укажите либо пользователя, либо группу.')
+        return attrs
+
+
+class ChangeLogEntrySerializer(serializers.ModelSerializer):
+    document = serializers.UUIDField(source='document_id', read_only=True)
+    file = serializers.UUIDField(source='file_id', read_only=True)
+
+    class Meta:
+        model = ChangeLogEntry
+        fields = ['seq', 'action', 'document', 'file', 'slug', 'created_at']
+        read_only_fields = fields
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from account import stats as user_stats
+from .access import sync_access
+from .models import CategoryCount, Document, DocumentGrant
+
+
+@receiver(post_save, sender=DocumentGrant)
+def grant_saved(sender, instance, **kwargs):
+    sync_access([instance.document_id])
+
+
+@receiver(post_delete, sender=DocumentGrant)
+def grant_deleted(sender, instance, **kwargs):
+    # Может прийти из каскадного удаления документа или группы: только отзываем
+    sync_access([instance.document_id], revoke_only=True)
+
+
+@receiver(pre_delete, sender=Document)
+def document_deleting(sender, instance, **kwargs):
+    # Счётчики категорий ищут пользователей по DocumentAccess - до того,
+    # как каскад удалит его строки; помеченные документы вычтены в soft_delete()
+    if instance.deleted_at is None:
+        CategoryCount.objects.adjust_document(instance.pk, instance.category_id, -1)
+
+
+@receiver(post_delete, sender=Document)
+def document_deleted(sender, instance, **kwargs):
+    # Окончательное удаление неудалённого документа (например, каскадом от автора)
+    if instance.deleted_at is None:
+        user_stats.document_removed(instance)
+
+
+def group_membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Пересчитывает доступ пользователей, вошедших в группы или вышедших из них."""
+    if action == 'pre_clear':
+        # После clear() уже не узнать, кто был в группе - запоминаем заранее
+        related = instance.user_set if reverse else instance.groups
+        instance._cleared_membership = set(related.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_membership', set())
+    if not pk_set:
+        return
+
+    if reverse:
+        group_ids, user_ids = [instance.pk], pk_set
+    else:
+        group_ids, user_ids = pk_set, [instance.pk]
+    document_ids = (
+        DocumentGrant.objects.filter(group_id__in=group_ids)
+        .values_list('document_id', flat=True)
+        .distinct()
+    )
+    sync_access(document_ids, user_ids=user_ids, revoke_only=action != 'post_add')
+
+
+def connect_signals():
+    m2m_changed.connect(
+        group_membership_changed,
+        sender=get_user_model().groups.through,
+        dispatch_uid='documents_group_membership_changed',
+    )
@@ -0,0 +1,219 @@
+"""
+Хранилище вложений со сжатием zstd.
+
+Файл пишется потоково кусками по chunk_size байт, каждый кусок - отдельный
+zstd-фрейм. После фреймов идут индекс (длины фреймов) и футер с исходным
+размером, поэтому чтение с произвольного места (HTTP Range) распаковывает
+только нужные фреймы, а не весь файл.
+
+Уже сжатые форматы (картинки, office-документы, архивы) и файлы, которые
+почти не сжимаются, хранятся как есть. Файлы без футера читаются как
+обычные - старые вложения продолжают работать.
+"""
+import io
+import os
+import struct
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard есть в requirements.txt
+    zstandard = None
+
+MAGIC = b'DSZSTD01'
+# Исходный размер, размер куска, число фреймов, сигнатура
+FOOTER = struct.Struct('<QII8s')
+FRAME_LENGTH = struct.Struct('<I')
+
+# Форматы, которые уже сжаты внутри: zstd их не уменьшит
+PRECOMPRESSED_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.zst', '.br',
+    '.mp3', '.mp4', '.mov', '.avi', '.mkv',
+})
+
+# Сжатые во временном файле данные держим в памяти до этого размера
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def read_footer(handle):
+    """
+    (исходный размер, размер куска, смещения фреймов) для сжатого файла
+    или None, если файл хранится как есть.
+    """
+    handle.seek(0, os.SEEK_END)
+    stored_size = handle.tell()
+    if stored_size < FOOTER.size:
+        return None
+    handle.seek(stored_size - FOOTER.size)
+    original_size, chunk_size, frame_count, magic = FOOTER.unpack(handle.read(FOOTER.size))
+    index_size = frame_count * FRAME_LENGTH.size
+    if magic != MAGIC or index_size > stored_size - FOOTER.size:
+        return None
+    handle.seek(stored_size - FOOTER.size - index_size)
+    index = handle.read(index_size)
+    offsets = [0]
+    for (length,) in FRAME_LENGTH.iter_unpack(index):
+        offsets.append(offsets[-1] + length)
+    if offsets[-1] + index_size + FOOTER.size != stored_size:
+        return None
+    return original_size, chunk_size, offsets
+
+
+class ChunkedZstdReader(io.RawIOBase):
+    """Чтение с произвольного места: распаковывается только фрейм с нужными байтами."""
+
+    def __init__(self, raw, original_size, chunk_size, offsets):
+        super().__init__()
+        self.raw = raw
+        self.original_size = original_size
+        self.chunk_size = chunk_size
+        self.offsets = offsets
+        self.position = 0
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._cached_index = None
+        self._cached_chunk = b''
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self.position + offset
+        elif whence == os.SEEK_END:
+            position = self.original_size + offset
+        else:
+            raise ValueError(f'Недопустимый whence: {whence}')
+        if position < 0:
+            raise ValueError('Отрицательная позиция')
+        self.position = position
+        return position
+
+    def _chunk(self, index):
+        if index != self._cached_index:
+            start, end = self.offsets[index], self.offsets[index + 1]
+            self.raw.seek(start)
+            self._cached_chunk = self._decompressor.decompress(self.raw.read(end - start))
+            self._cached_index = index
+        return self._cached_chunk
+
+    def readinto(self, buffer):
+        if self.position >= self.original_size:
+            return 0
+        index, inner = divmod(self.position, self.chunk_size)
+        data = self._chunk(index)[inner:inner + len(buffer)]
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.raw.close()
+        super().close()
+
+
+def _read_chunks(content, chunk_size):
+    """Куски ровно по chunk_size байт (кроме последнего), как бы ни читал источник."""
+    pending = b''
+    while True:
+        data = content.read(chunk_size - len(pending))
+        if not data:
+            break
+        pending += data
+        if len(pending) == chunk_size:
+            yield pending
+            pending = b''
+    if pending:
+        yield pending
+
+
+class CompressedFileSystemStorage(FileSystemStorage):
+    """
+    FileSystemStorage, который сжимает файлы при записи и прозрачно
+    распаковывает при чтении. size() возвращает исходный размер,
+    stored_size() - занятое на диске место.
+    """
+
+    def __init__(self, *args, level=3, chunk_size=256 * 1024, min_ratio=0.9, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.level = level
+        self.chunk_size = chunk_size
+        # Сжатие, сэкономившее меньше (1 - min_ratio), не окупает распаковку при чтении
+        self.min_ratio = min_ratio
+
+    def should_compress(self, name):
+        if zstandard is None:
+            return False
+        return os.path.splitext(name)[1].lower() not in PRECOMPRESSED_EXTENSIONS
+
+    def _save(self, name, content):
+        if not self.should_compress(name):
+            return super()._save(name, content)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        compressor = zstandard.ZstdCompressor(level=self.level)
+        lengths = []
+        original_size = 0
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as compressed:
+            for chunk in _read_chunks(content, self.chunk_size):
+                frame = compressor.compress(chunk)
+                compressed.write(frame)
+                lengths.append(len(frame))
+                original_size += len(chunk)
+            overhead = len(lengths) * FRAME_LENGTH.size + FOOTER.size
+            if sum(lengths) + overhead > original_size * self.min_ratio:
+                content.seek(0)
+                return super()._save(name, content)
+            for length in lengths:
+                compressed.write(FRAME_LENGTH.pack(length))
+            compressed.write(FOOTER.pack(original_size, self.chunk_size, len(lengths), MAGIC))
+            compressed.seek(0)
+            return super()._save(name, File(compressed))
+
+    def _open(self, name, mode='rb'):
+        if 'b' not in mode or any(flag in mode for flag in 'wa+'):
+            return super()._open(name, mode)
+        raw = open(self.path(name), 'rb')
+        footer = read_footer(raw)
+        if footer is None:
+            raw.seek(0)
+            return File(raw, name)
+        if zstandard is None:
+            raw.close()
+            raise OSError(f'Файл {name} сжат zstd, а пакет zstandard не установлен')
+        original_size, chunk_size, offsets = footer
+        reader = io.BufferedReader(
+            ChunkedZstdReader(raw, original_size, chunk_size, offsets),
+            buffer_size=chunk_size,
+        )
+        file = File(reader, name)
+        # File.size иначе возьмёт размер с диска по имени
+        file.size = original_size
+        return file
+
+    def size(self, name):
+        with open(self.path(name), 'rb') as raw:
+            footer = read_footer(raw)
+            if footer is None:
+                raw.seek(0, os.SEEK_END)
+                return raw.tell()
+            return footer[0]
+
+    def stored_size(self, name):
+        return super().size(name)
+
+    def is_compressed(self, name):
+        with open(self.path(name), 'rb') as raw:
+            return read_footer(raw) is not None
@@ -3,7 +3,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from account.models import CustomUser
-from documents.models import Document
+from documents.models import Category, Document
 
 
 @pytest.fixture
@@ -34,7 +34,7 @@ def document(user):
     return Document.objects.create(
         title="Test Document",
         description="A test document",
-        category="General",
+        category=Category.objects.named("General"),
         created_by=user
     )
 
@@ -111,15 +111,15 @@ def test_update_document_success(auth_client, document):
 
 
 @pytest.mark.django_db
-def test_update_document_other_user_forbidden(other_user, document):
-    """Другой пользователь не может обновить чужой документ"""
+def test_update_document_other_user_not_found(other_user, document):
+    """Пользователь без доступа к чужому документу получает 404 при обновлении"""
     client = APIClient()
     client.force_authenticate(user=other_user)
     url = reverse('documents:document-detail', args=[document.slug])
     payload = {'title': 'Hacked Title'}
     response = client.patch(url, payload)
 
-    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
 # --- DELETE ---
@@ -136,14 +136,14 @@ def test_delete_document_success(auth_client, document):
 
 
 @pytest.mark.django_db
-def test_delete_document_other_user_forbidden(other_user, document):
-    """Другой пользователь не может удалить чужой документ"""
+def test_delete_document_other_user_not_found(other_user, document):
+    """Пользователь без доступа к чужому документу получает 404 при удалении"""
     client = APIClient()
     client.force_authenticate(user=other_user)
     url = reverse('documents:document-detail', args=[document.slug])
     response = client.delete(url)
 
-    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
 # --- EDGE CASES ---
@@ -151,7 +151,7 @@ def test_delete_document_other_user_forbidden(other_user, document):
 def test_slug_uniqueness(auth_client, user):
     """Slug уникален: второй документ с тем же заголовком получает уникальный slug"""
     Document.objects.create(
-        title="Duplicate Title", description="...", category="General", created_by=user
+        title="Duplicate Title", description="...", category=Category.objects.named("General"), created_by=user
     )
     payload = {'title': 'Duplicate Title', 'description': 'Another one', 'category': 'General'}
     response = auth_client.post(reverse('documents:document-list'), payload)
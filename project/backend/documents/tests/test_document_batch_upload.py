@@ -0,0 +1,80 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, ChangeLogEntry, Document, DocumentFile
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='batch@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def document(user):
+    return Document.objects.create(title='Scans', category=Category.objects.named('General'), created_by=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def batch(client, document, *files):
+    return client.post(
+        reverse('documents:documentfile-batch'),
+        {'document': str(document.id), 'files': list(files)},
+        format='multipart',
+    )
+
+
+def page(i, ext='pdf'):
+    return SimpleUploadedFile(f'page-{i}.{ext}', f'page {i}'.encode())
+
+
+@pytest.mark.django_db
+def test_batch_upload_creates_all_files(client, user, document):
+    """Все файлы пакета сохраняются одним запросом, попадают в журнал и в квоту"""
+    response = batch(client, document, *(page(i) for i in range(5)))
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['failed'] == []
+    assert sorted(item['file'].rsplit('/', 1)[-1] for item in response.data['created']) == [
+        f'page-{i}.pdf' for i in range(5)
+    ]
+    files = DocumentFile.objects.filter(document=document)
+    assert files.count() == 5
+    assert all(file.sha256 and file.file.read() for file in files)
+    assert ChangeLogEntry.objects.filter(document_id=document.id, action='created').exclude(file_id=None).count() == 5
+    user.refresh_from_db()
+    assert user.storage_used == sum(file.size for file in files)
+
+
+@pytest.mark.django_db
+def test_batch_upload_reports_partial_failure(client, document):
+    """Недопустимые файлы попадают в failed, остальные сохраняются"""
+    response = batch(client, document, page(1), page(2, ext='exe'), page(3))
+
+    assert response.status_code == status.HTTP_207_MULTI_STATUS
+    assert len(response.data['created']) == 2
+    assert [item['file'] for item in response.data['failed']] == ['page-2.exe']
+    assert DocumentFile.objects.filter(document=document).count() == 2
+
+
+@pytest.mark.django_db
+def test_batch_upload_rejections(client, user, document):
+    """Пакет без годных файлов, в чужой документ или сверх квоты не сохраняется"""
+    other = CustomUser.objects.create_user(email='other@example.com', password='Testpass123')
+    foreign = Document.objects.create(title='Foreign', category=Category.objects.named('General'), created_by=other)
+
+    assert batch(client, document, page(1, ext='exe')).status_code == status.HTTP_400_BAD_REQUEST
+    assert batch(client, foreign, page(1)).status_code == status.HTTP_400_BAD_REQUEST
+
+    user.storage_quota = 10
+    user.save()
+    assert batch(client, document, page(1), page(2)).status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert not DocumentFile.objects.exists()
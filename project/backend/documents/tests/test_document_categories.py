@@ -0,0 +1,114 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, CategoryCount, Document, DocumentAccess, DocumentGrant, DocumentRevision
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='categories@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def counts(user):
+    return dict(CategoryCount.objects.filter(user=user).values_list('category__name', 'document_count'))
+
+
+@pytest.mark.django_db
+def test_category_created_from_name_and_counted(client, user):
+    """Категория передаётся строкой, создаётся при первом использовании и считается"""
+    url = reverse('documents:document-list')
+    for title in ('First', 'Second'):
+        response = client.post(url, {'title': title, 'category': 'Reports'})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['category'] == 'Reports'
+
+    assert counts(user) == {'Reports': 2}
+    assert client.get(url).data[0]['category'] == 'Reports'
+
+
+@pytest.mark.django_db
+def test_invalid_document_leaves_no_category(client):
+    """Категория не создаётся, если документ не прошёл валидацию"""
+    response = client.post(reverse('documents:document-list'), {'title': '', 'category': 'Orphan'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Category.objects.filter(name='Orphan').exists()
+
+
+@pytest.mark.django_db
+def test_category_change_moves_count(client, user):
+    """Смена категории уменьшает старый счётчик и увеличивает новый, ревизия хранит имя"""
+    document = Document.objects.create(title='Report', category=Category.objects.named('Reports'), created_by=user)
+    url = reverse('documents:document-detail', args=[document.slug])
+
+    response = client.patch(url, {'category': 'Invoices'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert counts(user) == {'Reports': 0, 'Invoices': 1}
+    assert DocumentRevision.objects.filter(document=document).last().changes == {'category': 'Invoices'}
+
+
+@pytest.mark.django_db
+def test_sharing_and_delete_adjust_counts_of_every_reader(client, user):
+    """Доступ добавляет документ в счётчик получателя; удаление через API и каскадом вычитает у всех"""
+    reader = CustomUser.objects.create_user(email='reader@example.com', password='Testpass123')
+    category = Category.objects.named('Reports')
+    deleted = Document.objects.create(title='Deleted', category=category, created_by=user)
+    kept = Document.objects.create(title='Kept', category=category, created_by=user)
+    for document in (deleted, kept):
+        DocumentGrant.objects.create(document=document, user=reader)
+    assert (counts(user), counts(reader)) == ({'Reports': 2}, {'Reports': 2})
+
+    client.delete(reverse('documents:document-detail', args=[deleted.slug]))
+    assert (counts(user), counts(reader)) == ({'Reports': 1}, {'Reports': 1})
+
+    DocumentGrant.objects.filter(document=deleted).delete()
+    assert counts(reader) == {'Reports': 1}
+
+    user.delete()
+    assert counts(reader) == {'Reports': 0}
+
+
+@pytest.mark.django_db
+def test_category_facets_scoped_to_user(client, user, django_assert_num_queries):
+    """Фасет одним запросом по счётчикам пользователя: пустые и чужие категории скрыты"""
+    for name in ('Reports', 'Reports', 'Contracts'):
+        Document.objects.create(title=name, category=Category.objects.named(name), created_by=user)
+    Category.objects.named('Empty')
+    other = CustomUser.objects.create_user(email='private@example.com', password='Testpass123')
+    Document.objects.create(title='Secret', category=Category.objects.named('Private'), created_by=other)
+    Document.objects.create(title='More', category=Category.objects.named('Reports'), created_by=other)
+
+    with django_assert_num_queries(1):
+        response = client.get(reverse('documents:category-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {'name': 'Contracts', 'document_count': 1},
+        {'name': 'Reports', 'document_count': 2},
+    ]
+
+
+@pytest.mark.django_db
+def test_recount_restores_counters(user):
+    """recount() пересчитывает счётчики после bulk_create в обход save()"""
+    category = Category.objects.named('Reports')
+    documents = Document.objects.bulk_create([
+        Document(title='Bulk', slug=f'bulk-{i}', category=category, created_by=user) for i in range(3)
+    ])
+    DocumentAccess.objects.bulk_create(
+        DocumentAccess(document=document, user=user, can_write=True) for document in documents
+    )
+
+    CategoryCount.objects.recount()
+
+    assert counts(user) == {'Reports': 3}
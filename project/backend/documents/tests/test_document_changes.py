@@ -0,0 +1,106 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import ChangeLogEntry
+from documents.purge import purge_document
+
+
+@pytest.fixture
+def owner():
+    return CustomUser.objects.create_user(email='owner@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def stranger():
+    return CustomUser.objects.create_user(email='stranger@example.com', password='Testpass123')
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def feed(user, **params):
+    return client_for(user).get(reverse('documents:change-list'), params).data
+
+
+@pytest.mark.django_db
+def test_feed_returns_deltas_since_cursor(owner, stranger):
+    """Создание, изменение, загрузка и удаление файла попадают в ленту по порядку"""
+    client = client_for(owner)
+    document = client.post(reverse('documents:document-list'), {'title': 'Synced', 'category': 'General'}).data
+    cursor = feed(owner)['next']
+
+    client.patch(reverse('documents:document-detail', args=[document['slug']]), {'title': 'Renamed'})
+    upload = SimpleUploadedFile('scan.pdf', b'content')
+    file = client.post(
+        reverse('documents:documentfile-list'), {'document': document['id'], 'file': upload}, format='multipart'
+    ).data
+    client.delete(reverse('documents:documentfile-detail', args=[file['id']]))
+
+    data = feed(owner, since=cursor)
+    assert [(change['action'], change['file']) for change in data['changes']] == [
+        ('updated', None),
+        ('created', file['id']),
+        ('deleted', file['id']),
+    ]
+    assert data['changes'][0]['slug'] == 'renamed'
+    assert data['next'] == data['changes'][-1]['seq']
+    assert feed(stranger)['changes'] == []
+
+
+@pytest.mark.django_db
+def test_delete_stays_visible_after_purge(owner, stranger):
+    """После очистки в ленте остаётся только удаление, видимое бывшим владельцам доступа"""
+    client = client_for(owner)
+    document = client.post(reverse('documents:document-list'), {'title': 'Doomed', 'category': 'General'}).data
+    client.delete(reverse('documents:document-detail', args=[document['slug']]))
+    purge_document(document['id'])
+
+    changes = feed(owner)['changes']
+
+    assert [(change['action'], change['document']) for change in changes] == [('deleted', document['id'])]
+    assert feed(stranger)['changes'] == []
+
+
+@pytest.mark.django_db
+def test_feed_pages_with_limit(owner, django_assert_num_queries):
+    """Лента отдаётся страницами одним запросом, has_more подсказывает продолжить"""
+    client = client_for(owner)
+    for i in range(5):
+        client.post(reverse('documents:document-list'), {'title': f'Doc {i}', 'category': 'General'})
+    user = CustomUser.objects.get(pk=owner.pk)
+
+    with django_assert_num_queries(1):
+        first = list(ChangeLogEntry.objects.visible_to(user).filter(seq__gt=0)[:3])
+    page = feed(owner, limit=3)
+    rest = feed(owner, since=page['next'], limit=3)
+
+    assert [change['seq'] for change in page['changes']] == [entry.seq for entry in first]
+    assert page['has_more'] and not rest['has_more']
+    assert len(rest['changes']) == 2
+    assert client.get(reverse('documents:change-list'), {'since': 'abc'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_grant_and_revoke_reach_only_affected_user(owner, stranger):
+    """Выдача и отзыв доступа попадают в ленту получателя после его курсора, но не в ленту автора"""
+    client = client_for(owner)
+    document = client.post(reverse('documents:document-list'), {'title': 'Shared', 'category': 'General'}).data
+    owner_cursor = feed(owner)['next']
+    stranger_cursor = feed(stranger)['next']
+
+    grant = client.post(
+        reverse('documents:document-grants', args=[document['slug']]), {'user': stranger.email}
+    ).data
+    client.delete(reverse('documents:document-revoke-grant', args=[document['slug'], grant['id']]))
+
+    changes = feed(stranger, since=stranger_cursor)['changes']
+    assert [(change['action'], change['document']) for change in changes] == [
+        ('created', document['id']),
+        ('deleted', document['id']),
+    ]
+    assert feed(owner, since=owner_cursor)['changes'] == []
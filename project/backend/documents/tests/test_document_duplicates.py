@@ -0,0 +1,135 @@
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.duplicates import find_duplicates, from_signed, hamming, hash_rows, image_hash, to_signed
+from documents.models import Category, Document, DocumentFile, PerceptualHash
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='dupes@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def make_document(user, title):
+    return Document.objects.create(title=title, category=Category.objects.named('General'), created_by=user)
+
+
+def upload(client, document, name, content):
+    return client.post(
+        reverse('documents:documentfile-list'),
+        {'document': str(document.id), 'file': SimpleUploadedFile(name, content)},
+        format='multipart',
+    )
+
+
+def scan(size, fmt, quality=90):
+    """Синтетический скан: градиент с сеткой блоков разной яркости, закодированный в fmt."""
+    image = Image.linear_gradient('L').rotate(90).resize((512, 512))
+    draw = ImageDraw.Draw(image)
+    for row in range(8):
+        for col in range(8):
+            shade = (row * 37 + col * 91) % 256
+            draw.rectangle((col * 64 + 8, row * 64 + 8, col * 64 + 40, row * 64 + 56), fill=shade)
+    buffer = io.BytesIO()
+    image.resize((size, size)).save(buffer, fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def pdf_with(jpeg):
+    """Одностраничный PDF со встроенным JPEG, как у сканера."""
+    return (
+        b'%PDF-1.4\n1 0 obj << /Type /XObject /Subtype /Image /Width 300 /Height 300 '
+        b'/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /DCTDecode /Length '
+        + str(len(jpeg)).encode() + b' >>\nstream\n' + jpeg + b'\nendstream\nendobj\n%%EOF\n'
+    )
+
+
+def test_image_hash_survives_reencoding_and_pdf_wrapping():
+    """Уменьшенный и пересжатый скан и тот же скан внутри PDF дают близкие хеши"""
+    original = image_hash(SimpleUploadedFile('scan.png', scan(512, 'PNG')))
+    reencoded = image_hash(SimpleUploadedFile('small.jpg', scan(300, 'JPEG', quality=60)))
+    wrapped = image_hash(SimpleUploadedFile('scan.pdf', pdf_with(scan(300, 'JPEG'))))
+
+    assert original is not None
+    assert hamming(original, reencoded) <= 6
+    assert hamming(original, wrapped) <= 6
+    assert image_hash(SimpleUploadedFile('text.pdf', b'%PDF-1.4 no images')) is None
+
+
+def test_blank_page_is_not_hashed():
+    """Пустая страница не хешируется: иначе она похожа на все пустые страницы сразу"""
+    buffer = io.BytesIO()
+    Image.new('L', (300, 300), 255).save(buffer, 'PNG')
+
+    assert image_hash(SimpleUploadedFile('blank.png', buffer.getvalue())) is None
+
+
+@pytest.mark.django_db
+def test_upload_warns_about_exact_duplicates(client, user):
+    """Повторная загрузка того же содержимого в другой документ возвращает предупреждение"""
+    first = upload(client, make_document(user, 'Scan 1'), 'scan.pdf', b'%PDF same scan')
+    second = upload(client, make_document(user, 'Scan 2'), 'copy.pdf', b'%PDF same scan')
+    other = upload(client, make_document(user, 'Scan 3'), 'other.pdf', b'%PDF other scan')
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert first.data['duplicates'] == []
+    assert second.status_code == status.HTTP_201_CREATED
+    assert [(item['type'], item['file'], item['name']) for item in second.data['duplicates']] == [
+        ('exact', first.data['id'], 'scan.pdf')
+    ]
+    assert other.data['duplicates'] == []
+
+
+@pytest.mark.django_db
+def test_near_duplicates_found_by_hash_bands(user):
+    """Похожие хеши находятся через полосы, далёкие и чужие - нет"""
+    document = make_document(user, 'Images')
+    stranger = CustomUser.objects.create_user(email='stranger@example.com', password='Testpass123')
+    base = 0xF0F0_1234_ABCD_8001
+
+    def stored(owner_document, value, name):
+        document_file = DocumentFile.objects.create(document=owner_document, file=f'documents/{name}', sha256=name)
+        PerceptualHash.objects.bulk_create(hash_rows(document_file, value))
+        return document_file
+
+    close = stored(document, base ^ 0b1011, 'close.jpg')  # 3 бита
+    # 6 бит в разных полосах: совпадают ровно две полосы - ещё кандидат
+    spread = stored(document, base ^ sum(1 << (band * 8) for band in range(6)), 'spread.jpg')
+    # 7 бит в разных полосах: одной совпавшей полосы мало
+    stored(document, base ^ sum(1 << (band * 8) for band in range(7)), 'apart.jpg')
+    stored(document, base ^ 0xFFFF_FFFF, 'far.jpg')
+    stored(make_document(stranger, 'Foreign'), base, 'foreign.jpg')
+    new = DocumentFile.objects.create(document=document, file='documents/new.jpg', sha256='new')
+    new.perceptual_hash = base
+
+    warnings = find_duplicates(user, new)
+
+    assert [(item['type'], item['file'], item['distance']) for item in warnings] == [
+        ('similar', str(close.pk), 3),
+        ('similar', str(spread.pk), 6),
+    ]
+    assert from_signed(to_signed(base)) == base and to_signed(base) < 0
+
+
+@pytest.mark.django_db
+def test_upload_warns_about_downscaled_copy(client, user):
+    """Уменьшенная пересжатая копия скана при загрузке помечается как похожая"""
+    first = upload(client, make_document(user, 'Original'), 'scan.png', scan(512, 'PNG'))
+    second = upload(client, make_document(user, 'Copy'), 'copy.jpg', scan(256, 'JPEG', quality=50))
+
+    assert [(item['type'], item['file']) for item in second.data['duplicates']] == [
+        ('similar', first.data['id'])
+    ]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from django.test import AsyncClient, Client
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from account.models import CustomUser
+from documents.events import Broker, broker, issue_ticket
+from documents.models import Category, Document
+
+
+@pytest.fixture
+def owner():
+    return CustomUser.objects.create_user(email='owner@example.com', password='Testpass123')
+
+
+def test_broker_delivers_only_to_audience():
+    """Событие получают только подписчики из аудитории"""
+    local = Broker()
+
+    async def scenario():
+        alice = local.subscribe(1)
+        bob = local.subscribe(2)
+        local.publish({'seq': 1}, {1})
+        event = await asyncio.wait_for(alice.queue.get(), 1)
+        local.unsubscribe(alice)
+        local.unsubscribe(bob)
+        return event, bob.queue.empty(), local.has_subscribers()
+
+    assert asyncio.run(scenario()) == ({'seq': 1}, True, False)
+
+
+@pytest.mark.django_db
+def test_change_published_after_commit(owner, django_capture_on_commit_callbacks):
+    """Изменение документа уходит подписчику только после коммита"""
+    loop = asyncio.new_event_loop()
+    subscription = broker.subscribe(owner.pk, loop=loop)
+    try:
+        with django_capture_on_commit_callbacks() as callbacks:
+            document = Document.objects.create(
+                title='Live', category=Category.objects.named('General'), created_by=owner
+            )
+        assert subscription.queue.empty()
+        for callback in callbacks:
+            callback()
+        event = loop.run_until_complete(asyncio.wait_for(subscription.queue.get(), 1))
+    finally:
+        broker.unsubscribe(subscription)
+        loop.close()
+
+    assert (event['action'], event['document']) == ('created', str(document.pk))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_catches_up_from_last_event_id(owner):
+    """Поток по ASGI сначала отдаёт пропущенные события после Last-Event-ID"""
+    document = Document.objects.create(title='Old', category=Category.objects.named('General'), created_by=owner)
+    document.title = 'New'
+    document.save()
+    api = APIClient()
+    api.force_authenticate(user=owner)
+    ticket = api.post(reverse('documents:events-ticket')).data['ticket']
+    url = reverse('documents:events')
+
+    async def read_events(count):
+        response = await AsyncClient().get(url, {'ticket': ticket}, headers={'Last-Event-ID': '0'})
+        chunks = []
+        stream = aiter(response.streaming_content)
+        while len(chunks) < count + 1:  # + строка retry
+            chunks.append((await asyncio.wait_for(anext(stream), 5)).decode())
+        await stream.aclose()
+        return response, chunks
+
+    response, chunks = asyncio.run(read_events(2))
+
+    assert response['Content-Type'] == 'text/event-stream'
+    assert 'event: created' in chunks[1] and 'event: updated' in chunks[2]
+    assert not broker.has_subscribers()
+    assert Client().get(url, {'ticket': ticket}).status_code == 501
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_requires_token():
+    """Без токена поток не открывается"""
+    response = asyncio.run(AsyncClient().get(reverse('documents:events')))
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_rejects_jwt_in_url_and_expired_ticket(owner, settings):
+    """JWT в URL больше не принимается, истёкший или подделанный билет - тоже"""
+    url = reverse('documents:events')
+    token = str(AccessToken.for_user(owner))
+    ticket = issue_ticket(owner)
+    settings.DOCUMENTS_EVENTS_TICKET_TTL = -1
+
+    for params in ({'token': token}, {'ticket': ticket}, {'ticket': f'{owner.pk}:forged:sig'}):
+        assert asyncio.run(AsyncClient().get(url, params)).status_code == 401
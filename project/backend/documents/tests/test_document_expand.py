@@ -0,0 +1,116 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document, DocumentFile
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def documents(user):
+    result = []
+    for i in range(3):
+        document = Document.objects.create(title=f'Doc {i}', category=Category.objects.named('General'), created_by=user)
+        for j in range(2):
+            DocumentFile.objects.create(
+                document=document,
+                file=SimpleUploadedFile(f'doc{i}-page{j}.pdf', b'%PDF'),
+                uploaded_by=user,
+            )
+        result.append(document)
+    return result
+
+
+@pytest.mark.django_db
+def test_files_not_included_by_default(auth_client, documents):
+    """Без expand файлы в ответ не попадают"""
+    url = reverse('documents:document-detail', args=[documents[0].slug])
+    response = auth_client.get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'files' not in response.data
+
+
+@pytest.mark.django_db
+def test_expand_files_on_detail(auth_client, documents):
+    """?expand=files отдаёт документ вместе с файлами"""
+    url = reverse('documents:document-detail', args=[documents[0].slug])
+    response = auth_client.get(url, {'expand': 'files'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['files']) == 2
+    assert {f['document'] for f in response.data['files']} == {documents[0].id}
+
+
+@pytest.mark.django_db
+def test_expand_files_on_list_uses_single_prefetch(auth_client, documents, django_assert_num_queries):
+    """Список с ?expand=files: один запрос документов и один на все файлы"""
+    url = reverse('documents:document-list')
+    with django_assert_num_queries(2):
+        response = auth_client.get(url, {'expand': 'files'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert sum(len(d['files']) for d in response.data) == 6
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset(auth_client, documents):
+    """?fields= оставляет только запрошенные поля"""
+    response = auth_client.get(reverse('documents:document-list'), {'fields': 'id,title'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert all(set(d) == {'id', 'title'} for d in response.data)
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_with_expand(auth_client, documents):
+    """fields и expand совмещаются, вложенные файлы не урезаются"""
+    url = reverse('documents:document-detail', args=[documents[0].slug])
+    response = auth_client.get(url, {'fields': 'title,files', 'expand': 'files'})
+
+    assert set(response.data) == {'title', 'files'}
+    assert 'file' in response.data['files'][0]
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_ignored_on_write(auth_client):
+    """На запись fields не влияет на валидацию"""
+    url = reverse('documents:document-list') + '?fields=id'
+    response = auth_client.post(url, {'title': 'New', 'description': '', 'category': 'General'})
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Document.objects.filter(title='New').exists()
+
+
+@pytest.mark.django_db
+def test_file_list_filtered_by_document(auth_client, documents):
+    """Список файлов фильтруется по документу"""
+    response = auth_client.get(
+        reverse('documents:documentfile-list'),
+        {'document': str(documents[1].id), 'fields': 'id,document'},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 2
+    assert all(set(f) == {'id', 'document'} for f in response.data)
+
+
+@pytest.mark.django_db
+def test_file_list_invalid_document_filter(auth_client):
+    """Некорректный идентификатор документа в фильтре - 400"""
+    response = auth_client.get(reverse('documents:documentfile-list'), {'document': 'nope'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -4,7 +4,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from account.models import CustomUser
-from documents.models import Document, DocumentFile
+from documents.models import Category, Document, DocumentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 
@@ -15,7 +15,7 @@ def test_upload_document_file():
     document = Document.objects.create(
         title='Test Document',
         description='Test Description',
-        category='General',
+        category=Category.objects.named('General'),
         created_by=user
     )
 
@@ -40,7 +40,7 @@ def test_upload_excel_file_success():
     document = Document.objects.create(
         title='Excel Doc',
         description='Testing Excel upload',
-        category='General',
+        category=Category.objects.named('General'),
         created_by=user
     )
     client = APIClient()
@@ -54,3 +54,44 @@ def test_upload_excel_file_success():
 
     assert response.status_code == status.HTTP_201_CREATED
     assert response.data['file'].endswith('testfile.xlsx')
+
+
+@pytest.mark.django_db
+def test_file_list_scoped_to_own_documents():
+    """Пользователь видит только файлы своих документов"""
+    owner = CustomUser.objects.create_user(email='owner@example.com', password='Testpass123')
+    stranger = CustomUser.objects.create_user(email='stranger@example.com', password='Testpass123')
+    document = Document.objects.create(title='Private', category=Category.objects.named('General'), created_by=owner)
+    document_file = DocumentFile.objects.create(
+        document=document, file=SimpleUploadedFile('secret.pdf', b'%PDF'), uploaded_by=owner
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=stranger)
+    response = client.get(reverse('documents:documentfile-list'))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == []
+
+    detail = client.get(reverse('documents:documentfile-detail', args=[document_file.id]))
+    assert detail.status_code == status.HTTP_404_NOT_FOUND
+
+    client.force_authenticate(user=owner)
+    response = client.get(reverse('documents:documentfile-list'))
+    assert [f['id'] for f in response.data] == [str(document_file.id)]
+
+
+@pytest.mark.django_db
+def test_upload_to_foreign_document_rejected():
+    """Нельзя загрузить файл в недоступный документ"""
+    owner = CustomUser.objects.create_user(email='owner@example.com', password='Testpass123')
+    stranger = CustomUser.objects.create_user(email='stranger@example.com', password='Testpass123')
+    document = Document.objects.create(title='Private', category=Category.objects.named('General'), created_by=owner)
+
+    client = APIClient()
+    client.force_authenticate(user=stranger)
+    payload = {'document': str(document.id), 'file': SimpleUploadedFile('x.pdf', b'%PDF')}
+    response = client.post(reverse('documents:documentfile-list'), payload, format='multipart')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'document' in response.data
+    assert not DocumentFile.objects.exists()
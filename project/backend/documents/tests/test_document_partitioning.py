@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from account.models import CustomUser
+from documents.ids import uuid7, uuid7_floor, uuid7_timestamp_ms
+from documents.models import Category, Document
+from documents.partitioning import add_months, create_partition_sql, month_bounds
+
+
+def test_uuid7_is_time_ordered():
+    """UUIDv7 упорядочены по времени и имеют версию 7"""
+    ids = [uuid7(timestamp_ms=1_700_000_000_000 + i) for i in range(100)]
+
+    assert ids == sorted(ids)
+    assert all(value.version == 7 and value.variant == 'specified in RFC 4122' for value in ids)
+    assert uuid7_timestamp_ms(ids[0]) == 1_700_000_000_000
+
+
+def test_month_bounds_cover_month():
+    """Границы секции месяца охватывают все UUIDv7 этого месяца и стыкуются с соседними"""
+    december = datetime(2025, 12, 1, tzinfo=timezone.utc)
+    low, high = month_bounds(december)
+    last_ms = int(datetime(2025, 12, 31, 23, 59, 59, tzinfo=timezone.utc).timestamp() * 1000)
+
+    assert low <= uuid7(timestamp_ms=int(december.timestamp() * 1000)) < high
+    assert low <= uuid7(timestamp_ms=last_ms) < high
+    assert high == month_bounds(add_months(december, 1))[0] == uuid7_floor(datetime(2026, 1, 1))
+    assert f"FROM ('{low}') TO ('{high}')" in create_partition_sql(connection, 'documents_documentfile', december)
+
+
+@pytest.mark.django_db
+def test_new_documents_get_uuid7_ids():
+    """Новые документы получают UUIDv7"""
+    user = CustomUser.objects.create_user(email='ids@example.com', password='Testpass123')
+    document = Document.objects.create(title='Doc', category=Category.objects.named('General'), created_by=user)
+
+    assert document.id.version == 7
+
+
+@pytest.mark.django_db
+def test_partition_command_requires_postgres():
+    """Команда секционирования отказывается работать не на PostgreSQL"""
+    if connection.vendor == 'postgresql':
+        pytest.skip('проверка для других СУБД')
+    with pytest.raises(CommandError):
+        call_command('partition_document_files')
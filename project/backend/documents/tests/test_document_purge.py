@@ -0,0 +1,124 @@
+import pytest
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document, DocumentFile
+from documents.purge import purge_document
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def document_with_files(user):
+    document = Document.objects.create(
+        title='Many Files', description='...', category=Category.objects.named('General'), created_by=user
+    )
+    for i in range(5):
+        DocumentFile.objects.create(
+            document=document,
+            file=SimpleUploadedFile(f'page{i}.pdf', b'%PDF-1.4 test'),
+            uploaded_by=user,
+        )
+    return document
+
+
+@pytest.mark.django_db
+def test_delete_marks_document_deleted(auth_client, document_with_files):
+    """DELETE только помечает документ, файлы остаются до фоновой очистки"""
+    url = reverse('documents:document-detail', args=[document_with_files.slug])
+    response = auth_client.delete(url)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not Document.objects.filter(id=document_with_files.id).exists()
+    assert Document.all_objects.get(id=document_with_files.id).deleted_at is not None
+    assert DocumentFile.objects.filter(document_id=document_with_files.id).count() == 5
+
+
+@pytest.mark.django_db
+def test_files_of_deleted_document_hidden(auth_client, document_with_files):
+    """Файлы удалённого документа не видны в списке файлов"""
+    document_with_files.soft_delete()
+    response = auth_client.get(reverse('documents:documentfile-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == []
+
+
+@pytest.mark.django_db
+def test_purge_document_in_batches(document_with_files, django_capture_on_commit_callbacks):
+    """Очистка удаляет строки файлов пачками, затем сам документ и файлы в хранилище"""
+    names = list(DocumentFile.objects.values_list('file', flat=True))
+    storage = DocumentFile._meta.get_field('file').storage
+    document_with_files.soft_delete()
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        purged = purge_document(document_with_files.id, batch_size=2)
+
+    assert purged == 5
+    assert len(callbacks) == 3
+    assert not DocumentFile.objects.exists()
+    assert not Document.all_objects.filter(id=document_with_files.id).exists()
+    assert not any(storage.exists(name) for name in names)
+
+
+@pytest.mark.django_db
+def test_purge_skips_alive_document(document_with_files):
+    """Неудалённый документ очисткой не трогается"""
+    assert purge_document(document_with_files.id) == 0
+    assert DocumentFile.objects.filter(document=document_with_files).count() == 5
+
+
+@pytest.mark.django_db
+def test_purge_command(document_with_files):
+    """Команда purge_deleted_documents дочищает все помеченные документы"""
+    document_with_files.soft_delete()
+    call_command('purge_deleted_documents', batch_size=3)
+
+    assert not Document.all_objects.exists()
+
+
+@pytest.mark.django_db
+def test_slug_of_deleted_document_not_reused(auth_client, user):
+    """Пока удалённый документ не вычищен, его slug не выдаётся новому"""
+    old = Document.objects.create(title='Report', category=Category.objects.named('General'), created_by=user)
+    old.soft_delete()
+    response = auth_client.post(
+        reverse('documents:document-list'),
+        {'title': 'Report', 'description': '', 'category': 'General'},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['slug'] == 'report-1'
+
+
+@pytest.mark.django_db
+def test_admin_delete_goes_through_soft_delete(client, document_with_files, settings):
+    """Удаление из админки мягкое, как в API: подтверждение не перечисляет файлы, очистка - в фоне"""
+    settings.DOCUMENTS_PURGE_ASYNC = False
+    admin = CustomUser.objects.create_superuser('admin@example.com', 'Testpass123')
+    client.force_login(admin)
+    url = reverse('admin:documents_document_delete', args=[document_with_files.pk])
+
+    confirmation = client.get(url)
+    response = client.post(url, {'post': 'yes'})
+
+    assert confirmation.status_code == 200
+    assert 'page0' not in confirmation.content.decode()
+    assert response.status_code == 302
+    assert Document.all_objects.get(id=document_with_files.id).deleted_at is not None
+    assert DocumentFile.objects.filter(document_id=document_with_files.id).count() == 5
+    assert purge_document(document_with_files.id) == 5
+    assert not Document.all_objects.filter(id=document_with_files.id).exists()
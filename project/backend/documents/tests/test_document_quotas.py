@@ -0,0 +1,114 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document, DocumentFile
+from documents.purge import purge_document
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='quota@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def document(user):
+    return Document.objects.create(title='Quota Doc', category=Category.objects.named('General'), created_by=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def upload(client, document, content):
+    payload = {'document': str(document.id), 'file': SimpleUploadedFile('scan.pdf', content)}
+    return client.post(reverse('documents:documentfile-list'), payload, format='multipart')
+
+
+def used(user):
+    user.refresh_from_db()
+    return user.storage_used
+
+
+@pytest.mark.django_db
+def test_upload_counts_towards_usage(client, user, document):
+    """Загрузка записывает размер файла и увеличивает счётчик загрузившего"""
+    response = upload(client, document, b'x' * 1000)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['size'] == 1000
+    assert used(user) == 1000
+    assert client.get(reverse('account:me')).data['storage_used'] == 1000
+
+
+@pytest.mark.django_db
+def test_over_quota_upload_rejected(client, user, document):
+    """Загрузка сверх квоты отклоняется с 413, файл не сохраняется"""
+    user.storage_quota = 1500
+    user.save()
+    assert upload(client, document, b'x' * 1000).status_code == status.HTTP_201_CREATED
+
+    response = upload(client, document, b'x' * 1000)
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert DocumentFile.objects.filter(document=document).count() == 1
+    assert used(user) == 1000
+
+
+@pytest.mark.django_db
+def test_file_cannot_be_replaced_in_place(client, user, document):
+    """PATCH с новым файлом отклоняется: квота, размер и хеш остаются прежними"""
+    user.storage_quota = 20
+    user.save()
+    created = upload(client, document, b'x' * 10).data
+
+    response = client.patch(
+        reverse('documents:documentfile-detail', args=[created['id']]),
+        {'file': SimpleUploadedFile('big.pdf', b'y' * 5000)},
+        format='multipart',
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'file' in response.data
+    document_file = DocumentFile.objects.get(pk=created['id'])
+    assert document_file.size == 10
+    assert document_file.file.read() == b'x' * 10
+    assert used(user) == 10
+
+
+@pytest.mark.django_db
+def test_destroy_and_purge_release_usage(client, user, document):
+    """Удаление файла и очистка удалённого документа возвращают место"""
+    first = upload(client, document, b'x' * 300).data
+    upload(client, document, b'y' * 200)
+
+    client.delete(reverse('documents:documentfile-detail', args=[first['id']]))
+    assert used(user) == 200
+
+    document.soft_delete()
+    purge_document(document.pk)
+    assert used(user) == 0
+
+
+@pytest.mark.django_db
+def test_reconcile_storage_usage(user, document):
+    """Команда заполняет размеры старых файлов и пересчитывает счётчики пачками"""
+    other = CustomUser.objects.create_user(email='other@example.com', password='Testpass123')
+    CustomUser.objects.filter(pk=other.pk).update(storage_used=999)
+    legacy = DocumentFile(document=document, uploaded_by=user)
+    legacy.file.save('legacy.pdf', ContentFile(b'z' * 700))
+    assert legacy.size == 0
+
+    call_command('reconcile_storage_usage', '--fill-sizes', '--batch-size', '1')
+
+    legacy.refresh_from_db()
+    assert legacy.size == 700
+    assert used(user) == 700
+    assert used(other) == 0
@@ -0,0 +1,77 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from account.models import CustomUser
+from documents.models import Category, Document, DocumentFile
+from documents.readers import DocumentFileReader, DocumentReader
+from documents.serializers import DocumentFileSerializer, DocumentSerializer
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def documents(user):
+    result = []
+    for i in range(4):
+        document = Document.objects.create(
+            title=f'Doc {i}', description='Описание' * i, category=Category.objects.named('General'), created_by=user
+        )
+        first = DocumentFile.objects.create(
+            document=document, file=SimpleUploadedFile(f'd{i}.pdf', b'%PDF'), uploaded_by=user
+        )
+        DocumentFile.objects.create(
+            document=document, file=SimpleUploadedFile(f'd{i}-v2.pdf', b'%PDF 2'),
+            uploaded_by=None, previous=first, root=first, version=2,
+        )
+        result.append(document)
+    return result
+
+
+def make_context(user, query=''):
+    request = Request(APIRequestFactory().get('/api/documents/documents/' + query))
+    request.user = user
+    return {'request': request}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['', '?expand=files', '?fields=id,title', '?fields=slug,files&expand=files'])
+def test_document_reader_matches_serializer(user, documents, query):
+    """Быстрый путь выдаёт ровно то же, что DocumentSerializer"""
+    context = make_context(user, query)
+    queryset = Document.objects.order_by('title').select_related('created_by').prefetch_related('files')
+
+    expected = DocumentSerializer(queryset, many=True, context=context).data
+
+    assert DocumentReader(context).read(queryset) == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['', '?fields=id,file,uploaded_by'])
+def test_file_reader_matches_serializer(user, documents, query):
+    """Быстрый путь выдаёт ровно то же, что DocumentFileSerializer"""
+    context = make_context(user, query)
+    queryset = DocumentFile.objects.order_by('uploaded_at')
+
+    expected = DocumentFileSerializer(queryset, many=True, context=context).data
+
+    assert DocumentFileReader(context).read(queryset) == expected
+
+
+@pytest.mark.django_db
+def test_list_endpoint_uses_fast_path(user, documents, django_assert_num_queries):
+    """Список с файлами - два запроса, ответ совпадает с деталями документа"""
+    client = APIClient()
+    client.force_authenticate(user=user)
+    with django_assert_num_queries(2):
+        response = client.get(reverse('documents:document-list'), {'expand': 'files'})
+
+    listed = {d['slug']: d for d in response.json()}
+    detail = client.get(
+        reverse('documents:document-detail', args=[documents[0].slug]), {'expand': 'files'}
+    ).json()
+    assert listed[documents[0].slug] == detail
@@ -0,0 +1,200 @@
+import pytest
+from django.contrib.auth.models import Group
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document, DocumentAccess, DocumentFile, DocumentGrant
+
+
+@pytest.fixture
+def owner():
+    return CustomUser.objects.create_user(email='owner@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def reader():
+    return CustomUser.objects.create_user(email='reader@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def document(owner):
+    return Document.objects.create(title='Shared Doc', category=Category.objects.named('General'), created_by=owner)
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def grant(owner, document, **payload):
+    url = reverse('documents:document-grants', args=[document.slug])
+    return client_for(owner).post(url, payload)
+
+
+@pytest.mark.django_db
+def test_owner_gets_access_row(owner, document):
+    """Автор получает строку полного доступа при создании документа"""
+    access = DocumentAccess.objects.get(document=document)
+
+    assert access.user == owner
+    assert access.can_write
+
+
+@pytest.mark.django_db
+def test_list_shows_only_visible_documents(owner, reader, document):
+    """Список содержит только документы с доступом"""
+    Document.objects.create(title='Reader Doc', category=Category.objects.named('General'), created_by=reader)
+    response = client_for(reader).get(reverse('documents:document-list'))
+
+    assert [d['title'] for d in response.data] == ['Reader Doc']
+
+
+@pytest.mark.django_db
+def test_user_read_grant(owner, reader, document):
+    """Доступ на чтение: документ виден, но изменить нельзя"""
+    response = grant(owner, document, user=reader.email)
+    assert response.status_code == status.HTTP_201_CREATED
+
+    client = client_for(reader)
+    url = reverse('documents:document-detail', args=[document.slug])
+    assert client.get(url).status_code == status.HTTP_200_OK
+    assert client.patch(url, {'title': 'Changed'}).status_code == status.HTTP_403_FORBIDDEN
+    assert len(client.get(reverse('documents:document-list')).data) == 1
+
+
+@pytest.mark.django_db
+def test_user_write_grant(owner, reader, document):
+    """Доступ на запись: можно изменять документ и загружать файлы, но не удалять"""
+    grant(owner, document, user=reader.email, can_write=True)
+    client = client_for(reader)
+    url = reverse('documents:document-detail', args=[document.slug])
+
+    assert client.patch(url, {'description': 'Edited'}).status_code == status.HTTP_200_OK
+    upload = client.post(
+        reverse('documents:documentfile-list'),
+        {'document': str(document.id), 'file': SimpleUploadedFile('a.pdf', b'%PDF')},
+        format='multipart',
+    )
+    assert upload.status_code == status.HTTP_201_CREATED
+    assert client.delete(url).status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_read_grant_cannot_upload(owner, reader, document):
+    """С доступом только на чтение файл загрузить нельзя"""
+    grant(owner, document, user=reader.email)
+    response = client_for(reader).post(
+        reverse('documents:documentfile-list'),
+        {'document': str(document.id), 'file': SimpleUploadedFile('a.pdf', b'%PDF')},
+        format='multipart',
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_group_grant_follows_membership(owner, reader, document):
+    """Групповой доступ появляется и исчезает вместе с членством в группе"""
+    group = Group.objects.create(name='accounting')
+    grant(owner, document, group=group.name, can_write=True)
+    assert not DocumentAccess.objects.filter(user=reader).exists()
+
+    reader.groups.add(group)
+    assert DocumentAccess.objects.get(user=reader, document=document).can_write
+
+    reader.groups.remove(group)
+    assert not DocumentAccess.objects.filter(user=reader).exists()
+
+    group.user_set.add(reader)
+    assert DocumentAccess.objects.filter(user=reader).exists()
+    group.user_set.clear()
+    assert not DocumentAccess.objects.filter(user=reader).exists()
+
+
+@pytest.mark.django_db
+def test_strongest_grant_wins(owner, reader, document):
+    """При нескольких grant-ах действует наиболее сильный"""
+    group = Group.objects.create(name='editors')
+    reader.groups.add(group)
+    grant(owner, document, user=reader.email)
+    grant(owner, document, group=group.name, can_write=True)
+    assert DocumentAccess.objects.get(user=reader).can_write
+
+    DocumentGrant.objects.get(group=group).delete()
+    assert not DocumentAccess.objects.get(user=reader).can_write
+
+
+@pytest.mark.django_db
+def test_revoke_grant(owner, reader, document):
+    """Отзыв доступа убирает документ и его файлы из выдачи"""
+    grant_id = grant(owner, document, user=reader.email).data['id']
+    DocumentFile.objects.create(document=document, file=SimpleUploadedFile('a.pdf', b'%PDF'), uploaded_by=owner)
+    client = client_for(reader)
+    assert len(client.get(reverse('documents:documentfile-list')).data) == 1
+
+    url = reverse('documents:document-revoke-grant', args=[document.slug, grant_id])
+    assert client_for(owner).delete(url).status_code == status.HTTP_204_NO_CONTENT
+    assert client.get(reverse('documents:documentfile-list')).data == []
+    assert client.get(reverse('documents:document-list')).data == []
+
+
+@pytest.mark.django_db
+def test_only_owner_manages_grants(owner, reader, document):
+    """Выдавать доступ может только автор"""
+    grant(owner, document, user=reader.email, can_write=True)
+    stranger = CustomUser.objects.create_user(email='x@example.com', password='Testpass123')
+    url = reverse('documents:document-grants', args=[document.slug])
+    response = client_for(reader).post(url, {'user': stranger.email})
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_grant_requires_user_or_group(owner, document):
+    """Нужно указать ровно одно: пользователя или группу"""
+    response = grant(owner, document)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_permission_check_without_extra_queries(owner, document):
+    """Проверка прав на детальном запросе не делает отдельного запроса"""
+    client = client_for(owner)
+    url = reverse('documents:document-detail', args=[document.slug])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+
+    # Запись в журнал доступа в тестах синхронная, в работе она уходит в фоновый поток
+    assert len([query for query in queries if 'audit_auditevent' not in query['sql']]) == 1
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_purge_removes_grants_and_access(owner, reader, document):
+    """Очистка удалённого документа убирает grant-ы и строки доступа"""
+    from documents.purge import purge_document
+    grant(owner, document, user=reader.email)
+    document.soft_delete()
+    purge_document(document.id)
+
+    assert not DocumentGrant.objects.exists()
+    assert not DocumentAccess.objects.exists()
+
+
+@pytest.mark.django_db
+def test_unshared_document_is_not_found(owner, reader, document):
+    """Документ без доступа для пользователя - 404 на любом действии, включая действия автора"""
+    client = client_for(reader)
+    detail = reverse('documents:document-detail', args=[document.slug])
+
+    assert client.get(detail).status_code == status.HTTP_404_NOT_FOUND
+    assert client.patch(detail, {'title': 'Changed'}).status_code == status.HTTP_404_NOT_FOUND
+    assert client.delete(detail).status_code == status.HTTP_404_NOT_FOUND
+    grants = reverse('documents:document-grants', args=[document.slug])
+    assert client.post(grants, {'user': reader.email}).status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,78 @@
+import io
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document
+from documents.storage import CompressedFileSystemStorage
+
+TEXT = b''.join(f'line {i}: quarterly report\n'.encode() for i in range(20000))
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return CompressedFileSystemStorage(location=tmp_path, chunk_size=64 * 1024)
+
+
+def test_compressed_roundtrip_and_seek(storage):
+    """Текст сжимается кусками, а чтение с середины отдаёт исходные байты"""
+    name = storage.save('report.txt', ContentFile(TEXT))
+
+    assert storage.is_compressed(name)
+    assert storage.size(name) == len(TEXT)
+    assert storage.stored_size(name) < len(TEXT) // 4
+    with storage.open(name) as handle:
+        assert handle.read() == TEXT
+        handle.seek(200000)
+        assert handle.read(1000) == TEXT[200000:201000]
+        assert handle.size == len(TEXT)
+
+
+def test_precompressed_and_incompressible_stored_raw(storage):
+    """Уже сжатые форматы и несжимаемые данные пишутся как есть"""
+    noise = os.urandom(50000)
+    docx = storage.save('contract.docx', ContentFile(TEXT))
+    random = storage.save('noise.bin', ContentFile(noise))
+
+    assert not storage.is_compressed(docx)
+    assert not storage.is_compressed(random)
+    with storage.open(random) as handle:
+        assert handle.read() == noise
+
+
+@pytest.mark.django_db
+def test_download_supports_ranges(settings, tmp_path):
+    """Скачивание отдаёт файл целиком и по Range, диапазон за концом файла - 416"""
+    settings.MEDIA_ROOT = tmp_path
+    user = CustomUser.objects.create_user(email='ranges@example.com', password='Testpass123')
+    document = Document.objects.create(title='Ranges', category=Category.objects.named('General'), created_by=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    created = client.post(
+        reverse('documents:documentfile-list'),
+        {'document': str(document.id), 'file': SimpleUploadedFile('big.pdf', TEXT)},
+        format='multipart',
+    )
+    url = reverse('documents:documentfile-download', args=[created.data['id']])
+
+    full = client.get(url)
+    partial = client.get(url, HTTP_RANGE='bytes=100000-100099')
+    suffix = client.get(url, HTTP_RANGE='bytes=-10')
+
+    assert full.status_code == status.HTTP_200_OK
+    assert b''.join(full.streaming_content) == TEXT
+    assert partial.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert partial['Content-Range'] == f'bytes 100000-100099/{len(TEXT)}'
+    assert b''.join(partial.streaming_content) == TEXT[100000:100100]
+    assert b''.join(suffix.streaming_content) == TEXT[-10:]
+    assert client.get(url, HTTP_RANGE=f'bytes={len(TEXT)}-').status_code == 416
+
+    out = io.StringIO()
+    call_command('storage_compression_stats', stdout=out)
+    assert '.pdf' in out.getvalue()
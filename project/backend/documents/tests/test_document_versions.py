@@ -0,0 +1,160 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Document, DocumentFile, DocumentRevision, SNAPSHOT_EVERY
+
+
+@pytest.fixture
+def user():
+    return CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+
+
+@pytest.fixture
+def auth_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def document(auth_client):
+    response = auth_client.post(
+        reverse('documents:document-list'),
+        {'title': 'Contract', 'description': 'Draft', 'category': 'Contracts'},
+    )
+    return Document.objects.get(id=response.data['id'])
+
+
+def upload(client, document, content, previous=None, name='scan.pdf'):
+    payload = {'document': str(document.id), 'file': SimpleUploadedFile(name, content)}
+    if previous:
+        payload['previous'] = str(previous)
+    return client.post(reverse('documents:documentfile-list'), payload, format='multipart')
+
+
+@pytest.mark.django_db
+def test_create_records_first_revision(document):
+    """Создание документа записывает ревизию 1 с полным состоянием"""
+    revision = DocumentRevision.objects.get(document=document)
+
+    assert revision.version == 1
+    assert revision.changes == {'title': 'Contract', 'description': 'Draft', 'category': 'Contracts'}
+    assert revision.snapshot == revision.changes
+
+
+@pytest.mark.django_db
+def test_update_records_only_changed_fields(auth_client, document):
+    """Ревизия обновления хранит только изменившиеся поля"""
+    url = reverse('documents:document-detail', args=[document.slug])
+    auth_client.patch(url, {'description': 'Signed', 'category': 'Contracts'})
+
+    response = auth_client.get(reverse('documents:document-revisions', args=[document.slug]))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [r['version'] for r in response.data] == [1, 2]
+    assert response.data[1]['changes'] == {'description': 'Signed'}
+    assert response.data[1]['changed_by'] == 'user@example.com'
+
+
+@pytest.mark.django_db
+def test_update_without_changes_adds_no_revision(auth_client, document):
+    """Обновление без изменений не создаёт ревизию"""
+    url = reverse('documents:document-detail', args=[document.slug])
+    auth_client.patch(url, {'title': 'Contract'})
+
+    assert DocumentRevision.objects.filter(document=document).count() == 1
+
+
+@pytest.mark.django_db
+def test_fetch_revision_state(auth_client, document):
+    """Состояние любой версии восстанавливается из опорной ревизии и дельт"""
+    url = reverse('documents:document-detail', args=[document.slug])
+    for i in range(SNAPSHOT_EVERY + 2):
+        auth_client.patch(url, {'description': f'Edit {i}'})
+    document.refresh_from_db()
+
+    response = auth_client.get(reverse('documents:document-revision', args=[document.slug, 2]))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['description'] == 'Edit 0'
+    assert response.data['title'] == 'Contract'
+
+    last = SNAPSHOT_EVERY + 3
+    response = auth_client.get(reverse('documents:document-revision', args=[document.slug, last]))
+    assert response.data['description'] == f'Edit {SNAPSHOT_EVERY + 1}'
+    assert response.data['version'] == last
+
+    response = auth_client.get(reverse('documents:document-revision', args=[document.slug, last + 1]))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_file_version_chain_reuses_unchanged_blob(auth_client, document):
+    """Новая версия с тем же содержимым ссылается на тот же файл в хранилище"""
+    first = upload(auth_client, document, b'%PDF page one').data
+    second = upload(auth_client, document, b'%PDF page one', previous=first['id']).data
+    third = upload(auth_client, document, b'%PDF page two', previous=second['id']).data
+
+    v1 = DocumentFile.objects.get(id=first['id'])
+    v2 = DocumentFile.objects.get(id=second['id'])
+    v3 = DocumentFile.objects.get(id=third['id'])
+    assert DocumentFile.objects.count() == 3
+    assert v2.file.name == v1.file.name
+    assert v3.file.name != v1.file.name
+    assert (v2.version, v3.version) == (2, 3)
+    assert v2.root_id == v3.root_id == v1.id
+
+    response = auth_client.get(reverse('documents:documentfile-versions', args=[third['id']]))
+    assert [f['id'] for f in response.data] == [first['id'], second['id'], third['id']]
+
+
+@pytest.mark.django_db
+def test_file_version_cannot_branch(auth_client, document):
+    """У версии файла может быть только одна следующая версия"""
+    first = upload(auth_client, document, b'%PDF v1').data
+    upload(auth_client, document, b'%PDF v2', previous=first['id'])
+    response = upload(auth_client, document, b'%PDF v2b', previous=first['id'])
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'previous' in response.data
+
+
+@pytest.mark.django_db
+def test_file_version_chain_survives_root_delete(auth_client, document):
+    """Удаление первой версии не разрывает цепочку, previous после загрузки не меняется"""
+    first = upload(auth_client, document, b'%PDF v1').data
+    second = upload(auth_client, document, b'%PDF v2', previous=first['id']).data
+    third = upload(auth_client, document, b'%PDF v3', previous=second['id']).data
+
+    response = auth_client.patch(
+        reverse('documents:documentfile-detail', args=[third['id']]), {'previous': first['id']}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    auth_client.delete(reverse('documents:documentfile-detail', args=[first['id']]))
+
+    v2 = DocumentFile.objects.get(id=second['id'])
+    v3 = DocumentFile.objects.get(id=third['id'])
+    assert (v2.root_id, v2.previous_id) == (None, None)
+    assert (v3.root_id, str(v3.previous_id)) == (v2.id, second['id'])
+    assert [str(version.id) for version in v3.chain()] == [second['id'], third['id']]
+
+
+@pytest.mark.django_db
+def test_file_version_cannot_move_to_another_document(auth_client, user, document):
+    """Версию нельзя перенести в другой документ: её blob общий с предыдущей версией"""
+    other = Document.objects.create(title='Other', category=document.category, created_by=user)
+    first = upload(auth_client, document, b'%PDF same').data
+    second = upload(auth_client, document, b'%PDF same', previous=first['id']).data
+
+    response = auth_client.patch(
+        reverse('documents:documentfile-detail', args=[second['id']]), {'document': str(other.id)}
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'document' in response.data
+    v1, v2 = DocumentFile.objects.get(id=first['id']), DocumentFile.objects.get(id=second['id'])
+    assert v1.file.name == v2.file.name
+    assert v2.document_id == document.id
@@ -0,0 +1,92 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from account import stats as user_stats
+from account.quotas import release_storage, reserve_storage
+from . import changes
+from .duplicates import hash_rows, image_hash
+from .models import ChangeLogEntry, DocumentFile, PerceptualHash, compute_sha256
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Общий пул на процесс: параллельные пакеты не умножают число потоков
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DOCUMENTS_UPLOAD_WORKERS', 4),
+                thread_name_prefix='documents-upload',
+            )
+        return _executor
+
+
+def _store(instance, upload):
+    """Считает SHA-256 и перцептивный хеш и пишет файл в хранилище; выполняется в пуле."""
+    field = DocumentFile._meta.get_field('file')
+    instance.sha256 = compute_sha256(upload)
+    instance.perceptual_hash = image_hash(upload)
+    name = field.generate_filename(instance, upload.name)
+    instance.file.name = field.storage.save(name, upload, max_length=field.max_length)
+    return instance
+
+
+def _delete_blobs(names):
+    storage = DocumentFile._meta.get_field('file').storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning('Не удалось удалить файл %s', name, exc_info=True)
+
+
+def store_batch(document, uploads, user):
+    """
+    Сохраняет уже проверенные файлы пакетом: место резервируется одним UPDATE,
+    файлы пишутся в хранилище параллельно, строки вставляются одним bulk_create.
+    Возвращает (созданные DocumentFile, [(имя файла, ошибка)]).
+    """
+    if not uploads:
+        return [], []
+    instances = [
+        DocumentFile(document=document, uploaded_by=user, size=upload.size)
+        for upload in uploads
+    ]
+    stored = []
+    failures = []
+    total = sum(upload.size for upload in uploads)
+    with transaction.atomic():
+        reserve_storage(user.pk, total)
+        futures = [
+            (upload, _get_executor().submit(_store, instance, upload))
+            for instance, upload in zip(instances, uploads)
+        ]
+        # Дожидаемся всех записей, даже если какие-то упали: иначе потеряем имена файлов
+        for upload, future in futures:
+            try:
+                stored.append(future.result())
+            except Exception:
+                logger.exception('Не удалось сохранить файл %s', upload.name)
+                failures.append((upload.name, 'Не удалось сохранить файл.'))
+        try:
+            release_storage({user.pk: total - sum(instance.size for instance in stored)})
+            created = DocumentFile.objects.bulk_create(stored)
+            PerceptualHash.objects.bulk_create([
+                row for instance in created if instance.perceptual_hash is not None
+                for row in hash_rows(instance, instance.perceptual_hash)
+            ])
+            user_stats.files_added(user.pk, created, document.slug)
+            ChangeLogEntry.objects.record_many(changes.CREATED, document, created)
+        except Exception:
+            # Строки не вставлены - записанные файлы больше никому не нужны
+            _delete_blobs([instance.file.name for instance in stored])
+            raise
+    return created, failures
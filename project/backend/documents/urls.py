@@ -1,13 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DocumentViewSet, DocumentFileViewSet
+from .views import CategoryViewSet, ChangeLogViewSet, DocumentViewSet, DocumentFileViewSet, document_events, document_events_ticket
 
 router = DefaultRouter()
 router.register(r'documents', DocumentViewSet, basename='document')
 router.register(r'files', DocumentFileViewSet, basename='documentfile')
+router.register(r'categories', CategoryViewSet, basename='category')
+router.register(r'changes', ChangeLogViewSet, basename='change')
 
 app_name = 'documents'
 
 urlpatterns = [
+    path('events/', document_events, name='events'),
+    path('events/ticket/', document_events_ticket, name='events-ticket'),
     path('', include(router.urls)),
 ]
@@ -1,24 +1,499 @@
-from rest_framework import viewsets, permissions
-from .models import Document, DocumentFile
-from .serializers import DocumentSerializer, DocumentFileSerializer
-from .permissions import IsOwnerOrReadOnly
+import asyncio
+import json
+import mimetypes
+import os
+import re
+import uuid
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max, Prefetch
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from account.quotas import check_storage, release_storage
+from audit import actions as audit_actions
+from audit.writer import record as record_access, record_change
+from .models import CategoryCount, ChangeLogEntry, Document, DocumentFile, DocumentGrant, DocumentRevision
+from .serializers import (
+    CategorySerializer,
+    ChangeLogEntrySerializer,
+    DocumentSerializer,
+    DocumentFileSerializer,
+    DocumentGrantSerializer,
+    DocumentRevisionSerializer,
+    parse_query_list,
+)
+from .duplicates import find_duplicates
+from .permissions import HasDocumentAccess
+from .events import broker, issue_ticket, ticket_user
+from .purge import schedule_purge
+from .readers import DocumentFileReader, DocumentReader
+from .uploads import store_batch
 
+# Оценка служебной части multipart-запроса (границы, заголовки частей, поля формы)
+MULTIPART_OVERHEAD = 4096
 
-class DocumentViewSet(viewsets.ModelViewSet):
+# Один диапазон вида bytes=START-END, bytes=START- или bytes=-SUFFIX
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)')
+DOWNLOAD_BLOCK_SIZE = 64 * 1024
+
+# Пауза перед повторным чтением журнала, пока запись из сигнала не видна, секунд
+SETTLE_POLL_MIN = 0.05
+SETTLE_POLL_MAX = 2.0
+
+
+class FastListMixin:
+    """
+    list() через ValuesReader вместо ModelSerializer на каждую строку.
+    С включённой пагинацией используется обычный путь DRF.
+    """
+    list_reader_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        reader = self.list_reader_class(self.get_serializer_context())
+        return Response(reader.read(queryset))
+
+
+class DocumentViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Document.objects.all()
     serializer_class = DocumentSerializer
-    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    permission_classes = [permissions.IsAuthenticated, HasDocumentAccess]
     lookup_field = 'slug'  # Используем slug вместо id для URL
+    list_reader_class = DocumentReader
+
+    def get_queryset(self):
+        user = self.request.user
+        if self.action == 'list':
+            # Только видимые документы, права берём из того же JOIN
+            queryset = Document.objects.accessible_to(user).annotate(user_can_write=F('access__can_write'))
+        else:
+            queryset = Document.objects.with_access_for(user)
+        queryset = queryset.select_related('created_by', 'category')
+        if 'files' in parse_query_list(self.request, 'expand'):
+            # ?expand=files: все файлы страницы одним дополнительным запросом
+            queryset = queryset.prefetch_related(
+                Prefetch('files', queryset=DocumentFile.objects.order_by('uploaded_at'))
+            )
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        record_access(request, audit_actions.READ, instance.pk)
+        return Response(self.get_serializer(instance).data)
 
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
-        
-        
-        
-class DocumentFileViewSet(viewsets.ModelViewSet):
-    queryset = DocumentFile.objects.all()
+        instance = serializer.save(created_by=self.request.user)
+        record_change(self.request, audit_actions.CREATE, instance.pk)
+
+    def perform_update(self, serializer):
+        instance = serializer.save()
+        record_change(self.request, audit_actions.UPDATE, instance.pk)
+
+    def perform_destroy(self, instance):
+        # Мгновенно скрываем документ, файлы удаляются в фоне пачками
+        instance.soft_delete()
+        record_change(self.request, audit_actions.DELETE, instance.pk)
+        transaction.on_commit(lambda: schedule_purge(instance.pk))
+
+    @action(detail=True, methods=['get'])
+    def revisions(self, request, slug=None):
+        """История изменений метаданных документа."""
+        document = self.get_object()
+        revisions = document.revisions.select_related('changed_by')
+        return Response(DocumentRevisionSerializer(revisions, many=True).data)
+
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<version>\d+)')
+    def revision(self, request, slug=None, version=None):
+        """Состояние метаданных документа на указанную версию."""
+        document = self.get_object()
+        state = DocumentRevision.objects.state_at(document, int(version))
+        if state is None:
+            raise NotFound('Версия не найдена.')
+        return Response(state)
+
+    @action(detail=True, methods=['get', 'post'])
+    def grants(self, request, slug=None):
+        """Список выданных доступов или выдача доступа пользователю/группе."""
+        document = self.get_object()
+        if request.method == 'GET':
+            grants = document.grants.select_related('user', 'group')
+            return Response(DocumentGrantSerializer(grants, many=True).data)
+
+        serializer = DocumentGrantSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            grant, created = DocumentGrant.objects.update_or_create(
+                document=document,
+                user=serializer.validated_data.get('user'),
+                group=serializer.validated_data.get('group'),
+                defaults={
+                    'can_write': serializer.validated_data.get('can_write', False),
+                    'granted_by': request.user,
+                },
+            )
+        return Response(
+            DocumentGrantSerializer(grant).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=['delete'], url_path=r'grants/(?P<grant_id>\d+)')
+    def revoke_grant(self, request, slug=None, grant_id=None):
+        """Отзывает выданный доступ."""
+        document = self.get_object()
+        with transaction.atomic():
+            deleted, _ = document.grants.filter(pk=grant_id).delete()
+        if not deleted:
+            raise NotFound('Доступ не найден.')
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+
+class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Фасет категорий по документам, доступным пользователю: читаются только его
+    строки CategoryCount - O(категорий), без агрегации по документам.
+    """
+    serializer_class = CategorySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'category__name'
+    lookup_url_kwarg = 'name'
+    pagination_class = None
+
+    def get_queryset(self):
+        return (
+            CategoryCount.objects
+            .filter(user=self.request.user, document_count__gt=0)
+            .select_related('category')
+            .order_by('category__name')
+        )
+
+
+class ChangeLogViewSet(viewsets.GenericViewSet):
+    """
+    Лента изменений для синхронизации: ?since=<seq> отдаёт записи после курсора
+    одним запросом по диапазону первичного ключа. Клиент повторяет запрос
+    с since=next, пока has_more.
+    """
+    serializer_class = ChangeLogEntrySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 500
+    max_limit = 1000
+
+    def _int_param(self, name, default):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except ValueError:
+            raise ValidationError({name: 'Ожидается целое число.'})
+        if value < 0:
+            raise ValidationError({name: 'Ожидается неотрицательное число.'})
+        return value
+
+    def list(self, request):
+        since = self._int_param('since', 0)
+        limit = min(self._int_param('limit', self.default_limit) or self.default_limit, self.max_limit)
+        entries = list(
+            ChangeLogEntry.objects.visible_to(request.user)
+            .settled()
+            .filter(seq__gt=since)
+            .order_by('seq')[:limit + 1]
+        )
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        return Response({
+            'changes': self.get_serializer(entries, many=True).data,
+            'next': entries[-1].seq if entries else since,
+            'has_more': has_more,
+        })
+
+
+class DocumentFileViewSet(FastListMixin, viewsets.ModelViewSet):
     serializer_class = DocumentFileSerializer
+    list_reader_class = DocumentFileReader
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        # Пользователь видит только файлы доступных ему документов,
+        # менять и удалять может только при доступе на запись
+        if self.request.method in permissions.SAFE_METHODS:
+            queryset = DocumentFile.objects.accessible_to(self.request.user)
+        else:
+            queryset = DocumentFile.objects.writable_by(self.request.user)
+        queryset = queryset.order_by('uploaded_at')
+        document_id = self.request.query_params.get('document')
+        if document_id:
+            try:
+                document_id = uuid.UUID(document_id)
+            except ValueError:
+                raise ValidationError({'document': 'Некорректный идентификатор документа.'})
+            queryset = queryset.filter(document_id=document_id)
+        return queryset
+
+    def check_content_length(self, request):
+        # Отказ по Content-Length до разбора multipart, тело не пишется во временные файлы.
+        # Заголовок включает служебные части multipart, их вычитаем с запасом.
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        check_storage(request.user, content_length - MULTIPART_OVERHEAD)
+
+    def create(self, request, *args, **kwargs):
+        self.check_content_length(request)
+        response = super().create(request, *args, **kwargs)
+        # Предупреждение, а не ошибка: файл уже сохранён
+        response.data['duplicates'] = self.duplicates
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        record_access(request, audit_actions.READ, instance.document_id, instance.pk)
+        return Response(self.get_serializer(instance).data)
+
     def perform_create(self, serializer):
-        serializer.save(uploaded_by=self.request.user)
+        instance = serializer.save(uploaded_by=self.request.user)
+        record_change(self.request, audit_actions.CREATE, instance.document_id, instance.pk)
+        self.duplicates = find_duplicates(self.request.user, instance)
+
+    def perform_update(self, serializer):
+        instance = serializer.save()
+        record_change(self.request, audit_actions.UPDATE, instance.document_id, instance.pk)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        release_storage({instance.uploaded_by_id: instance.size})
+        record_change(self.request, audit_actions.DELETE, instance.document_id, instance.pk)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Пакетная загрузка: document и несколько files в одном multipart-запросе.
+        Каждый файл проверяется как при обычной загрузке; ответ 201, если
+        сохранены все, 207 - если часть, 400 - если ни одного.
+        """
+        self.check_content_length(request)
+        try:
+            document_id = uuid.UUID(str(request.data.get('document', '')))
+        except ValueError:
+            raise ValidationError({'document': 'Некорректный идентификатор документа.'})
+        document = Document.objects.writable_by(request.user).filter(pk=document_id).first()
+        if document is None:
+            raise ValidationError({'document': 'Документ не найден или недоступен для записи.'})
+
+        uploads = request.FILES.getlist('files')
+        max_files = settings.DOCUMENTS_BATCH_MAX_FILES
+        if not uploads:
+            raise ValidationError({'files': 'Не передано ни одного файла.'})
+        if len(uploads) > max_files:
+            raise ValidationError({'files': f'За один запрос можно загрузить не больше {max_files} файлов.'})
+
+        validator = self.get_serializer()
+        valid = []
+        failed = []
+        for upload in uploads:
+            try:
+                valid.append(validator.validate_file(upload))
+            except ValidationError as exc:
+                failed.append({'file': upload.name, 'errors': exc.detail})
+
+        created, store_failures = store_batch(document, valid, request.user)
+        for instance in created:
+            record_change(request, audit_actions.CREATE, document.pk, instance.pk)
+        failed.extend({'file': name, 'errors': [error]} for name, error in store_failures)
+
+        if not created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        created_data = self.get_serializer(created, many=True).data
+        for instance, item in zip(created, created_data):
+            item['duplicates'] = find_duplicates(request.user, instance)
+        return Response({'created': created_data, 'failed': failed}, status=response_status)
+
+    @action(detail=True, methods=['get'])
+    def versions(self, request, pk=None):
+        """Все версии файла, от первой до последней."""
+        versions = self.get_object().chain()
+        return Response(self.get_serializer(versions, many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Содержимое файла с поддержкой Range: сжатые в хранилище файлы
+        распаковываются на лету, начиная с фрейма, где лежит запрошенный байт.
+        """
+        document_file = self.get_object()
+        name = document_file.file.name
+        handle = document_file.file.storage.open(name, 'rb')
+        size = handle.size
+        byte_range = _parse_range(request.headers.get('Range'), size)
+        if byte_range is False:
+            handle.close()
+            response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        record_access(request, audit_actions.DOWNLOAD, document_file.document_id, document_file.pk)
+        start, end = byte_range or (0, size - 1)
+        response = StreamingHttpResponse(
+            _iter_range(handle, start, end - start + 1),
+            status=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream',
+        )
+        response['Content-Length'] = str(max(end - start + 1, 0))
+        response['Accept-Ranges'] = 'bytes'
+        response['Content-Disposition'] = f'attachment; filename="{os.path.basename(name)}"'
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
+
+
+def _parse_range(header, size):
+    """
+    (start, end) включительно для одного диапазона, None - отдать файл целиком
+    (нет заголовка или несколько диапазонов), False - диапазон вне файла.
+    """
+    match = RANGE_RE.fullmatch((header or '').strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _iter_range(handle, start, length):
+    try:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(DOWNLOAD_BLOCK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        handle.close()
+
+
+def _stream_user(request):
+    """Пользователь по JWT из заголовка или по билету ?ticket= (EventSource не умеет заголовки)."""
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        ticket = request.GET.get('ticket')
+        return ticket_user(ticket) if ticket else None
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(header[len('Bearer '):].strip()))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _changes_after(user, seq, limit):
+    entries = ChangeLogEntry.objects.visible_to(user).settled().filter(seq__gt=seq).order_by('seq')[:limit]
+    return ChangeLogEntrySerializer(entries, many=True).data
+
+
+def _log_head():
+    return ChangeLogEntry.objects.settled().aggregate(head=Max('seq'))['head'] or 0
+
+
+def _format_event(event):
+    return f"id: {event['seq']}\nevent: {event['action']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _event_stream(user, last_seq, subscription):
+    """
+    Сначала догоняет пропущенное по журналу (Last-Event-ID), затем ждёт живых событий.
+    Живое событие - только сигнал: записи всегда читаются из журнала после курсора
+    через settled(), поэтому id событий растут и переподключившийся клиент ничего
+    не пропустит, даже если транзакции закоммитились не в порядке seq. Пока запись
+    из сигнала не видна в журнале (её транзакцию обгоняет более ранняя), журнал
+    перечитывается с нарастающей паузой. Подписка оформлена до первого чтения.
+    """
+    page = ChangeLogViewSet.max_limit
+    try:
+        yield 'retry: 3000\n\n'
+        cursor = last_seq if last_seq is not None else await sync_to_async(_log_head)()
+        # Наибольший seq из сигналов, ещё не прочитанный из журнала
+        pending = None
+        delay = SETTLE_POLL_MIN
+        while True:
+            while True:
+                events = await sync_to_async(_changes_after)(user, cursor, page)
+                for event in events:
+                    cursor = event['seq']
+                    yield _format_event(event)
+                if len(events) < page:
+                    break
+            if pending is not None and pending <= cursor:
+                pending = None
+            timeout = settings.DOCUMENTS_EVENTS_HEARTBEAT if pending is None else delay
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                if pending is None:
+                    yield ': ping\n\n'  # комментарий держит соединение через прокси
+                elif delay >= SETTLE_POLL_MAX:
+                    pending = None  # запись так и не стала видна (например, доступ отозван)
+                else:
+                    delay *= 2
+                continue
+            pending = max(pending or 0, event['seq'])
+            while not subscription.queue.empty():
+                pending = max(pending, subscription.queue.get_nowait()['seq'])
+            delay = SETTLE_POLL_MIN
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def document_events_ticket(request):
+    """
+    Билет для подключения к потоку событий (?ticket=). Билет короткоживущий:
+    при переподключении EventSource клиент запрашивает новый.
+    """
+    return Response({'ticket': issue_ticket(request.user), 'expires_in': settings.DOCUMENTS_EVENTS_TICKET_TTL})
+
+
+async def document_events(request):
+    """
+    Server-Sent Events об изменениях доступных пользователю документов.
+    Нужен ASGI-сервер: под WSGI бесконечный поток занял бы воркер целиком.
+    """
+    if 'wsgi.version' in request.META:
+        return JsonResponse({'detail': 'Поток событий доступен только через ASGI.'}, status=501)
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Требуется авторизация.'}, status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    try:
+        last_seq = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return JsonResponse({'detail': 'Некорректный Last-Event-ID.'}, status=400)
+
+    subscription = broker.subscribe(user.pk)
+    response = StreamingHttpResponse(
+        _event_stream(user, last_seq, subscription), content_type='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx не буферизует поток
+    return response
@@ -0,0 +1,91 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Сколько SQL-запросов запоминать на запрос для лога медленных запросов
+MAX_CAPTURED_QUERIES = 200
+
+_current = contextvars.ContextVar('monitoring_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Замеры одного HTTP-запроса, накапливаются по ходу обработки."""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.render_time = 0.0
+        self.queries = []
+        self._serializing = False
+
+    def record_query(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.db_queries += 1
+            self.db_time += duration
+            if len(self.queries) < MAX_CAPTURED_QUERIES:
+                self.queries.append((duration, sql))
+
+
+def current_metrics():
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Учитывает время блока как время сериализации текущего запроса.
+    Вложенные блоки не считаются повторно.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics._serializing:
+        yield
+        return
+    metrics._serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics._serializing = False
+
+
+class TimedSerializerMixin:
+    """Учитывает время to_representation в метриках текущего запроса."""
+
+    def to_representation(self, instance):
+        with timed_serialization():
+            return super().to_representation(instance)
+
+
+def view_name(request):
+    """
+    Имя вью для меток: DocumentViewSet.list, UserMeView.get и т.п.
+    Не путь запроса, чтобы число серий метрик было ограничено.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    func = match.func
+    cls = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    if cls is None:
+        return match.view_name or getattr(func, '__name__', 'unknown')
+    actions = getattr(func, 'actions', None)
+    if actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+    else:
+        action = request.method.lower()
+    return f'{cls.__name__}.{action}'
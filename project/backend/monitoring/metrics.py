@@ -0,0 +1,136 @@
+import threading
+
+# Границы гистограммы длительности запросов, в секундах
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labels), 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labels, key)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # Счётчики по корзинам (не накопительные), сумма и количество
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((key, list(counts), total, count) for key, (counts, total, count) in self._values.items())
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels + ('le',), key + (bound,))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labels + ('le',), key + ('+Inf',))
+            lines.append(f'{self.name}_bucket{labels} {count}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {count}')
+        return lines
+
+
+class Registry:
+    """Метрики процесса. У каждого воркера свой реестр."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+requests_total = registry.register(Counter(
+    'http_requests_total', 'Количество обработанных запросов.', ('view', 'method', 'status'),
+))
+request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'Полное время обработки запроса.', ('view', 'method'),
+))
+db_queries_total = registry.register(Counter(
+    'db_queries_total', 'Количество запросов к БД.', ('view', 'method'),
+))
+db_duration_total = registry.register(Counter(
+    'db_query_duration_seconds_total', 'Суммарное время запросов к БД.', ('view', 'method'),
+))
+serializer_duration_total = registry.register(Counter(
+    'serializer_duration_seconds_total', 'Суммарное время сериализации объектов.', ('view', 'method'),
+))
+render_duration_total = registry.register(Counter(
+    'render_duration_seconds_total', 'Суммарное время рендеринга ответа.', ('view', 'method'),
+))
+response_size_total = registry.register(Counter(
+    'http_response_size_bytes_total', 'Суммарный размер тел ответов.', ('view', 'method'),
+))
+audit_events_written_total = registry.register(Counter(
+    'audit_events_written_total', 'Событий журнала доступа записано в базу.',
+))
+audit_events_dropped_total = registry.register(Counter(
+    'audit_events_dropped_total', 'Событий журнала доступа потеряно (переполнение очереди или ошибка базы).',
+))
+webhook_events_delivered_total = registry.register(Counter(
+    'webhook_events_delivered_total', 'Событий webhook доставлено.',
+))
+webhook_events_dead_total = registry.register(Counter(
+    'webhook_events_dead_total', 'Событий webhook отброшено после исчерпания попыток.',
+))
+webhook_requests_total = registry.register(Counter(
+    'webhook_requests_total', 'HTTP-запросов доставки webhook по результату.', ('outcome',),
+))
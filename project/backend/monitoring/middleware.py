@@ -0,0 +1,125 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+from .instrumentation import RequestMetrics, activate, current_metrics, deactivate, view_name
+from .profiler import StackSampler, should_profile
+
+logger = logging.getLogger('monitoring.slow_requests')
+profiler_logger = logging.getLogger('monitoring.profiler')
+
+
+class InstrumentationMiddleware:
+    """
+    Замеряет для каждого запроса время обработки, число и время запросов к БД,
+    время сериализации и рендеринга, размер ответа. Пишет в метрики процесса
+    и логирует медленные запросы вместе с их SQL.
+    Должен стоять первым в MIDDLEWARE, чтобы учитывать остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = RequestMetrics()
+        token = activate(request_metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(request_metrics.record_query))
+                response = self.get_response(request)
+        finally:
+            deactivate(token)
+        elapsed = time.perf_counter() - start
+
+        view = view_name(request)
+        labels = {'view': view, 'method': request.method}
+        size = 0 if response.streaming else len(response.content)
+        metrics.requests_total.inc(status=response.status_code, **labels)
+        metrics.request_duration.observe(elapsed, **labels)
+        metrics.db_queries_total.inc(request_metrics.db_queries, **labels)
+        metrics.db_duration_total.inc(request_metrics.db_time, **labels)
+        metrics.serializer_duration_total.inc(request_metrics.serializer_time, **labels)
+        metrics.render_duration_total.inc(request_metrics.render_time, **labels)
+        metrics.response_size_total.inc(size, **labels)
+
+        threshold = getattr(settings, 'MONITORING_SLOW_REQUEST_MS', 500) / 1000
+        if elapsed >= threshold:
+            self.log_slow_request(request, view, elapsed, size, request_metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # Ответы DRF рендерятся после вью: засекаем рендер отдельно
+        request_metrics = current_metrics()
+        if request_metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                request_metrics.render_time += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def log_slow_request(self, request, view, elapsed, size, request_metrics):
+        slowest = sorted(request_metrics.queries, key=lambda query: query[0], reverse=True)
+        sql = '\n'.join(f'  {duration * 1000:8.2f} ms  {statement}' for duration, statement in slowest)
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.0f ms, БД %d запросов / %.0f ms, '
+            'сериализация %.0f ms, рендер %.0f ms, ответ %d байт\n%s',
+            request.method, request.path, view, elapsed * 1000,
+            request_metrics.db_queries, request_metrics.db_time * 1000,
+            request_metrics.serializer_time * 1000, request_metrics.render_time * 1000,
+            size, sql,
+        )
+
+
+
+class SamplingProfilerMiddleware:
+    """
+    Снимает семплирующий профиль запросов, выбранных should_profile(),
+    и сохраняет его в monitoring.Profile. Остальные запросы не затрагивает.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_profile(request):
+            return self.get_response(request)
+
+        interval = getattr(settings, 'PROFILER_INTERVAL_MS', 5) / 1000
+        sampler = StackSampler(interval=interval).start()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - start
+        self.store(request, response, elapsed, sampler)
+        return response
+
+    def store(self, request, response, elapsed, sampler):
+        from .models import Profile
+
+        try:
+            Profile.objects.create(
+                view=view_name(request),
+                method=request.method,
+                path=request.path[:2048],
+                status_code=response.status_code,
+                duration_ms=elapsed * 1000,
+                interval_ms=sampler.interval * 1000,
+                samples=sampler.samples,
+                folded=sampler.folded(),
+            )
+            keep = getattr(settings, 'PROFILER_MAX_STORED', 500)
+            stale = Profile.objects.order_by('-created_at').values_list('pk', flat=True)[keep:keep + 100]
+            Profile.objects.filter(pk__in=list(stale)).delete()
+        except Exception:
+            # Профайлер не должен ломать сам запрос
+            profiler_logger.exception('Не удалось сохранить профиль')
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class Profile(models.Model):
+    """Снятый профиль запроса: стеки в формате folded для flame graph."""
+    view = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2048)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    interval_ms = models.FloatField()
+    samples = models.PositiveIntegerField()
+    folded = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.view} {self.duration_ms:.0f} ms"
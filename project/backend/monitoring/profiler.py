@@ -0,0 +1,75 @@
+import random
+import sys
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+PROFILE_HEADER = 'X-Profile'
+
+
+def should_profile(request):
+    """
+    Профилировать ли запрос: по заголовку X-Profile с секретным токеном
+    или случайно с долей PROFILER_SAMPLE_RATE. В выключенном состоянии
+    это пара обращений к настройкам - накладных расходов практически нет.
+    """
+    token = getattr(settings, 'PROFILER_HEADER_TOKEN', '')
+    if token and request.headers.get(PROFILE_HEADER) == token:
+        return True
+    rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+    return rate > 0 and random.random() < rate
+
+
+def frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f'{module}.{name}'
+
+
+def collapse(frame):
+    """Стек в формате folded: корень слева, кадры через ';'."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Семплирующий профайлер одного потока: фоновый поток раз в interval
+    секунд снимает стек профилируемого потока через sys._current_frames().
+    Результат - счётчики стеков, совместимые с flamegraph.pl и speedscope.
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+
+    def folded(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
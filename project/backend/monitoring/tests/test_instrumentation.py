@@ -0,0 +1,89 @@
+import logging
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document
+from monitoring import metrics
+
+METRICS_URL = reverse('monitoring:metrics')
+LIST_LABELS = {'view': 'DocumentViewSet.list', 'method': 'GET'}
+
+
+@pytest.fixture
+def auth_client():
+    user = CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+    for i in range(3):
+        Document.objects.create(title=f'Doc {i}', category=Category.objects.named('General'), created_by=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_request_metrics_recorded_per_view(auth_client):
+    """Запрос к списку документов учитывается под именем вью и action"""
+    before_requests = metrics.requests_total.value(status=200, **LIST_LABELS)
+    before_queries = metrics.db_queries_total.value(**LIST_LABELS)
+    before_serializer = metrics.serializer_duration_total.value(**LIST_LABELS)
+    before_size = metrics.response_size_total.value(**LIST_LABELS)
+    before_render = metrics.render_duration_total.value(**LIST_LABELS)
+
+    response = auth_client.get(reverse('documents:document-list'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert metrics.requests_total.value(status=200, **LIST_LABELS) == before_requests + 1
+    assert metrics.db_queries_total.value(**LIST_LABELS) > before_queries
+    assert metrics.serializer_duration_total.value(**LIST_LABELS) > before_serializer
+    assert metrics.response_size_total.value(**LIST_LABELS) == before_size + len(response.content)
+    assert metrics.render_duration_total.value(**LIST_LABELS) > before_render
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_prometheus_format(auth_client):
+    """Эндпоинт отдаёт метрики в текстовом формате Prometheus"""
+    auth_client.get(reverse('documents:document-list'))
+    response = APIClient().get(METRICS_URL)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.content.decode()
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_bucket{view="DocumentViewSet.list",method="GET",le="+Inf"}' in body
+    assert 'db_queries_total{view="DocumentViewSet.list",method="GET"}' in body
+
+
+@override_settings(MONITORING_ALLOWED_IPS=['10.0.0.1'], MONITORING_TOKEN='secret')
+def test_metrics_endpoint_restricted():
+    """С посторонних адресов метрики доступны только по токену"""
+    client = APIClient()
+
+    assert client.get(METRICS_URL).status_code == status.HTTP_403_FORBIDDEN
+    response = client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@override_settings(MONITORING_SLOW_REQUEST_MS=0)
+def test_slow_request_logged_with_sql(auth_client, caplog):
+    """Медленный запрос логируется вместе с его SQL"""
+    with caplog.at_level(logging.WARNING, logger='monitoring.slow_requests'):
+        auth_client.get(reverse('documents:document-list'))
+
+    record = next(r for r in caplog.records if 'DocumentViewSet.list' in r.getMessage())
+    assert 'documents_document' in record.getMessage()
+
+
+def test_histogram_buckets_are_cumulative():
+    """Корзины гистограммы в выводе накопительные"""
+    histogram = metrics.Histogram('test_seconds', 'Тест.', ('view',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, view='v')
+    histogram.observe(0.5, view='v')
+    histogram.observe(5.0, view='v')
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{view="v",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{view="v",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{view="v",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{view="v"} 3' in lines
@@ -0,0 +1,78 @@
+import threading
+import time
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from monitoring.models import Profile
+from monitoring.profiler import StackSampler
+
+
+def busy_function(deadline):
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def test_sampler_collects_folded_stacks():
+    """Семплер собирает стеки целевого потока в формате folded"""
+    thread = threading.Thread(target=busy_function, args=(time.perf_counter() + 0.2,))
+    thread.start()
+    sampler = StackSampler(thread_id=thread.ident, interval=0.002).start()
+    thread.join()
+    sampler.stop()
+
+    assert sampler.samples > 0
+    line = sampler.folded().splitlines()[0]
+    stack, count = line.rsplit(' ', 1)
+    assert 'test_profiler.busy_function' in stack.split(';')[-1]
+    assert int(count) > 0
+
+
+@pytest.fixture
+def auth_client():
+    user = CustomUser.objects.create_user(email='user@example.com', password='Testpass123')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+@override_settings(PROFILER_HEADER_TOKEN='profile-me', PROFILER_INTERVAL_MS=1)
+def test_profile_by_header(auth_client):
+    """Запрос с заголовком X-Profile профилируется и доступен для скачивания"""
+    response = auth_client.get(reverse('documents:document-list'), HTTP_X_PROFILE='profile-me')
+    assert response.status_code == status.HTTP_200_OK
+
+    profile = Profile.objects.get()
+    assert profile.view == 'DocumentViewSet.list'
+    assert profile.status_code == 200
+
+    listing = APIClient().get(reverse('monitoring:profile-list'))
+    assert listing.json()['results'][0]['id'] == profile.id
+    download = APIClient().get(reverse('monitoring:profile-download', args=[profile.id]))
+    assert download.status_code == status.HTTP_200_OK
+    assert download['Content-Disposition'].endswith('.folded"')
+
+
+@pytest.mark.django_db
+@override_settings(PROFILER_HEADER_TOKEN='profile-me', PROFILER_SAMPLE_RATE=0.0)
+def test_profiler_off_by_default(auth_client):
+    """Без заголовка и с нулевой долей профили не снимаются"""
+    auth_client.get(reverse('documents:document-list'))
+    auth_client.get(reverse('documents:document-list'), HTTP_X_PROFILE='wrong-token')
+
+    assert not Profile.objects.exists()
+
+
+@pytest.mark.django_db
+@override_settings(PROFILER_SAMPLE_RATE=1.0, PROFILER_MAX_STORED=2)
+def test_profiles_sampled_and_trimmed(auth_client):
+    """При доле 1.0 профилируется каждый запрос, старые профили вычищаются"""
+    for _ in range(4):
+        auth_client.get(reverse('documents:document-list'))
+
+    assert Profile.objects.count() == 2
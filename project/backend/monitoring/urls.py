@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import metrics_view, profile_download_view, profile_list_view
+
+app_name = 'monitoring'
+
+urlpatterns = [
+    path('metrics/', metrics_view, name='metrics'),
+    path('profiles/', profile_list_view, name='profile-list'),
+    path('profiles/<int:pk>/', profile_download_view, name='profile-download'),
+]
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from .metrics import registry
+from .models import Profile
+
+
+def is_internal_request(request):
+    """Внутренние эндпоинты доступны с разрешённых адресов или по токену."""
+    token = getattr(settings, 'MONITORING_TOKEN', '')
+    if token and request.headers.get('Authorization') == f'Bearer {token}':
+        return True
+    allowed = getattr(settings, 'MONITORING_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    return request.META.get('REMOTE_ADDR') in allowed
+
+
+@require_GET
+def metrics_view(request):
+    if not is_internal_request(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_GET
+def profile_list_view(request):
+    if not is_internal_request(request):
+        return HttpResponseForbidden()
+    profiles = Profile.objects.values(
+        'id', 'view', 'method', 'path', 'status_code', 'duration_ms', 'samples', 'created_at'
+    )[:100]
+    return JsonResponse({'results': list(profiles)})
+
+
+@require_GET
+def profile_download_view(request, pk):
+    """Стеки профиля в формате folded (flamegraph.pl, speedscope)."""
+    if not is_internal_request(request):
+        return HttpResponseForbidden()
+    profile = get_object_or_404(Profile, pk=pk)
+    response = HttpResponse(profile.folded, content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.folded"'
+    return response
@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from docsStore.pagination import EstimatedCountPaginator
+from .models import OutboxEvent, WebhookEndpoint
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ('url', 'owner', 'is_active', 'created_at')
+    list_select_related = ('owner',)
+    list_filter = ('is_active',)
+    search_fields = ('owner__email__exact',)
+    raw_id_fields = ('owner',)
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'endpoint', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_select_related = ('endpoint',)
+    list_filter = ('status',)
+    raw_id_fields = ('endpoint',)
+    readonly_fields = ('payload', 'created_at', 'delivered_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
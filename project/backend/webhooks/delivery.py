@@ -0,0 +1,268 @@
+"""
+Доставка событий outbox на webhook-endpoint-ы.
+
+Воркер забирает созревшие события (select_for_update skip_locked, так что
+несколько воркеров не берут одно и то же) и продлевает им next_attempt_at на
+WEBHOOKS_LEASE_SECONDS - если воркер упадёт, события вернутся в очередь сами.
+События группируются по endpoint-у в пачки до WEBHOOKS_BATCH_SIZE: одна пачка -
+один POST {"events": [...]}. Endpoint-ы обслуживаются параллельно в пуле
+потоков, пачки одного endpoint-а - по порядку; потоки только ходят по HTTP,
+база обновляется в основном потоке.
+
+Ответ 2xx - события доставлены. Иначе попытка засчитывается и следующая
+назначается с экспоненциальной задержкой; после WEBHOOKS_MAX_ATTEMPTS событие
+становится dead и ждёт ручного requeue. Доставка at-least-once: получатель
+отбрасывает повторы по id события.
+"""
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import json
+import random
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from monitoring.metrics import (
+    webhook_events_dead_total,
+    webhook_events_delivered_total,
+    webhook_requests_total,
+)
+from .models import DEAD, DELIVERED, PENDING, OutboxEvent, WebhookDelivery, WebhookEndpoint
+
+SIGNATURE_HEADER = 'X-Webhook-Signature'
+USER_AGENT = 'documents-store-webhooks/1'
+# Сколько байт тела ответа сохранять в last_error
+ERROR_BODY_LIMIT = 500
+
+
+class DeliveryRefused(Exception):
+    pass
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    """
+    Соединение с уже проверенным адресом: повторное разрешение имени при
+    подключении позволило бы DNS rebinding подменить адрес после проверки.
+    Host (и SNI для https) - по-прежнему имя из URL. address=None - обычное
+    подключение по имени.
+    """
+
+    def __init__(self, host, address=None, **kwargs):
+        super().__init__(host, **kwargs)
+        self.address = address
+
+    def _open_socket(self):
+        return socket.create_connection((self.address or self.host, self.port), self.timeout)
+
+    def connect(self):
+        self.sock = self._open_socket()
+
+
+class _PinnedHTTPSConnection(_PinnedHTTPConnection, http.client.HTTPSConnection):
+    def connect(self):
+        # Сертификат проверяется по имени из URL, а не по адресу
+        self.sock = self._context.wrap_socket(self._open_socket(), server_hostname=self.host)
+
+
+def sign(secret, body):
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def check_destination(url):
+    """
+    Проверенный адрес для подключения; DeliveryRefused, если имя ведёт в
+    локальную или частную сеть. None - проверка отключена
+    (WEBHOOKS_ALLOW_PRIVATE_NETWORKS), подключаться по имени.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise DeliveryRefused('Недопустимый адрес endpoint-а.')
+    if settings.WEBHOOKS_ALLOW_PRIVATE_NETWORKS:
+        return None
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or 443, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as exc:
+        raise DeliveryRefused(f'Не удалось разрешить {parts.hostname}: {exc}')
+    addresses = [ipaddress.ip_address(info[4][0].split('%')[0]) for info in infos]
+    for address in addresses:
+        if not address.is_global:
+            raise DeliveryRefused(f'Адрес {address} не из публичной сети.')
+    return str(addresses[0])
+
+
+def post(url, secret, body, timeout):
+    """
+    (HTTP-статус или None, текст ошибки) одного POST. Подключение - к адресу,
+    проверенному check_destination. Редиректы не выполняются: они увели бы
+    подписанное тело на непроверенный адрес.
+    """
+    try:
+        address = check_destination(url)
+    except DeliveryRefused as exc:
+        return None, str(exc)
+    parts = urlsplit(url)
+    connection_class = _PinnedHTTPSConnection if parts.scheme == 'https' else _PinnedHTTPConnection
+    connection = connection_class(parts.hostname, address, port=parts.port, timeout=timeout)
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    try:
+        connection.request('POST', path, body=body, headers={
+            'Content-Type': 'application/json',
+            'User-Agent': USER_AGENT,
+            SIGNATURE_HEADER: sign(secret, body),
+        })
+        response = connection.getresponse()
+        if 200 <= response.status < 300:
+            return response.status, ''
+        detail = response.read(ERROR_BODY_LIMIT).decode('utf-8', 'replace')
+        return response.status, f'HTTP {response.status}: {detail}'.strip()
+    except (http.client.HTTPException, OSError) as exc:
+        return None, str(exc)
+    finally:
+        connection.close()
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой, секунд: экспонента с джиттером."""
+    delay = min(settings.WEBHOOKS_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.WEBHOOKS_RETRY_MAX_SECONDS)
+    # Половина задержки случайная - сбойнувшие разом endpoint-ы не возвращаются разом
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def body_for(events):
+    return json.dumps(
+        {'events': [{'id': event.pk, **event.payload} for event in events]},
+        separators=(',', ':'),
+    ).encode()
+
+
+def claim(limit):
+    """Созревшие события активных endpoint-ов, не занятые другими воркерами."""
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .filter(status=PENDING, next_attempt_at__lte=now, endpoint__is_active=True)
+            .order_by('pk')[:limit]
+        )
+        if events:
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                next_attempt_at=now + timedelta(seconds=settings.WEBHOOKS_LEASE_SECONDS),
+            )
+    return events
+
+
+class WebhookDeliverer:
+    """Пул потоков доставки; deliver() - один проход по очереди."""
+
+    def __init__(self, concurrency=None, batch_size=None, timeout=None, send=post):
+        self.concurrency = concurrency or settings.WEBHOOKS_CONCURRENCY
+        self.batch_size = batch_size or settings.WEBHOOKS_BATCH_SIZE
+        self.timeout = timeout or settings.WEBHOOKS_TIMEOUT
+        self.send = send
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='webhooks')
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _send_endpoint(self, endpoint, events):
+        """Пачки одного endpoint-а по порядку; после ошибки остальные не отправляются."""
+        results = []
+        for start in range(0, len(events), self.batch_size):
+            chunk = events[start:start + self.batch_size]
+            started = time.monotonic()
+            status_code, error = self.send(endpoint.url, endpoint.secret, body_for(chunk), self.timeout)
+            duration_ms = int((time.monotonic() - started) * 1000)
+            results.append((chunk, status_code, error, duration_ms))
+            if not (status_code is not None and 200 <= status_code < 300):
+                return results, events[start + self.batch_size:]
+        return results, []
+
+    def deliver(self):
+        """{'delivered', 'failed', 'dead'} - число событий за проход."""
+        events = claim(self.batch_size * self.concurrency)
+        stats = {'delivered': 0, 'failed': 0, 'dead': 0}
+        if not events:
+            return stats
+        by_endpoint = {}
+        for event in events:
+            by_endpoint.setdefault(event.endpoint_id, []).append(event)
+        endpoints = WebhookEndpoint.objects.in_bulk(list(by_endpoint))
+        futures = [
+            (endpoint_id, self._executor.submit(self._send_endpoint, endpoints[endpoint_id], endpoint_events))
+            for endpoint_id, endpoint_events in by_endpoint.items()
+        ]
+        for endpoint_id, future in futures:
+            results, skipped = future.result()
+            self._apply(endpoint_id, results, skipped, stats)
+        return stats
+
+    def _apply(self, endpoint_id, results, skipped, stats):
+        now = timezone.now()
+        deliveries = []
+        changed = []
+        retry_at = now
+        for chunk, status_code, error, duration_ms in results:
+            deliveries.append(WebhookDelivery(
+                endpoint_id=endpoint_id, event_count=len(chunk),
+                status_code=status_code, error=error, duration_ms=duration_ms,
+            ))
+            if status_code is not None and 200 <= status_code < 300:
+                webhook_requests_total.inc(outcome='success')
+                for event in chunk:
+                    event.status, event.delivered_at, event.last_error = DELIVERED, now, ''
+                stats['delivered'] += len(chunk)
+                webhook_events_delivered_total.inc(len(chunk))
+            else:
+                webhook_requests_total.inc(outcome='failure')
+                for event in chunk:
+                    event.attempts += 1
+                    event.last_error = error
+                    if event.attempts >= settings.WEBHOOKS_MAX_ATTEMPTS:
+                        event.status = DEAD
+                        stats['dead'] += 1
+                        webhook_events_dead_total.inc()
+                    else:
+                        event.next_attempt_at = now + timedelta(seconds=retry_delay(event.attempts))
+                        retry_at = max(retry_at, event.next_attempt_at)
+                        stats['failed'] += 1
+            changed.extend(chunk)
+        # Неотправленные пачки ждут вместе с упавшей, попытка им не засчитывается
+        for event in skipped:
+            event.next_attempt_at = retry_at
+        changed.extend(skipped)
+        with transaction.atomic():
+            WebhookDelivery.objects.bulk_create(deliveries)
+            OutboxEvent.objects.bulk_update(
+                changed, ['status', 'attempts', 'next_attempt_at', 'last_error', 'delivered_at'],
+            )
+
+
+def requeue_dead(endpoint_id=None):
+    """Возвращает dead-события в очередь с обнулёнными попытками."""
+    events = OutboxEvent.objects.filter(status=DEAD)
+    if endpoint_id is not None:
+        events = events.filter(endpoint_id=endpoint_id)
+    return events.update(status=PENDING, attempts=0, next_attempt_at=timezone.now())
+
+
+def prune(days):
+    """Удаляет доставленные события и журнал попыток старше days дней."""
+    cutoff = timezone.now() - timedelta(days=days)
+    events, _ = OutboxEvent.objects.filter(status=DELIVERED, delivered_at__lt=cutoff).delete()
+    deliveries, _ = WebhookDelivery.objects.filter(created_at__lt=cutoff).delete()
+    return events, deliveries
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from webhooks.delivery import WebhookDeliverer, prune, requeue_dead
+
+
+class Command(BaseCommand):
+    help = (
+        'Доставляет события webhook из outbox. По умолчанию работает постоянно, '
+        'опрашивая очередь раз в --poll секунд; несколько воркеров не мешают друг другу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Один проход по очереди и выход.')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Параллельных HTTP-доставок (по умолчанию WEBHOOKS_CONCURRENCY).')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Событий в одном запросе (по умолчанию WEBHOOKS_BATCH_SIZE).')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Пауза, если очередь пуста, секунд.')
+        parser.add_argument('--requeue-dead', action='store_true',
+                            help='Вернуть dead-события в очередь и выйти.')
+        parser.add_argument('--prune-days', type=int, default=None,
+                            help='Удалить доставленные события старше N дней и выйти.')
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            self.stdout.write(f'Возвращено в очередь: {requeue_dead()}.')
+            return
+        if options['prune_days'] is not None:
+            events, deliveries = prune(options['prune_days'])
+            self.stdout.write(f'Удалено событий: {events}, записей о доставке: {deliveries}.')
+            return
+
+        with WebhookDeliverer(options['concurrency'], options['batch_size']) as deliverer:
+            while True:
+                close_old_connections()
+                stats = deliverer.deliver()
+                if any(stats.values()):
+                    self.stdout.write(
+                        f"Доставлено: {stats['delivered']}, повтор: {stats['failed']}, dead: {stats['dead']}."
+                    )
+                if options['once']:
+                    return
+                if not any(stats.values()):
+                    time.sleep(options['poll'])
@@ -0,0 +1,78 @@
+import secrets
+
+from django.db import models
+from django.utils import timezone
+
+PENDING = 'pending'
+DELIVERED = 'delivered'
+DEAD = 'dead'
+
+STATUS_CHOICES = [
+    (PENDING, 'Pending'),
+    (DELIVERED, 'Delivered'),
+    (DEAD, 'Dead'),
+]
+
+
+def generate_secret():
+    return secrets.token_hex(32)
+
+
+class WebhookEndpoint(models.Model):
+    """
+    Адрес, на который уходят изменения документов, доступных владельцу.
+    Тело подписывается HMAC-SHA256 секретом (заголовок X-Webhook-Signature).
+    """
+    owner = models.ForeignKey('account.CustomUser', on_delete=models.CASCADE, related_name='webhook_endpoints')
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=64, default=generate_secret, editable=False)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.url
+
+
+class OutboxEvent(models.Model):
+    """
+    Событие для доставки на endpoint. Пишется в той же транзакции, что и
+    изменение документа, поэтому не теряется и не уходит при откате.
+    """
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='events')
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Очередь воркера: только ожидающие доставки, по времени следующей попытки
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbox_pending_idx',
+                condition=models.Q(status=PENDING),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.pk} {self.status} -> {self.endpoint_id}'
+
+
+class WebhookDelivery(models.Model):
+    """Одна HTTP-попытка доставки пачки событий на endpoint."""
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries')
+    event_count = models.PositiveIntegerField()
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    duration_ms = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    @property
+    def succeeded(self):
+        return self.status_code is not None and 200 <= self.status_code < 300
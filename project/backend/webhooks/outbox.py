@@ -0,0 +1,28 @@
+from django.db.models import Q
+
+from documents.changes import document_changed
+from documents.models import ChangeLogEntry, ChangeLogRecipient, DocumentAccess
+from documents.serializers import ChangeLogEntrySerializer
+from .models import OutboxEvent, WebhookEndpoint
+
+
+def endpoints_for(entry):
+    """Активные endpoint-ы владельцев, которым видна запись журнала."""
+    audience = Q(owner_id__in=ChangeLogRecipient.objects.filter(entry=entry).values('user_id'))
+    if not entry.recipients_only:
+        audience |= Q(owner_id__in=DocumentAccess.objects.filter(document_id=entry.document_id).values('user_id'))
+    return WebhookEndpoint.objects.filter(is_active=True).filter(audience)
+
+
+def entry_recorded(sender, entry, **kwargs):
+    """Пишет событие в outbox внутри транзакции изменения документа."""
+    endpoint_ids = list(endpoints_for(entry).values_list('pk', flat=True))
+    if endpoint_ids:
+        payload = ChangeLogEntrySerializer(entry).data
+        OutboxEvent.objects.bulk_create(
+            OutboxEvent(endpoint_id=endpoint_id, payload=payload) for endpoint_id in endpoint_ids
+        )
+
+
+def connect_outbox():
+    document_changed.connect(entry_recorded, sender=ChangeLogEntry, dispatch_uid='webhooks_outbox')
@@ -0,0 +1,24 @@
+from urllib.parse import urlsplit
+
+from rest_framework import serializers
+
+from .models import WebhookDelivery, WebhookEndpoint
+
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookEndpoint
+        fields = ['id', 'url', 'secret', 'is_active', 'created_at']
+        read_only_fields = ['id', 'secret', 'created_at']
+
+    def validate_url(self, value):
+        if urlsplit(value).scheme not in ('http', 'https'):
+            raise serializers.ValidationError('Поддерживаются только http и https.')
+        return value
+
+
+class WebhookDeliverySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookDelivery
+        fields = ['id', 'event_count', 'status_code', 'error', 'duration_ms', 'created_at', 'succeeded']
+        read_only_fields = fields
@@ -0,0 +1,168 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from account.models import CustomUser
+from documents.models import Category, Document
+from webhooks import delivery
+from webhooks.delivery import WebhookDeliverer, post, sign
+from webhooks.models import DEAD, DELIVERED, PENDING, OutboxEvent, WebhookEndpoint
+
+
+class Receiver(BaseHTTPRequestHandler):
+    """Локальный приёмник: запоминает запросы и отвечает кодом server.status."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.received.append((body, self.headers['X-Webhook-Signature']))
+        self.server.hosts.append(self.headers['Host'])
+        self.send_response(self.server.status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver(settings):
+    settings.WEBHOOKS_ALLOW_PRIVATE_NETWORKS = True
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Receiver)
+    server.received = []
+    server.hosts = []
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def owner():
+    return CustomUser.objects.create_user(email='hooks@example.com', password='Testpass123')
+
+
+def make_endpoint(owner, server):
+    return WebhookEndpoint.objects.create(owner=owner, url=f'http://127.0.0.1:{server.server_port}/hook')
+
+
+def create_document(owner, title='Hooked'):
+    return Document.objects.create(title=title, category=Category.objects.named('General'), created_by=owner)
+
+
+@pytest.mark.django_db
+def test_outbox_written_in_change_transaction(owner):
+    """Событие outbox появляется вместе с изменением и исчезает при откате"""
+    WebhookEndpoint.objects.create(owner=owner, url='https://hooks.example.com/')
+    stranger = CustomUser.objects.create_user(email='stranger@example.com', password='Testpass123')
+    WebhookEndpoint.objects.create(owner=stranger, url='https://other.example.com/')
+
+    document = create_document(owner)
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            create_document(owner, 'Rolled back')
+            raise RuntimeError
+
+    events = list(OutboxEvent.objects.values_list('endpoint__owner', 'payload'))
+    assert len(events) == 1
+    assert events[0][0] == owner.pk
+    assert (events[0][1]['action'], events[0][1]['document']) == ('created', str(document.pk))
+
+
+@pytest.mark.django_db
+def test_events_delivered_in_one_signed_batch(owner, receiver):
+    """События одного endpoint-а уходят одним подписанным запросом"""
+    endpoint = make_endpoint(owner, receiver)
+    for i in range(3):
+        create_document(owner, f'Doc {i}')
+
+    with WebhookDeliverer(concurrency=2, batch_size=10) as deliverer:
+        assert deliverer.deliver() == {'delivered': 3, 'failed': 0, 'dead': 0}
+
+    [(body, signature)] = receiver.received
+    assert signature == sign(endpoint.secret, body)
+    assert [event['action'] for event in json.loads(body)['events']] == ['created'] * 3
+    assert OutboxEvent.objects.filter(status=DELIVERED).count() == 3
+    assert endpoint.deliveries.get().status_code == 200
+
+
+@pytest.mark.django_db
+def test_failed_delivery_backs_off_then_goes_dead(owner, receiver, settings):
+    """Ошибка получателя откладывает повтор, после последней попытки событие - dead"""
+    settings.WEBHOOKS_MAX_ATTEMPTS = 2
+    receiver.status = 500
+    make_endpoint(owner, receiver)
+    create_document(owner)
+
+    with WebhookDeliverer(concurrency=1) as deliverer:
+        started = timezone.now()
+        assert deliverer.deliver() == {'delivered': 0, 'failed': 1, 'dead': 0}
+        event = OutboxEvent.objects.get()
+        assert (event.status, event.attempts) == (PENDING, 1)
+        assert event.next_attempt_at >= started + timedelta(seconds=settings.WEBHOOKS_RETRY_BASE_SECONDS / 2)
+        assert deliverer.deliver() == {'delivered': 0, 'failed': 0, 'dead': 0}
+
+        OutboxEvent.objects.update(next_attempt_at=timezone.now())
+        assert deliverer.deliver() == {'delivered': 0, 'failed': 0, 'dead': 1}
+
+    event.refresh_from_db()
+    assert (event.status, event.attempts) == (DEAD, 2)
+    assert 'HTTP 500' in event.last_error
+    assert len(receiver.received) == 2
+
+
+def test_delivery_connects_to_checked_address(receiver, settings, monkeypatch):
+    """
+    Подключение идёт к адресу, проверенному до запроса: повторное разрешение
+    имени (DNS rebinding) не может увести запрос во внутреннюю сеть
+    """
+    settings.WEBHOOKS_ALLOW_PRIVATE_NETWORKS = False
+    answers = iter(['93.184.216.34', '127.0.0.1'])
+    resolved, connected = [], []
+    real_connect = delivery.socket.create_connection
+    real_getaddrinfo = delivery.socket.getaddrinfo
+
+    def rebinding_dns(host, port, *args, **kwargs):
+        if host == '127.0.0.1':
+            return real_getaddrinfo(host, port, *args, **kwargs)
+        resolved.append(host)
+        return [(delivery.socket.AF_INET, delivery.socket.SOCK_STREAM, 6, '', (next(answers), port))]
+
+    def create_connection(address, *args, **kwargs):
+        connected.append(address[0])
+        # Публичный адрес из теста недоступен - отвечает локальный приёмник
+        return real_connect(('127.0.0.1', receiver.server_port), *args, **kwargs)
+
+    monkeypatch.setattr(delivery.socket, 'getaddrinfo', rebinding_dns)
+    monkeypatch.setattr(delivery.socket, 'create_connection', create_connection)
+
+    status_code, error = post(f'http://hooks.example.com:{receiver.server_port}/hook', 'secret', b'{}', 5)
+
+    assert (status_code, error) == (200, '')
+    assert resolved == ['hooks.example.com']
+    assert connected == ['93.184.216.34']
+    assert receiver.hosts == [f'hooks.example.com:{receiver.server_port}']
+
+
+@pytest.mark.django_db
+def test_endpoints_api_scoped_to_owner(owner):
+    """Пользователь видит и создаёт только свои endpoint-ы, секрет выдаётся сервером"""
+    other = CustomUser.objects.create_user(email='other-hooks@example.com', password='Testpass123')
+    WebhookEndpoint.objects.create(owner=other, url='https://other.example.com/')
+    client = APIClient()
+    client.force_authenticate(user=owner)
+
+    created = client.post(reverse('webhooks:endpoint-list'), {'url': 'https://hooks.example.com/', 'secret': 'x'})
+    listed = client.get(reverse('webhooks:endpoint-list'))
+    rejected = client.post(reverse('webhooks:endpoint-list'), {'url': 'ftp://hooks.example.com/'})
+
+    assert created.status_code == 201
+    assert len(created.data['secret']) == 64
+    assert [item['url'] for item in listed.data] == ['https://hooks.example.com/']
+    assert rejected.status_code == 400
@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import WebhookEndpointViewSet
+
+router = DefaultRouter()
+router.register(r'endpoints', WebhookEndpointViewSet, basename='endpoint')
+
+app_name = 'webhooks'
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
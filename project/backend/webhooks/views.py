@@ -0,0 +1,34 @@
+from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .delivery import requeue_dead
+from .models import WebhookEndpoint
+from .serializers import WebhookDeliverySerializer, WebhookEndpointSerializer
+
+RECENT_DELIVERIES = 50
+
+
+class WebhookEndpointViewSet(viewsets.ModelViewSet):
+    """Webhook-endpoint-ы текущего пользователя."""
+    serializer_class = WebhookEndpointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return WebhookEndpoint.objects.filter(owner=self.request.user).order_by('created_at')
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def deliveries(self, request, pk=None):
+        """Последние попытки доставки."""
+        endpoint = self.get_object()
+        deliveries = endpoint.deliveries.all()[:RECENT_DELIVERIES]
+        return Response(WebhookDeliverySerializer(deliveries, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def requeue(self, request, pk=None):
+        """Возвращает в очередь события, исчерпавшие попытки."""
+        endpoint = self.get_object()
+        return Response({'requeued': requeue_dead(endpoint.pk)})